@@ -12,6 +12,13 @@ class Settings(BaseModel):
     
     # RabbitMQ Settings
     RABBITMQ_HOST: str | None = None
+    JOB_LANES: str | None = None  # size classes of optimization requests, "name:max_size,...,name" (see shared/ares_shared/lanes.py)
+    
+    # Job estimates (GET /jobs/{id}/estimate) and admission control on run (0 = no limit)
+    ESTIMATE_HISTORY_RUNS: int = 500
+    ESTIMATE_WARN_SECONDS: float = 3600.0
+    ADMISSION_MAX_SOLVE_SECONDS: float = 0.0
+    ADMISSION_MAX_MEMORY_MB: float = 0.0
 
 @lru_cache
 def get_settings() -> Settings:
@@ -25,4 +32,11 @@ def get_settings() -> Settings:
         
         # RabbitMQ Settings
         RABBITMQ_HOST=os.getenv("RABBITMQ_HOST"),
+        JOB_LANES=os.getenv("JOB_LANES"),
+        
+        # Job estimates and admission control
+        ESTIMATE_HISTORY_RUNS=int(os.getenv("ESTIMATE_HISTORY_RUNS", "500")),
+        ESTIMATE_WARN_SECONDS=float(os.getenv("ESTIMATE_WARN_SECONDS", "3600")),
+        ADMISSION_MAX_SOLVE_SECONDS=float(os.getenv("ADMISSION_MAX_SOLVE_SECONDS", "0")),
+        ADMISSION_MAX_MEMORY_MB=float(os.getenv("ADMISSION_MAX_MEMORY_MB", "0")),
     )
@@ -14,7 +14,8 @@ def _ensure_producer():
         # Get RabbitMQ settings from environment or use defaults
         rabbitmq_host = getattr(settings, 'RABBITMQ_HOST', 'localhost')
         
-        _producer = QueueProducer(rabbitmq_host=rabbitmq_host, input_queue="optimization_requests")
+        _producer = QueueProducer(rabbitmq_host=rabbitmq_host, input_queue="optimization_requests",
+                                  lanes=getattr(settings, 'JOB_LANES', None))
         print(f"Initialized QueueProducer for {rabbitmq_host}")
 
 def get_producer() -> QueueProducer:
@@ -186,7 +186,8 @@ async def consumer_status():
         "consumer_thread_alive": consumer_thread.is_alive() if consumer_thread else False,
         "consumer_connected": consumer is not None,
         "rabbitmq_host": getattr(settings, 'RABBITMQ_HOST', 'localhost'),
-        "output_queue": "optimization_responses"
+        "output_queue": "optimization_responses",
+        "progress_queue": "optimization_progress"
     }
     
     return status
@@ -21,6 +21,10 @@ from app.models.job_results import (
     JobResultWeightLossOut
 )
 from app.services.queue import QueueProducer
+from app.services.mission_data_builder import MissionDataBuilder
+from app.services.validation import validate_mission_data
+from app.services.result_format import is_columnar, to_nested
+from app.services.estimate import estimate_job
 from app.core.queue import get_queue
 from sse_starlette.sse import EventSourceResponse
 import asyncio
@@ -506,14 +510,44 @@ async def set_method_capacity(job_id: str, payload: JobMethodCapacityCreate, db:
     return {"success": True}
 
 # === JOB EXECUTION ===
+@router.get("/{job_id}/estimate", response_model=dict)
+async def get_job_estimate(job_id: str, db: AsyncSession = Depends(get_db)):
+    # Model size from the configuration tables and run times predicted from past runs; nothing is built
+    try:
+        mission_data = await MissionDataBuilder(db).build_mission_data(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return await estimate_job(db, job_id, mission_data)
+
 @router.post("/{job_id}/run")
 async def run_job(
     job_id: str,
     background_tasks: BackgroundTasks,
+    force: bool = False,
     db: AsyncSession = Depends(get_db),
     queueProducer: QueueProducer = Depends(get_queue)
 ):
     try:
+        # Build and validate the mission data first, so malformed jobs never take a worker slot
+        try:
+            mission_data = await MissionDataBuilder(db).build_mission_data(job_id)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        errors = validate_mission_data(mission_data)
+        if errors:
+            raise HTTPException(
+                status_code=422,
+                detail={"message": f"Job data failed validation: {len(errors)} error(s)", "errors": errors}
+            )
+
+        # Admission control: refuse jobs predicted to exceed the configured limits (unless forced)
+        estimate = await estimate_job(db, job_id, mission_data)
+        if estimate["admission"] and not force:
+            raise HTTPException(
+                status_code=422,
+                detail={"message": f"Job exceeds admission limits: {'; '.join(estimate['admission'])}", "estimate": estimate}
+            )
+
         # Set job status to running and started_at
         await db.execute(
             text("update jobs set status = 'running', started_at = now() where id = :job_id"),
@@ -525,7 +559,8 @@ async def run_job(
             # Ensure connection and publish optimization request
             queueProducer.connect()
             try:
-                await queueProducer.publish_optimization_request(job_id)
+                await queueProducer.publish_optimization_request(job_id, optimization_data=mission_data,
+                                                                 job_size=estimate["variables"])
             finally:
                 queueProducer.disconnect()
         except Exception as e:
@@ -538,7 +573,7 @@ async def run_job(
             await db.commit()
             raise HTTPException(status_code=500, detail=f"Failed to start job: {str(e)}")
 
-        return {"success": True, "message": "Job started", "job_id": job_id}
+        return {"success": True, "message": "Job started", "job_id": job_id, "estimate": estimate}
     except HTTPException:
         # Re-raise HTTP exceptions (they're already handled above)
         raise
@@ -559,6 +594,7 @@ async def run_job(
 @router.get("/{job_id}/stream")
 async def stream_job_progress(job_id: str, db: AsyncSession = Depends(get_db)):
     async def event_generator():
+        last_progress_ts = None
         while True:
             # Check job status
             rs = await db.execute(text("select status from jobs where id = :job_id"), {"job_id": job_id})
@@ -570,6 +606,17 @@ async def stream_job_progress(job_id: str, db: AsyncSession = Depends(get_db)):
                 
             yield {"event": "status", "data": json.dumps({"status": job["status"]})}
             
+            # Solver progress (incumbent, bound, gap, elapsed) logged since the last poll
+            rs = await db.execute(text("""
+                select ts, message from job_logs
+                where job_id = :job_id and level = 'progress'
+                  and (cast(:after as timestamptz) is null or ts > cast(:after as timestamptz))
+                order by ts
+            """), {"job_id": job_id, "after": last_progress_ts})
+            for row in rs.mappings().all():
+                last_progress_ts = row["ts"]
+                yield {"event": "progress", "data": row["message"]}
+            
             if job["status"] in ["completed", "failed", "cancelled"]:
                 break
                 
@@ -645,3 +692,36 @@ async def get_job_result_weight_loss(job_id: str, db: AsyncSession = Depends(get
         ORDER BY ig.name
     """), {"job_id": job_id})
     return [dict(r) for r in rs.mappings().all()]
+
+@router.get("/{job_id}/results/full", response_model=dict)
+async def get_job_result_full(job_id: str, format: str = "nested", db: AsyncSession = Depends(get_db)):
+    if format not in ("nested", "columnar"):
+        raise HTTPException(status_code=422, detail="format must be 'nested' or 'columnar'")
+    rs = await db.execute(text("select result_bundle from jobs where id = :job_id"), {"job_id": job_id})
+    result = rs.mappings().first()
+    if not result:
+        raise HTTPException(status_code=404, detail="Job not found")
+    bundle = result["result_bundle"]
+    if isinstance(bundle, str):
+        bundle = json.loads(bundle)
+    if not bundle:
+        raise HTTPException(status_code=404, detail="Job results not found")
+    if format == "nested":
+        # legacy nested tables, built from the stored arrays on request
+        return to_nested(bundle)
+    if not is_columnar(bundle):
+        raise HTTPException(status_code=404, detail="Job results are not stored in columnar format")
+    return bundle
+
+@router.get("/{job_id}/results/duals", response_model=dict)
+async def get_job_result_duals(job_id: str, db: AsyncSession = Depends(get_db)):
+    rs = await db.execute(text("select result_bundle from jobs where id = :job_id"), {"job_id": job_id})
+    result = rs.mappings().first()
+    if not result:
+        raise HTTPException(status_code=404, detail="Job not found")
+    bundle = result["result_bundle"]
+    if isinstance(bundle, str):
+        bundle = json.loads(bundle)
+    if not bundle or not bundle.get("duals"):
+        raise HTTPException(status_code=404, detail="Job duals not found")
+    return bundle["duals"]
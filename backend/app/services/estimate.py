@@ -0,0 +1,106 @@
+"""
+Job Estimate Service
+
+Estimates a job before it runs: the variables, binaries and constraints of its model,
+counted from the mission data built from the job configuration tables (nothing is
+built or solved), and its build time, solve time and memory, predicted by a
+regression over the run stats the worker records for every solved job
+(jobs.solver_status.run_stats). Uses the optimization worker's own estimate module
+(ares_shared.estimate, from the shared package like the validator).
+
+The estimate routes the job to its request lane, and lets run_job refuse jobs above
+the configured admission limits.
+"""
+
+import json
+from typing import Dict, Any, List, Optional
+
+from ares_shared import estimate as _estimate
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.services.lanes import parse_lanes, lane_for
+
+
+def model_counts(mission_data: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Variables, binaries and constraints of a job's model
+
+    Args:
+        mission_data: Mission data built by MissionDataBuilder (tuple keys)
+
+    Returns:
+        {"variables", "binaries", "constraints"}
+    """
+    return _estimate.model_counts(mission_data)
+
+
+async def _history(db: AsyncSession, mode: str, backend: Optional[str]) -> List[Dict[str, Any]]:
+    """Run stats of the most recent completed jobs solved in the same mode (and backend, if the job sets one)"""
+    settings = get_settings()
+    rs = await db.execute(text("""
+        SELECT solver_status -> 'run_stats' AS run_stats
+        FROM jobs
+        WHERE status = 'completed' AND solver_status -> 'run_stats' IS NOT NULL
+        ORDER BY completed_at DESC
+        LIMIT :limit
+    """), {"limit": settings.ESTIMATE_HISTORY_RUNS})
+    runs = []
+    for row in rs.mappings().all():
+        stats = row["run_stats"]
+        if isinstance(stats, str):
+            stats = json.loads(stats)
+        if stats.get("mode", "full") == mode and (backend is None or stats.get("backend") == backend):
+            runs.append(stats)
+    return runs
+
+
+async def estimate_job(db: AsyncSession, job_id: str, mission_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Estimate a job before it runs
+
+    Args:
+        db: Database session
+        job_id: Job ID
+        mission_data: Mission data built by MissionDataBuilder for the job
+
+    Returns:
+        {"job_id", "variables", "binaries", "constraints", "mode", "lane",
+         "predicted": {"build_seconds", "solve_seconds", "memory_mb"} (None without enough history),
+         "history_runs": {measure: runs fitted}, "warnings": [...], "admission": [...]}
+        where "admission" lists the admission limits the job exceeds
+    """
+    settings = get_settings()
+    params = mission_data.get("params") or {}
+    counts = model_counts(mission_data)
+    mode = _estimate.job_mode(params, len(mission_data.get("weeks") or ()))
+
+    models = _estimate.fit(await _history(db, mode, params.get("backend")))
+    predicted = _estimate.predict(models, counts)
+
+    warnings = []
+    solve_seconds = predicted["solve_seconds"]
+    if solve_seconds is not None and solve_seconds > settings.ESTIMATE_WARN_SECONDS:
+        warnings.append(f"Predicted solve time {solve_seconds / 60:.0f} min would tie up a worker; "
+                        "consider params.mode 'preview' or a rolling horizon")
+    if solve_seconds is None:
+        warnings.append(f"Not enough completed {mode} runs to predict run times (need {_estimate.MIN_RUNS})")
+
+    admission = []
+    if settings.ADMISSION_MAX_SOLVE_SECONDS and solve_seconds is not None and solve_seconds > settings.ADMISSION_MAX_SOLVE_SECONDS:
+        admission.append(f"predicted solve time {solve_seconds:.0f}s exceeds {settings.ADMISSION_MAX_SOLVE_SECONDS:.0f}s")
+    memory_mb = predicted["memory_mb"]
+    if settings.ADMISSION_MAX_MEMORY_MB and memory_mb is not None and memory_mb > settings.ADMISSION_MAX_MEMORY_MB:
+        admission.append(f"predicted memory {memory_mb:.0f} MB exceeds {settings.ADMISSION_MAX_MEMORY_MB:.0f} MB")
+
+    return {
+        "job_id": job_id,
+        **counts,
+        "mode": mode,
+        "lane": lane_for(counts["variables"], parse_lanes(settings.JOB_LANES), params),
+        "predicted": predicted,
+        "history_runs": {measure: model["runs"] for measure, model in models.items()},
+        "warnings": warnings,
+        "admission": admission,
+    }
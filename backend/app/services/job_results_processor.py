@@ -12,8 +12,40 @@ import logging
 import uuid
 import json
 
+from app.services.result_format import is_columnar, decode_families
+
 logger = logging.getLogger(__name__)
 
+# Row inserts of the per-week result tables (shared by the nested and columnar result formats)
+INSERT_SCHEDULE = text("""
+    INSERT INTO job_result_schedule (
+        job_id, week, recipe_id, processed_kg, is_running, materials_processed
+    ) VALUES (
+        :job_id, :week, :recipe_id, :processed_kg, :is_running, :materials_processed
+    )
+""")
+INSERT_OUTPUT = text("""
+    INSERT INTO job_result_outputs (
+        job_id, output_id, week, produced_kg, inventory_kg
+    ) VALUES (
+        :job_id, :output_id, :week, :produced_kg, :inventory_kg
+    )
+""")
+INSERT_SUBSTITUTE = text("""
+    INSERT INTO job_result_substitutes (
+        job_id, substitute_id, week, made, inventory, used_for_items
+    ) VALUES (
+        :job_id, :substitute_id, :week, :made, :inventory, :used_for_items
+    )
+""")
+INSERT_ITEM = text("""
+    INSERT INTO job_result_items (
+        job_id, item_id, week, used_total, used_carried, shortage
+    ) VALUES (
+        :job_id, :item_id, :week, :used_total, :used_carried, :shortage
+    )
+""")
+
 
 class JobResultsProcessor:
     """Processes and saves optimization results to database"""
@@ -30,7 +62,7 @@ class JobResultsProcessor:
                 - request_id: Request ID
                 - job_id: Job ID 
                 - status: 'success' or 'failed'
-                - results: Optimization results data
+                - results: Optimization results data (nested tables or columnar arrays)
                 - error_message: Error message if failed
                 
         Returns:
@@ -88,6 +120,43 @@ class JobResultsProcessor:
             await self.db.rollback()
             return False
     
+    async def process_progress_event(self, event: Dict[str, Any]) -> bool:
+        """
+        Save a solver progress event to the job's log
+        
+        Args:
+            event: Progress event from the progress queue containing:
+                - job_id: Job ID
+                - incumbent: Objective of the best plan found so far (None if none yet)
+                - bound: Best proven bound on the objective
+                - gap: Relative gap between incumbent and bound
+                - elapsed: Seconds since the solve started
+                
+        Returns:
+            True if processed successfully, False otherwise
+        """
+        try:
+            job_id = event.get('job_id')
+            if not job_id:
+                logger.error(f"No job_id in progress event: {event}")
+                return False
+            
+            progress = {key: event.get(key) for key in ('incumbent', 'bound', 'gap', 'elapsed')}
+            await self.db.execute(text("""
+                INSERT INTO job_logs (id, job_id, ts, level, message)
+                VALUES (gen_random_uuid(), :job_id, now(), 'progress', :message)
+            """), {
+                "job_id": job_id,
+                "message": json.dumps(progress)
+            })
+            await self.db.commit()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error processing progress event: {e}")
+            await self.db.rollback()
+            return False
+    
     async def _save_successful_results(self, job_id: str, results: Dict[str, Any]):
         """Save successful optimization results to database tables"""
         
@@ -97,17 +166,21 @@ class JobResultsProcessor:
         # Save summary
         await self._save_summary(job_id, results.get('summary', {}))
         
-        # Save schedule
-        await self._save_schedule(job_id, results.get('schedule', []))
-        
-        # Save outputs
-        await self._save_outputs(job_id, results.get('outputs', []))
-        
-        # Save substitutes
-        await self._save_substitutes(job_id, results.get('substitutes', []))
-        
-        # Save items
-        await self._save_items(job_id, results.get('items', []))
+        if is_columnar(results):
+            # Save schedule, outputs, substitutes and items straight from the result arrays
+            await self._save_columnar_tables(job_id, results)
+        else:
+            # Save schedule
+            await self._save_schedule(job_id, results.get('schedule', []))
+            
+            # Save outputs
+            await self._save_outputs(job_id, results.get('outputs', []))
+            
+            # Save substitutes
+            await self._save_substitutes(job_id, results.get('substitutes', []))
+            
+            # Save items
+            await self._save_items(job_id, results.get('items', []))
         
         # Save substitute breakdown
         summary = results.get('summary', {})
@@ -170,13 +243,7 @@ class JobResultsProcessor:
                 method_recipe_ids = await self._get_method_recipe_ids(job_id, method_key)
                 
                 for recipe_id in method_recipe_ids:
-                    await self.db.execute(text("""
-                        INSERT INTO job_result_schedule (
-                            job_id, week, recipe_id, processed_kg, is_running, materials_processed
-                        ) VALUES (
-                            :job_id, :week, :recipe_id, :processed_kg, :is_running, :materials_processed
-                        )
-                    """), {
+                    await self.db.execute(INSERT_SCHEDULE, {
                         "job_id": job_id,
                         "week": week,
                         "recipe_id": recipe_id,
@@ -197,13 +264,7 @@ class JobResultsProcessor:
                 continue
             
             for week_data in weeks_data:
-                await self.db.execute(text("""
-                    INSERT INTO job_result_outputs (
-                        job_id, output_id, week, produced_kg, inventory_kg
-                    ) VALUES (
-                        :job_id, :output_id, :week, :produced_kg, :inventory_kg
-                    )
-                """), {
+                await self.db.execute(INSERT_OUTPUT, {
                     "job_id": job_id,
                     "output_id": output_id,
                     "week": week_data.get('week'),
@@ -223,13 +284,7 @@ class JobResultsProcessor:
                 continue
             
             for week_data in weeks_data:
-                await self.db.execute(text("""
-                    INSERT INTO job_result_substitutes (
-                        job_id, substitute_id, week, made, inventory, used_for_items
-                    ) VALUES (
-                        :job_id, :substitute_id, :week, :made, :inventory, :used_for_items
-                    )
-                """), {
+                await self.db.execute(INSERT_SUBSTITUTE, {
                     "job_id": job_id,
                     "substitute_id": substitute_id,
                     "week": week_data.get('week'),
@@ -250,13 +305,7 @@ class JobResultsProcessor:
                 continue
             
             for week_data in weeks_data:
-                await self.db.execute(text("""
-                    INSERT INTO job_result_items (
-                        job_id, item_id, week, used_total, used_carried, shortage
-                    ) VALUES (
-                        :job_id, :item_id, :week, :used_total, :used_carried, :shortage
-                    )
-                """), {
+                await self.db.execute(INSERT_ITEM, {
                     "job_id": job_id,
                     "item_id": item_id,
                     "week": week_data.get('week'),
@@ -264,7 +313,80 @@ class JobResultsProcessor:
                     "used_carried": week_data.get('used_carried', 0),
                     "shortage": week_data.get('shortage', 0)
                 })
-    
+
+    async def _save_columnar_tables(self, job_id: str, results: Dict[str, Any]):
+        """Save schedule, outputs, substitutes and items rows from the arrays of columnar results"""
+        values = decode_families(results)
+        weeks = results.get('weeks', [])
+        entities = results.get('entities', {})
+        materials = entities.get('materials', [])
+        methods = entities.get('methods', [])
+        items = entities.get('items', [])
+        T, R, K = len(weeks), len(methods), len(items)
+
+        def row(name, n):
+            # values of entity n over the weeks (families are entity-major, weeks last)
+            return values[name][n * T:(n + 1) * T]
+
+        # Schedule: one row per recipe of the method and week; P is materials x methods x weeks
+        rows = []
+        for j, method_key in enumerate(methods):
+            method_recipe_ids = await self._get_method_recipe_ids(job_id, method_key)
+            if not method_recipe_ids:
+                continue
+            processed, running = row('Q', j), row('y', j)
+            for i, week in enumerate(weeks):
+                materials_processed = json.dumps({mat: values['P'][(m * R + j) * T + i] for m, mat in enumerate(materials)})
+                for recipe_id in method_recipe_ids:
+                    rows.append({
+                        "job_id": job_id, "week": week, "recipe_id": recipe_id, "processed_kg": processed[i],
+                        "is_running": running[i] == 1, "materials_processed": materials_processed
+                    })
+        if rows:
+            await self.db.execute(INSERT_SCHEDULE, rows)
+
+        # Outputs
+        rows = []
+        for n, output_key in enumerate(entities.get('outputs', [])):
+            output_id = await self._get_entity_id('outputs_global', output_key)
+            if not output_id:
+                continue
+            rows.extend(
+                {"job_id": job_id, "output_id": output_id, "week": week, "produced_kg": produced, "inventory_kg": inventory}
+                for week, produced, inventory in zip(weeks, row('Oprod', n), row('Oinv', n))
+            )
+        if rows:
+            await self.db.execute(INSERT_OUTPUT, rows)
+
+        # Substitutes; sub_used_for is substitutes x items x weeks
+        rows = []
+        for n, substitute_key in enumerate(entities.get('substitutes', [])):
+            substitute_id = await self._get_entity_id('substitutes_global', substitute_key)
+            if not substitute_id:
+                continue
+            for i, (week, made, inventory) in enumerate(zip(weeks, row('make_sub', n), row('sub_inv', n))):
+                used_for = {k: values['sub_used_for'][(n * K + c) * T + i] for c, k in enumerate(items)}
+                rows.append({
+                    "job_id": job_id, "substitute_id": substitute_id, "week": week, "made": made,
+                    "inventory": inventory, "used_for_items": json.dumps(used_for)
+                })
+        if rows:
+            await self.db.execute(INSERT_SUBSTITUTE, rows)
+
+        # Items
+        rows = []
+        for n, item_key in enumerate(items):
+            item_id = await self._get_entity_id('items_global', item_key)
+            if not item_id:
+                continue
+            rows.extend(
+                {"job_id": job_id, "item_id": item_id, "week": week, "used_total": used,
+                 "used_carried": carried, "shortage": shortage}
+                for week, used, carried, shortage in zip(weeks, row('item_used', n), row('carried_used', n), row('item_short', n))
+            )
+        if rows:
+            await self.db.execute(INSERT_ITEM, rows)
+
     async def _save_substitute_breakdown(self, job_id: str, breakdown: Dict[str, Any]):
         """Save substitute breakdown totals"""
         for substitute_key, total_made in breakdown.items():
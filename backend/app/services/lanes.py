@@ -0,0 +1,65 @@
+"""
+Request Lanes Service
+
+Routes optimization requests by job size to the worker's size-class queues ("lanes"),
+using the optimization worker's own lanes module (ares_shared.lanes, from the shared
+package like the validator), so the producer and the workers agree on the size
+classes and their queue names. Jobs are sized by app.services.estimate, scaled down
+for previews and summary-only results (ares_shared.lanes.job_size).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from ares_shared import lanes as _lanes
+
+DEFAULT_LANES = _lanes.DEFAULT_LANES
+
+
+def parse_lanes(spec: Optional[str]) -> List[Tuple[str, Optional[int]]]:
+    """
+    Parse size classes
+
+    Args:
+        spec: "name:max_size,...,name" from the smallest class up (None for the default lanes)
+
+    Returns:
+        [(name, max_size or None), ...]
+    """
+    return _lanes.parse_lanes(spec or DEFAULT_LANES)
+
+
+def lane_for(size: int, lanes: List[Tuple[str, Optional[int]]], params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Lane of a job
+
+    Args:
+        size: Model variables of the job (see app.services.estimate.model_counts)
+        lanes: Size classes (see parse_lanes)
+        params: Job params (previews and summary-only results go by a smaller size)
+
+    Returns:
+        Lane name
+    """
+    return _lanes.lane_for(_lanes.job_size(size, params), lanes)
+
+
+def route(size: int, lanes: List[Tuple[str, Optional[int]]], input_queue: str,
+          params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Lane queue of a job
+
+    Args:
+        size: Model variables of the job (see app.services.estimate.model_counts)
+        lanes: Size classes (see parse_lanes)
+        input_queue: Base input queue name
+        params: Job params (previews and summary-only results go by a smaller size)
+
+    Returns:
+        Queue name
+    """
+    return _lanes.lane_queue(input_queue, lane_for(size, lanes, params))
+
+
+def lane_queues(lanes: List[Tuple[str, Optional[int]]], input_queue: str) -> List[str]:
+    """Queue names of all lanes"""
+    return [_lanes.lane_queue(input_queue, name) for name, _ in lanes]
@@ -7,8 +7,11 @@ It queries all necessary tables and transforms the data into the format expected
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import logging
+import json
+
+from app.services.result_format import solution_tables
 
 logger = logging.getLogger(__name__)
 
@@ -95,20 +98,55 @@ class MissionDataBuilder:
                 'make': job_data['w_make'],
                 'carry': job_data['w_carry'],
                 'shortage': job_data['w_shortage']
-            }
+            },
+            
+            # Solve options (from job params, e.g. {"backend": "matrix"})
+            'params': job_data['params']
         }
         
+        # Previous solution of this job, used by the worker as a MIP start on re-runs
+        if job_data['params'].get('warm_start', True):
+            previous_solution = await self._get_previous_solution(job_id)
+            if previous_solution:
+                mission_data['warm_start'] = previous_solution
+        
         logger.info(f"Successfully built mission data for job {job_id}")
         return mission_data
     
     async def _get_job_data(self, job_id: str) -> Dict[str, Any]:
         """Get job basic data"""
         rs = await self.db.execute(text("""
-            SELECT total_weeks, w_mass, w_value, w_crew, w_energy, w_risk, w_make, w_carry, w_shortage
+            SELECT total_weeks, w_mass, w_value, w_crew, w_energy, w_risk, w_make, w_carry, w_shortage, params
             FROM jobs WHERE id = :job_id
         """), {"job_id": job_id})
         result = rs.mappings().first()
-        return dict(result) if result else None
+        if not result:
+            return None
+        job_data = dict(result)
+        # Parse JSON params if it's a string
+        if isinstance(job_data.get('params'), str):
+            try:
+                job_data['params'] = json.loads(job_data['params'])
+            except json.JSONDecodeError:
+                job_data['params'] = {}
+        job_data['params'] = job_data.get('params') or {}
+        return job_data
+    
+    async def _get_previous_solution(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the solution tables (nested tables or columnar families) of the job's last result bundle"""
+        rs = await self.db.execute(text("""
+            SELECT result_bundle FROM jobs WHERE id = :job_id
+        """), {"job_id": job_id})
+        result = rs.mappings().first()
+        bundle = result['result_bundle'] if result else None
+        if isinstance(bundle, str):
+            try:
+                bundle = json.loads(bundle)
+            except json.JSONDecodeError:
+                bundle = None
+        if not bundle:
+            return None
+        return solution_tables(bundle)
     
     async def _get_enabled_entity_keys(self, job_id: str, entity_type: str) -> List[str]:
         """Get enabled entity keys for a job"""
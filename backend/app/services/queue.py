@@ -10,6 +10,8 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from app.services.mission_data_builder import MissionDataBuilder
 from app.services.job_results_processor import JobResultsProcessor
+from app.services.lanes import parse_lanes, route, lane_queues
+from app.services.estimate import model_counts
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -23,9 +25,12 @@ class DecimalEncoder(json.JSONEncoder):
 class QueueProducer:
     """Producer for sending optimization requests to the queue"""
     
-    def __init__(self, rabbitmq_host: str = "localhost", input_queue: str = "optimization_requests"):
+    def __init__(self, rabbitmq_host: str = "localhost", input_queue: str = "optimization_requests",
+                 lanes: Optional[str] = None):
         self.rabbitmq_host = rabbitmq_host
         self.input_queue = input_queue
+        # requests go to the queue of their size class ("<input_queue>.<lane>")
+        self.lanes = parse_lanes(lanes)
         self.connection = None
         self.channel = None
     
@@ -36,7 +41,8 @@ class QueueProducer:
                 pika.ConnectionParameters(host=self.rabbitmq_host)
             )
             self.channel = self.connection.channel()
-            self.channel.queue_declare(queue=self.input_queue, durable=True)
+            for lane_queue in lane_queues(self.lanes, self.input_queue):
+                self.channel.queue_declare(queue=lane_queue, durable=True)
             print(f"Connected to RabbitMQ at {self.rabbitmq_host}")
         except Exception as e:
             print(f"Failed to connect to RabbitMQ: {e}")
@@ -102,13 +108,16 @@ class QueueProducer:
             mission_data = await builder.build_mission_data(job_id)
             return mission_data
     
-    async def publish_optimization_request(self, job_id: str, optimization_params: Optional[Dict] = None) -> str:
+    async def publish_optimization_request(self, job_id: str, optimization_params: Optional[Dict] = None,
+                                           optimization_data: Optional[Dict] = None, job_size: Optional[int] = None) -> str:
         """
         Publish optimization request to the queue
         
         Args:
             job_id: Job ID to optimize
             optimization_params: Optional additional parameters
+            optimization_data: Mission data already built for the job (fetched from the database if None)
+            job_size: Model variables of the job from its estimate (counted from the data if None)
             
         Returns:
             Request ID for tracking
@@ -119,17 +128,25 @@ class QueueProducer:
                 raise RuntimeError("Queue not connected. Call connect() first.")
             
             # Fetch mission data from database
-            optimization_data = await self.fetch_mission_data(job_id)
+            if optimization_data is None:
+                optimization_data = await self.fetch_mission_data(job_id)
             
             # Apply any custom optimization parameters
             if optimization_params:
                 if 'weights' in optimization_params:
                     optimization_data['weights'].update(optimization_params['weights'])
+                if 'params' in optimization_params:
+                    optimization_data['params'].update(optimization_params['params'])
                 # Add other parameter overrides as needed
             
             # Add job ID for tracking
             optimization_data['job_id'] = job_id
             
+            # Route by model size (smaller for previews and summary-only results), so small jobs do not wait behind large ones
+            if job_size is None:
+                job_size = model_counts(optimization_data)['variables']
+            lane_queue = route(job_size, self.lanes, self.input_queue, optimization_data.get('params'))
+            
             # Convert tuple keys to strings for JSON serialization
             serializable_data = self.convert_tuple_keys_to_strings(optimization_data)
             
@@ -144,7 +161,7 @@ class QueueProducer:
             # Publish to queue
             self.channel.basic_publish(
                 exchange='',
-                routing_key=self.input_queue,
+                routing_key=lane_queue,
                 body=json.dumps(message, cls=DecimalEncoder),
                 properties=pika.BasicProperties(
                     delivery_mode=2,  # Make message persistent
@@ -153,7 +170,7 @@ class QueueProducer:
                 )
             )
             
-            print(f"Published optimization request {job_id} for job {job_id}")
+            print(f"Published optimization request {job_id} for job {job_id} to {lane_queue} (size {job_size})")
             return job_id
             
         except Exception as e:
@@ -170,11 +187,13 @@ class QueueProducer:
 
 
 class QueueConsumer:
-    """Consumer for receiving optimization results from the queue"""
+    """Consumer for receiving optimization results (and solver progress events) from the queue"""
     
-    def __init__(self, rabbitmq_host: str = "localhost", output_queue: str = "optimization_responses"):
+    def __init__(self, rabbitmq_host: str = "localhost", output_queue: str = "optimization_responses",
+                 progress_queue: str = "optimization_progress"):
         self.rabbitmq_host = rabbitmq_host
         self.output_queue = output_queue
+        self.progress_queue = progress_queue
         self.connection = None
         self.channel = None
     
@@ -186,6 +205,7 @@ class QueueConsumer:
             )
             self.channel = self.connection.channel()
             self.channel.queue_declare(queue=self.output_queue, durable=True)
+            self.channel.queue_declare(queue=self.progress_queue, durable=True)
             print(f"Connected to RabbitMQ at {self.rabbitmq_host}")
         except Exception as e:
             print(f"Failed to connect to RabbitMQ: {e}")
@@ -298,9 +318,45 @@ class QueueConsumer:
         Returns:
             True if saved successfully, False otherwise
         """
+        async def save(processor: JobResultsProcessor) -> bool:
+            success = await processor.process_optimization_result(result)
+            if success:
+                job_id = result.get('request_id', 'unknown')
+                print(f"Successfully saved optimization result for request {job_id}")
+            else:
+                print("Failed to save optimization result")
+            return success
+        
+        return self._run_with_isolated_processor(save)
+    
+    def save_progress_to_database_sync(self, event: Dict[str, Any]) -> bool:
+        """
+        Synchronous wrapper for saving a solver progress event to database
+        
+        Args:
+            event: Progress event (job_id, incumbent, bound, gap, elapsed)
+            
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        async def save(processor: JobResultsProcessor) -> bool:
+            return await processor.process_progress_event(event)
+        
+        return self._run_with_isolated_processor(save)
+    
+    def _run_with_isolated_processor(self, handler) -> bool:
+        """
+        Run `handler(processor)` against an isolated database engine on a fresh event loop
+        
+        Args:
+            handler: Async function taking a JobResultsProcessor and returning success
+            
+        Returns:
+            True if the handler succeeded, False otherwise
+        """
         try:
             # Create a completely isolated database operation
-            async def isolated_save():
+            async def isolated_run():
                 engine = None
                 session = None
                 try:
@@ -326,15 +382,7 @@ class QueueConsumer:
                     session = SessionLocal()
                     
                     processor = JobResultsProcessor(session)
-                    success = await processor.process_optimization_result(result)
-                    
-                    if success:
-                        job_id = result.get('request_id', 'unknown')
-                        print(f"Successfully saved optimization result for request {job_id}")
-                        return True
-                    else:
-                        print(f"Failed to save optimization result")
-                        return False
+                    return await handler(processor)
                         
                 except Exception as e:
                     print(f"Error saving result to database: {e}")
@@ -360,7 +408,7 @@ class QueueConsumer:
             new_loop = asyncio.new_event_loop()
             asyncio.set_event_loop(new_loop)
             try:
-                success = new_loop.run_until_complete(isolated_save())
+                success = new_loop.run_until_complete(isolated_run())
                 return success
             finally:
                 new_loop.close()
@@ -379,7 +427,8 @@ class QueueConsumer:
                 print(f"Received optimization result: {job_id}")
 
                 # Use the synchronous wrapper to avoid event loop conflicts
-                print(f"Saving optimization result to database: {result}")
+                print(f"Saving optimization result to database: {job_id} "
+                      f"({(result.get('results') or {}).get('format', 'nested')} results)")
                 success = self.save_result_to_database_sync(result)
                 
                 if success:
@@ -396,11 +445,27 @@ class QueueConsumer:
                 print(f"Error processing result: {e}")
                 ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
 
+        def progress_callback(ch, method, properties, body):
+            # Progress events are best effort: never requeue them
+            try:
+                event = json.loads(body)
+                if not self.save_progress_to_database_sync(event):
+                    print(f"Failed to save progress event for job {event.get('job_id', 'unknown')}")
+            except json.JSONDecodeError as e:
+                print(f"Invalid JSON in progress message: {e}")
+            except Exception as e:
+                print(f"Error processing progress event: {e}")
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+
         # Start consuming
         self.channel.basic_consume(
             queue=self.output_queue,
             on_message_callback=callback
         )
+        self.channel.basic_consume(
+            queue=self.progress_queue,
+            on_message_callback=progress_callback
+        )
 
         print("Waiting for optimization results. To exit press CTRL+C")
         self.channel.start_consuming()
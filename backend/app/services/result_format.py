@@ -0,0 +1,57 @@
+"""
+Result Format Service
+
+Reads columnar optimization results (params.results == "columnar", the worker default)
+with the optimization worker's own format module (ares_shared.result_format, from the
+shared package like the validator). Results are ingested straight from
+their arrays; the nested schedule/outputs/substitutes/items tables are only built for
+clients that ask for them.
+"""
+
+from typing import Dict, Any, List, Optional
+
+from ares_shared import result_format as _result_format
+
+
+def is_columnar(results: Dict[str, Any]) -> bool:
+    """True if the results are in the columnar format"""
+    return bool(results) and results.get("format") == "columnar"
+
+
+def decode_families(results: Dict[str, Any]) -> Dict[str, List]:
+    """
+    Decode the variable families of columnar results
+
+    Args:
+        results: Columnar optimization results
+
+    Returns:
+        {family: flat list of values over its dims, weeks last}
+    """
+    return _result_format.decode(results)
+
+
+def to_nested(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Nested (legacy) form of optimization results
+
+    Args:
+        results: Columnar or nested optimization results
+
+    Returns:
+        Results with schedule/outputs/substitutes/items tables
+    """
+    return _result_format.to_nested(results)
+
+
+def solution_tables(results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Parts of optimization results used as a warm start
+
+    Args:
+        results: Optimization results in any format
+
+    Returns:
+        Nested tables or columnar families, or None if the results have neither
+    """
+    return _result_format.solution_tables(results)
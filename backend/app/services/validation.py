@@ -0,0 +1,25 @@
+"""
+Mission Data Validation Service
+
+Runs the optimization worker's validator (ares_shared.validation, from the shared/
+package both sides install) on the mission data built for a job, so malformed jobs
+are rejected before they are queued. The package only needs the standard library,
+keeping a single definition of valid mission data.
+"""
+
+from typing import Dict, Any, List
+
+from ares_shared import validation as _validation
+
+
+def validate_mission_data(mission_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Validate mission data built by MissionDataBuilder (tuple keys, int weeks)
+
+    Args:
+        mission_data: Mission data dictionary
+
+    Returns:
+        List of {"field", "key", "message"} errors; empty if the data is valid
+    """
+    return _validation.validate(mission_data)
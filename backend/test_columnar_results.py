@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for columnar result ingestion
+
+Saves the same optimization result twice, once from its columnar arrays
+(JobResultsProcessor._save_columnar_tables) and once from the nested tables
+rebuilt from them (to_nested, then the per-table savers), and checks that both
+write the same schedule, outputs, substitutes and items rows. The database is
+replaced by a session that records the inserts, so no server is needed.
+"""
+
+import array
+import asyncio
+import base64
+import sys
+
+from app.services.job_results_processor import JobResultsProcessor
+from app.services.result_format import to_nested
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return self._rows
+
+
+class RecordingSession:
+    """Answers entity / recipe lookups and records every inserted row per table"""
+
+    def __init__(self):
+        self.inserts = {}
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "SELECT DISTINCT r.id" in sql:
+            return _Rows([{"id": f"recipe-{params['method_key']}-{n}"} for n in range(2)])
+        if "SELECT id FROM" in sql:
+            return _Rows([{"id": f"id-{params['key']}"}])
+        table = sql.split("INSERT INTO")[1].split("(")[0].strip()
+        for row in params if isinstance(params, list) else [params]:
+            self.inserts.setdefault(table, []).append(row)
+        return _Rows([])
+
+
+def pack(values, typecode, dtype, sparse=False):
+    """Columnar family of flat values (little-endian base64, see result_format)"""
+    family = {"dtype": dtype}
+    if sparse:
+        index = [i for i, v in enumerate(values) if v]
+        family["index"] = _b64(array.array("i", index))
+        values = [values[i] for i in index]
+    family["data"] = _b64(array.array(typecode, values))
+    return family
+
+
+def _b64(values):
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def build_columnar_result():
+    """Columnar result over 3 weeks, 2 materials, 2 methods, 1 output, 2 items, 1 substitute"""
+    weeks = [1, 2, 3]
+    entities = {
+        "materials": ["plastic", "textile"], "methods": ["extrude", "compress"],
+        "outputs": ["filament"], "items": ["spare_part", "insulation_patch"], "substitutes": ["printed_part"],
+    }
+    dense = {
+        "Q": (["methods", "weeks"], [5.0, 0.0, 2.5, 0.0, 3.0, 1.0]),
+        "Oprod": (["outputs", "weeks"], [4.0, 0.3, 2.0]),
+        "Oinv": (["outputs", "weeks"], [9.0, 6.3, 5.3]),
+        "make_sub": (["substitutes", "weeks"], [3.0, 3.0, 0.0]),
+        "sub_inv": (["substitutes", "weeks"], [3.0, 1.0, 0.0]),
+        "item_used": (["items", "weeks"], [5.0, 0.0, 4.0, 0.0, 4.0, 0.0]),
+        "carried_used": (["items", "weeks"], [5.0, 0.0, 2.0, 0.0, 4.0, 0.0]),
+    }
+    sparse = {
+        # materials x methods x weeks
+        "P": (["materials", "methods", "weeks"], [5.0, 0.0, 2.5, 0.0, 1.0, 1.0, 0.0, 0.0, 0.0, 0.0, 2.0, 0.0]),
+        # substitutes x items x weeks
+        "sub_used_for": (["substitutes", "items", "weeks"], [0.0, 2.0, 2.0, 0.0, 0.0, 0.0]),
+        "item_short": (["items", "weeks"], [0.0, 0.0, 0.0, 0.0, 0.0, 0.5]),
+    }
+    families = {name: {"dims": dims, **pack(values, "d", "<f8")} for name, (dims, values) in dense.items()}
+    families.update({name: {"dims": dims, **pack(values, "d", "<f8", sparse=True)} for name, (dims, values) in sparse.items()})
+    families["y"] = {"dims": ["methods", "weeks"], **pack([1, 0, 1, 0, 1, 1], "b", "|i1")}
+    return {
+        "format": "columnar",
+        "weeks": weeks,
+        "entities": entities,
+        "families": families,
+        "summary": {"objective_value": 12.5},
+        "solver_status": {"status": "ok", "termination_condition": "optimal"},
+    }
+
+
+async def test_columnar_rows_match_nested_rows():
+    """Rows saved from the arrays equal the rows saved from the nested tables"""
+    results = build_columnar_result()
+    nested = to_nested(results)
+
+    columnar_db = RecordingSession()
+    await JobResultsProcessor(columnar_db)._save_columnar_tables("job-1", results)
+
+    nested_db = RecordingSession()
+    processor = JobResultsProcessor(nested_db)
+    await processor._save_schedule("job-1", nested["schedule"])
+    await processor._save_outputs("job-1", nested["outputs"])
+    await processor._save_substitutes("job-1", nested["substitutes"])
+    await processor._save_items("job-1", nested["items"])
+
+    def key(row):
+        return sorted(row.items())
+
+    tables = ("job_result_schedule", "job_result_outputs", "job_result_substitutes", "job_result_items")
+    ok = True
+    for table in tables:
+        columnar_rows = sorted(columnar_db.inserts.get(table, []), key=key)
+        nested_rows = sorted(nested_db.inserts.get(table, []), key=key)
+        same = bool(columnar_rows) and columnar_rows == nested_rows
+        ok = ok and same
+        print(f"{'✅' if same else '❌'} {table}: {len(columnar_rows)} columnar rows, {len(nested_rows)} nested rows")
+
+    # spot checks against the arrays
+    schedule = columnar_db.inserts["job_result_schedule"]
+    running = {(row["recipe_id"], row["week"]): row["is_running"] for row in schedule}
+    ok = ok and len(schedule) == 2 * 2 * 3  # methods x recipes per method x weeks
+    ok = ok and running[("recipe-compress-0", 1)] is False and running[("recipe-compress-0", 2)] is True
+    short = {(row["item_id"], row["week"]): row["shortage"] for row in columnar_db.inserts["job_result_items"]}
+    ok = ok and short[("id-insulation_patch", 3)] == 0.5 and short[("id-spare_part", 3)] == 0.0
+    print(f"{'✅' if ok else '❌'} Columnar ingestion matches the nested tables")
+    return ok
+
+
+async def main():
+    """Main test function"""
+    ok = await test_columnar_rows_match_nested_rows()
+    print("\n" + "=" * 50)
+    print("All tests passed!" if ok else "Tests failed!")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -2,6 +2,7 @@
 Configuration for the optimization worker
 """
 import os
+from ares_shared.lanes import DEFAULT_LANES, parse_lanes
 
 
 class Config:
@@ -12,14 +13,37 @@ class Config:
     RABBITMQ_PORT = int(os.getenv('RABBITMQ_PORT', 5672))
     RABBITMQ_USER = os.getenv('RABBITMQ_USER', 'guest')
     RABBITMQ_PASS = os.getenv('RABBITMQ_PASS', 'guest')
+    HEARTBEAT = int(os.getenv('RABBITMQ_HEARTBEAT', 60))  # seconds; solves run off the connection thread, so it keeps answering
     
     # Queue names
     INPUT_QUEUE = os.getenv('INPUT_QUEUE', 'optimization_requests')
     OUTPUT_QUEUE = os.getenv('OUTPUT_QUEUE', 'optimization_responses')
+    PROGRESS_QUEUE = os.getenv('PROGRESS_QUEUE', 'optimization_progress')  # incumbent/bound events while solving
+    # Size-aware lanes (see ares_shared.lanes): size classes "name:max_size,...,name" (must match the backend's JOB_LANES),
+    # and the lanes this worker consumes as "name:weight,..." (weight = most of its requests solved at once; empty = all)
+    JOB_LANES = parse_lanes(os.getenv('JOB_LANES', DEFAULT_LANES))
+    WORKER_LANES = os.getenv('WORKER_LANES', '')
     
     # Worker settings
-    PREFETCH_COUNT = int(os.getenv('PREFETCH_COUNT', 1))  # Process one message at a time
+    WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', os.cpu_count() or 1))  # jobs solved at once, each in its own process
+    PREFETCH_COUNT = int(os.getenv('PREFETCH_COUNT', 0))  # unacknowledged requests taken at once (0 = WORKER_PROCESSES)
+    SOLVER_THREADS = int(os.getenv('SOLVER_THREADS', 0))  # threads per solve of multi-threaded solvers (0 = CPUs / WORKER_PROCESSES)
+    HEALTH_INTERVAL = float(os.getenv('HEALTH_INTERVAL', 300))  # seconds between health log lines (0 = off)
     
     # Optimization settings
     SOLVER_TIMEOUT = int(os.getenv('SOLVER_TIMEOUT', 300))  # seconds
+    PROGRESS_INTERVAL = float(os.getenv('PROGRESS_INTERVAL', 2.0))  # min seconds between progress events (new incumbents always sent)
+    RESULT_FORMAT = os.getenv('RESULT_FORMAT', 'columnar')  # 'columnar', 'full' (nested tables) or 'summary'; a job's params.results overrides it
+    MODEL_BACKEND = os.getenv('MODEL_BACKEND', 'pyomo')  # 'pyomo' or 'matrix'; a job's params.backend overrides it
+    # Solver preference per backend, comma-separated (empty = backend default); a job's params.solvers overrides it
+    PYOMO_SOLVERS = [s.strip() for s in os.getenv('PYOMO_SOLVERS', '').split(',') if s.strip()]
+    MATRIX_SOLVERS = [s.strip() for s in os.getenv('MATRIX_SOLVERS', '').split(',') if s.strip()]  # ortools_cbc, ortools_scip, scipy
+    MODEL_CACHE_SIZE = int(os.getenv('MODEL_CACHE_SIZE', 4))  # built models kept for in-place re-solves of jobs with the same structure (0 = off)
+    MODEL_CACHE_MAX_SIZE = int(os.getenv('MODEL_CACHE_MAX_SIZE', 2000000))  # max variables + constraints over cached models (0 = no limit)
+    # Racing (params.race): solver strategies "backend:solver[:option=value...]" run in parallel processes;
+    # the first proven optimum wins, or the best solution found within SOLVER_TIMEOUT
+    RACE_STRATEGIES = [s.strip() for s in os.getenv(
+        'RACE_STRATEGIES', 'pyomo:highs,matrix:highs,matrix:highs:random_seed=1,pyomo:cbc,pyomo:glpk'
+    ).split(',') if s.strip()]
+    RACE_WORKERS = int(os.getenv('RACE_WORKERS', 4))  # strategies running at once
 
@@ -0,0 +1,751 @@
+# matrix_model.py
+# Requires: numpy + scipy, plus one array solver: highspy (HiGHS), OR-Tools (CBC/SCIP) or scipy.optimize.milp
+# Usage:
+#   from matrix_model import MatrixRecyclingOptimizer
+#   opt = MatrixRecyclingOptimizer()
+#   opt.setup(data_dict)
+#   opt.solve()
+#   results = opt.get_results()   # same structure as MarsRecyclingOptimizer
+
+from types import SimpleNamespace
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+from model import MarsRecyclingOptimizer, SOLUTION_FAMILIES, WEIGHT_DEFAULTS, _Value
+from progress import watch_highs
+
+
+class _FamilyView:
+    """Index a variable family as `family[key..., week]` against the current solution vector."""
+
+    def __init__(self, model, name):
+        self._model = model
+        self._name = name
+
+    def __getitem__(self, index):
+        return _Value(self._model.x[self._model.col(self._name, index[:-1], index[-1])])
+
+
+class MatrixModel:
+    """
+    Sparse MILP held as arrays:
+        maximize    c @ x
+        subject to  row_lb <= A @ x <= row_ub
+                    col_lb <= x <= col_ub,  x[integrality == 1] integer
+
+    Every variable family is a block of columns laid out entity-major over the
+    sorted weeks, so column = base + entity_pos * T + week_pos.
+    """
+
+    def __init__(self, weeks):
+        self.weeks = np.asarray(weeks)
+        self.week_pos = {t: i for i, t in enumerate(weeks)}
+        self.T = len(weeks)
+        self.families = {}   # name -> (base, {key: entity_pos})
+        self.n_cols = 0
+        self.row_blocks = {}  # name -> (base, n_rows)
+        self.n_rows = 0
+        self.c = None
+        self.A = None
+        self.row_lb = None
+        self.row_ub = None
+        self.col_lb = None
+        self.col_ub = None
+        self.integrality = None
+        self.x = None
+        self.SK = set()
+        self.MR = set()
+
+    # -- layout -------------------------------------------------------------
+    def add_family(self, name, keys):
+        self.families[name] = (self.n_cols, {k: i for i, k in enumerate(keys)})
+        self.n_cols += len(keys) * self.T
+
+    def add_rows(self, name, n_rows):
+        self.row_blocks[name] = (self.n_rows, n_rows)
+        self.n_rows += n_rows
+        return self.row_blocks[name][0]
+
+    def cols(self, name, pos):
+        """Columns of entity position `pos` in family `name` for every week (length-T array)."""
+        base = self.families[name][0]
+        return base + pos * self.T + np.arange(self.T)
+
+    def col(self, name, key, week):
+        base, positions = self.families[name]
+        key = key[0] if len(key) == 1 else tuple(key)
+        return base + positions[key] * self.T + self.week_pos[week]
+
+    def __getattr__(self, name):
+        families = self.__dict__.get("families", {})
+        if name in families:
+            return _FamilyView(self, name)
+        if name == "objective":
+            return _Value(float(self.c @ self.x) if self.x is not None else None)
+        raise AttributeError(name)
+
+
+class MatrixRecyclingOptimizer(MarsRecyclingOptimizer):
+    """
+    Same MILP as MarsRecyclingOptimizer, assembled directly as sparse coefficient
+    arrays (NumPy / scipy.sparse) instead of Pyomo expression trees, and passed to
+    the solver in memory. Input normalization, validation and get_results() are
+    shared with the Pyomo backend; storage caps and availability become column bounds.
+    API: same as MarsRecyclingOptimizer.
+    """
+
+    DEFAULT_SOLVERS = ["highs", "ortools_cbc", "ortools_scip", "scipy"]
+    THREAD_OPTIONS = {"highs": "threads", "ortools_cbc": "threads", "ortools_scip": "threads"}  # ortools: SetNumThreads
+
+    def __init__(self, preferred_solvers=None):
+        super().__init__(preferred_solvers)
+        self._highs = None            # persistent highspy instance holding self.model
+        self._highs_model = None      # the MatrixModel loaded into self._highs
+        self._progress = None         # progress.SolverProgress of the running solve
+        self._changed_cols = set()    # columns whose objective coefficient changed since the last HiGHS solve
+        self._changed_rows = set()    # rows whose bounds changed since the last HiGHS solve
+
+    # --------------------------
+    # Public API
+    # --------------------------
+    def _solve_model(self, tee, progress):
+        self._progress = progress  # reported by solvers with callbacks (highs)
+        getattr(self, f"_solve_{self.solver}")(tee)
+
+    def model_size(self) -> int:
+        if self.model is None or not hasattr(self.model, "n_cols"):
+            return 0
+        return self.model.n_cols + self.model.n_rows
+
+    # --------------------------
+    # Solver selection
+    # --------------------------
+    def _solver_handle(self, name):
+        return name  # solved by _solve_{name}; HiGHS instances belong to the optimizer (see _solve_highs)
+
+    @classmethod
+    def _probe_solver(cls, name) -> dict:
+        probe = {"available": False, "version": None, "warm_start": False, "persistent": False}
+        check = getattr(cls, f"_available_{name}", None)
+        if check is None or not check():
+            return probe
+        probe["available"] = True
+        try:
+            if name == "highs":
+                import highspy
+                probe["version"] = highspy.Highs().version()
+            elif name.startswith("ortools_"):
+                import ortools
+                probe["version"] = ortools.__version__
+            elif name == "scipy":
+                import scipy
+                probe["version"] = scipy.__version__
+        except Exception:
+            pass
+        probe["warm_start"] = name != "scipy"
+        probe["persistent"] = name == "highs"  # update() re-solves push only changed costs/bounds
+        return probe
+
+    @staticmethod
+    def _available_highs():
+        try:
+            import highspy
+        except ImportError:
+            return False
+        return hasattr(highspy, "Highs")
+
+    def _highs_instance(self):
+        """Pass the arrays to HiGHS through highspy (column-wise matrix, maximize)."""
+        import highspy
+
+        mm = self.model
+        A = mm.A.tocsc()
+        lp = highspy.HighsLp()
+        lp.num_col_ = mm.n_cols
+        lp.num_row_ = mm.n_rows
+        lp.sense_ = highspy.ObjSense.kMaximize
+        lp.col_cost_ = mm.c
+        lp.col_lower_ = mm.col_lb
+        lp.col_upper_ = mm.col_ub
+        lp.row_lower_ = mm.row_lb
+        lp.row_upper_ = mm.row_ub
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+        lp.integrality_ = [
+            highspy.HighsVarType.kInteger if integer else highspy.HighsVarType.kContinuous
+            for integer in mm.integrality
+        ]
+
+        h = highspy.Highs()
+        h.setOptionValue("output_flag", False)
+        h.passModel(lp)
+        return h
+
+    def _solve_highs(self, tee):
+        """Solve with HiGHS, keeping the instance so update() re-solves push only the changed costs/bounds."""
+        import highspy
+
+        mm = self.model
+        h = self._highs
+        if h is None or self._highs_model is not mm:
+            h = self._highs = self._highs_instance()
+            self._highs_model = mm
+        else:
+            if self._changed_cols:
+                cols = np.fromiter(sorted(self._changed_cols), dtype=np.int32)
+                h.changeColsCost(len(cols), cols, mm.c[cols])
+            if self._changed_rows:
+                rows = np.fromiter(sorted(self._changed_rows), dtype=np.int32)
+                h.changeRowsBounds(len(rows), rows, mm.row_lb[rows], mm.row_ub[rows])
+        self._changed_cols.clear()
+        self._changed_rows.clear()
+        cols, vals = self._mip_start_columns()
+        if len(cols):
+            h.setSolution(len(cols), cols, vals)
+        h.setOptionValue("output_flag", bool(tee))
+        h.setOptionValue("time_limit", float(self.time_limit) if self.time_limit else highspy.kHighsInf)
+        for option, v in {**self._thread_options(), **self.solver_options}.items():
+            h.setOptionValue(option, v)
+        unwatch = watch_highs(h, self._progress) if self._progress is not None else None
+        try:
+            h.run()
+        finally:
+            if unwatch is not None:
+                unwatch()
+
+        model_status = h.getModelStatus()
+        termination = {
+            highspy.HighsModelStatus.kOptimal: "optimal",
+            highspy.HighsModelStatus.kInfeasible: "infeasible",
+            highspy.HighsModelStatus.kUnbounded: "unbounded",
+            highspy.HighsModelStatus.kTimeLimit: "maxTimeLimit",
+        }.get(model_status, "other")
+        has_solution = h.getInfo().primal_solution_status == highspy.kSolutionStatusFeasible
+        x = h.getSolution().col_value if has_solution else None
+        self._load_solution(x, "ok" if model_status == highspy.HighsModelStatus.kOptimal else "warning", termination)
+
+    @staticmethod
+    def _available_scipy():
+        try:
+            import scipy.optimize
+        except ImportError:
+            return False
+        return hasattr(scipy.optimize, "milp")
+
+    def _solve_scipy(self, tee):
+        from scipy.optimize import milp, LinearConstraint, Bounds
+
+        mm = self.model
+        if self._data.get("warm_start"):
+            print("Warm start skipped: scipy.optimize.milp does not accept a MIP start.")
+        res = milp(
+            c=-mm.c,
+            constraints=LinearConstraint(mm.A, mm.row_lb, mm.row_ub),
+            integrality=mm.integrality,
+            bounds=Bounds(mm.col_lb, mm.col_ub),
+            options={"disp": tee, **({"time_limit": self.time_limit} if self.time_limit else {}), **self.solver_options},
+        )
+        termination = {0: "optimal", 1: "maxTimeLimit", 2: "infeasible", 3: "unbounded"}.get(res.status, "other")
+        self._load_solution(res.x, "ok" if res.status == 0 else "warning", termination)
+
+    @staticmethod
+    def _ortools_solver(backend_id):
+        try:
+            from ortools.linear_solver import pywraplp
+        except ImportError:
+            return None
+        return pywraplp.Solver.CreateSolver(backend_id)
+
+    @classmethod
+    def _available_ortools_cbc(cls):
+        return cls._ortools_solver("CBC") is not None
+
+    @classmethod
+    def _available_ortools_scip(cls):
+        return cls._ortools_solver("SCIP") is not None
+
+    def _solve_ortools_cbc(self, tee):
+        self._solve_ortools("CBC", tee)
+
+    def _solve_ortools_scip(self, tee):
+        self._solve_ortools("SCIP", tee)
+
+    def _solve_ortools(self, backend_id, tee):
+        """Load the arrays into an in-process OR-Tools linear solver (no LP file, no subprocess)."""
+        from ortools.linear_solver import pywraplp
+
+        mm = self.model
+        solver = self._ortools_solver(backend_id)
+        if tee:
+            solver.EnableOutput()
+        if self.time_limit:
+            solver.SetTimeLimit(int(self.time_limit * 1000))
+        threads = self._thread_options().get("threads")
+        if threads:
+            solver.SetNumThreads(threads)
+        inf = solver.infinity()
+
+        def bound(v):
+            return inf if v == np.inf else -inf if v == -np.inf else float(v)
+
+        columns = [
+            solver.IntVar(bound(lb), bound(ub), "") if integer else solver.NumVar(bound(lb), bound(ub), "")
+            for lb, ub, integer in zip(mm.col_lb, mm.col_ub, mm.integrality)
+        ]
+        A = mm.A
+        for i in range(mm.n_rows):
+            row = solver.RowConstraint(bound(mm.row_lb[i]), bound(mm.row_ub[i]), "")
+            for j, coef in zip(A.indices[A.indptr[i]:A.indptr[i + 1]], A.data[A.indptr[i]:A.indptr[i + 1]]):
+                row.SetCoefficient(columns[j], float(coef))
+        objective = solver.Objective()
+        for j in np.flatnonzero(mm.c):
+            objective.SetCoefficient(columns[j], float(mm.c[j]))
+        objective.SetMaximization()
+        cols, vals = self._mip_start_columns()
+        if len(cols):
+            solver.SetHint([columns[j] for j in cols], vals.tolist())
+
+        status = solver.Solve()
+        termination = {
+            pywraplp.Solver.OPTIMAL: "optimal",
+            pywraplp.Solver.FEASIBLE: "feasible",
+            pywraplp.Solver.INFEASIBLE: "infeasible",
+            pywraplp.Solver.UNBOUNDED: "unbounded",
+        }.get(status, "other")
+        has_solution = status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE)
+        x = [v.solution_value() for v in columns] if has_solution else None
+        self._load_solution(x, "ok" if status == pywraplp.Solver.OPTIMAL else "warning", termination)
+
+    def _mip_start_columns(self):
+        """Column indices and values of the MIP start (see MarsRecyclingOptimizer._mip_start)."""
+        mm = self.model
+        start = self._mip_start()
+        cols = [mm.col(name, index[:-1], index[-1]) for name, index, _ in start]
+        if start:
+            print(f"Warm start: {len(start)} values from the previous solution.")
+        return np.asarray(cols, dtype=np.int32), np.asarray([v for _, _, v in start], dtype=float)
+
+    def _load_solution(self, x, status, termination_condition):
+        """Store the solution vector (zeros if none) and a Pyomo-like solver_results summary."""
+        self.model.x = np.asarray(x, dtype=float) if x is not None else np.zeros(self.model.n_cols)
+        self.solver_results = SimpleNamespace(
+            solver=SimpleNamespace(status=status, termination_condition=termination_condition, has_solution=x is not None)
+        )
+
+    def _solution_arrays(self):
+        mm = self.model
+        if not isinstance(mm, MatrixModel):
+            return super()._solution_arrays()  # rolling-horizon solution
+        keys = {key: list(mm.families[name][1]) for name, key in SOLUTION_FAMILIES.items()}
+        # each family is an entity-major block of columns, so its values are a reshaped slice of x
+        arrays = {name: mm.x[base:base + len(positions) * mm.T].reshape(len(positions), mm.T)
+                  for name, (base, positions) in mm.families.items()}
+        return keys, arrays
+
+    # --------------------------
+    # Preview (LP relaxation + rounding)
+    # --------------------------
+    def _relax_binaries(self, relaxed: bool):
+        mm = self.model
+        self._relaxed = relaxed
+        mm.integrality[self._y_columns()] = 0 if relaxed else 1
+        self._highs = None  # integrality is not pushed incrementally; rebuild the HiGHS instance
+
+    def _fix_binaries(self, values):
+        mm = self.model
+        ycols = self._y_columns()
+        if values is None:
+            # back to 0 <= y <= availability
+            avail = self._data.get("availability", {})
+            mm.col_lb[ycols] = 0.0
+            mm.col_ub[ycols] = [0.0 if avail.get((r, t), 1) == 0 else 1.0
+                                for r in self._data["methods"] for t in mm.weeks]
+        else:
+            fixed = [values[(r, t)] for r in self._data["methods"] for t in mm.weeks]
+            mm.col_lb[ycols] = fixed
+            mm.col_ub[ycols] = fixed
+        self._highs = None
+
+    def _y_columns(self):
+        mm = self.model
+        return np.concatenate([mm.cols("y", i) for i in range(len(self._data["methods"]))])
+
+    def _objective_value(self) -> float:
+        return float(self.model.objective.value)
+
+    # --------------------------
+    # Shadow prices
+    # --------------------------
+    def _lp_duals(self, y, tee) -> dict:
+        """
+        Duals of the LP with y fixed to `y`, solved with scipy's HiGHS (linprog) whatever
+        the selected solver (the solution vector is not touched). linprog minimizes, so
+        duals of the maximization are its marginals negated; storage caps are column
+        bounds here, priced by the upper-bound marginals of Oinv / Minv.
+        """
+        from scipy.optimize import linprog
+
+        mm = self.model
+        d = self._data
+        T = mm.T
+        col_lb = mm.col_lb.copy()
+        col_ub = mm.col_ub.copy()
+        ycols = self._y_columns()
+        col_lb[ycols] = col_ub[ycols] = [y[(r, t)] for r in d["methods"] for t in mm.weeks]
+
+        eq = mm.row_lb == mm.row_ub
+        upper = ~eq & np.isfinite(mm.row_ub)
+        lower = ~eq & np.isfinite(mm.row_lb)
+        A = mm.A.tocsr()
+        res = linprog(
+            -mm.c,
+            A_ub=vstack([A[upper], -A[lower]]),
+            b_ub=np.concatenate([mm.row_ub[upper], -mm.row_lb[lower]]),
+            A_eq=A[eq], b_eq=mm.row_ub[eq],
+            bounds=np.column_stack([col_lb, col_ub]),
+            method="highs",
+            options={"disp": bool(tee)},
+        )
+        if res.status != 0:
+            raise RuntimeError(f"LP with fixed binaries failed ({res.message})")
+
+        # dual of every row: d objective / d right-hand side
+        row_dual = np.zeros(mm.n_rows)
+        n_upper = int(upper.sum())
+        row_dual[upper] = -res.ineqlin.marginals[:n_upper]
+        row_dual[lower] = res.ineqlin.marginals[n_upper:]
+        row_dual[eq] = -res.eqlin.marginals
+        col_dual = -res.upper.marginals
+
+        def block(name, keys):
+            base, _ = mm.row_blocks[name]
+            return {(k, t): float(row_dual[base + i * T + j]) for i, k in enumerate(keys) for j, t in enumerate(mm.weeks)}
+
+        def bounded(family, keys, caps):
+            return {(k, t): float(col_dual[c]) for i, k in enumerate(keys) if k in caps
+                    for t, c in zip(mm.weeks, mm.cols(family, i))}
+
+        M_min = d.get("min_lot_size", {})
+        lot_methods = [r for r in d["methods"] if float(M_min.get(r, 0.0)) > 0]
+        crew_base, _ = mm.row_blocks["con_crew"]
+        energy_base, _ = mm.row_blocks["con_energy"]
+        return {
+            "crew": {t: float(row_dual[crew_base + j]) for j, t in enumerate(mm.weeks) if t in d.get("crew_available", {})},
+            "energy": {t: float(row_dual[energy_base + j]) for j, t in enumerate(mm.weeks) if t in d.get("energy_available", {})},
+            "proc_cap": block("con_proc_cap", d["methods"]),
+            "min_lot": block("con_min_lot", lot_methods),
+            "output_inv": block("con_output_inv", d["outputs"]),
+            "material_inv": block("con_material_inv", d["materials"]),
+            "sub_inv": block("con_sub_inv", d["substitutes"]),
+            "carried_inv": block("con_carried_inv", d["items"]),
+            "output_cap": bounded("Oinv", d["outputs"], d.get("output_capacity", {})),
+            "input_cap": bounded("Minv", d["materials"], d.get("input_capacity", {})),
+        }
+
+    # --------------------------
+    # In-place updates
+    # --------------------------
+    def _apply_changes(self, changes: dict):
+        mm = self.model
+        d = self._data
+        T = mm.T
+        if changes["weights"]:
+            old_c = mm.c
+            mm.c = self._objective(mm, d)
+            self._changed_cols.update(np.flatnonzero(mm.c != old_c).tolist())
+        base, _ = mm.row_blocks["con_demand"]
+        positions = mm.families["item_used"][1]
+        for (k, t), v in changes["item_demands"].items():
+            row = base + positions[k] * T + mm.week_pos[t]
+            mm.row_lb[row] = mm.row_ub[row] = float(v)
+            self._changed_rows.add(row)
+        for key, block in (("crew_available", "con_crew"), ("energy_available", "con_energy")):
+            base, _ = mm.row_blocks[block]
+            for t, v in changes[key].items():
+                row = base + mm.week_pos[t]
+                mm.row_ub[row] = float(v)
+                self._changed_rows.add(row)
+
+    # --------------------------
+    # Model building
+    # --------------------------
+    def _build_model(self, d: dict):
+        materials = d["materials"]
+        methods = d["methods"]
+        outputs = d["outputs"]
+        items = d["items"]
+        subs = d["substitutes"]
+        weeks = sorted(d["weeks"])
+
+        idx = self._sparse_index(d)
+        sub_item_pairs = idx["sub_item_pairs"]
+        recipe_pairs = idx["recipe_pairs"]
+
+        mm = MatrixModel(weeks)
+        T = mm.T
+        mm.SK = set(sub_item_pairs)
+        mm.MR = set(recipe_pairs)
+
+        # convenient dict accessors with defaults
+        S_in0 = d.get("initial_inventory", {}).get("materials", {})
+        S_out0 = d.get("initial_inventory", {}).get("outputs", {})
+        S_items0 = d.get("initial_inventory", {}).get("items", {})
+        S_subs0 = d.get("initial_inventory", {}).get("substitutes", {})
+
+        item_demands = d.get("item_demands", {})
+        item_lifetime = d.get("item_lifetime", {})
+        sub_lifetime = d.get("substitute_lifetime", {})
+        item_waste = d.get("item_waste", {})
+        sub_waste = d.get("substitute_waste", {})
+        sub_recipe = d.get("substitute_make_recipe", {})
+        incoming_waste = d.get("incoming_waste", {})
+
+        R_max = d.get("max_capacity", {})
+        M_min = d.get("min_lot_size", {})
+        C_crew = d.get("crew_cost", {})
+        C_energy = d.get("energy_cost", {})
+        Crew = d.get("crew_available", {})
+        Energy = d.get("energy_available", {})
+        Cap_out = d.get("output_capacity", {})
+        Cap_in = d.get("input_capacity", {})
+        avail = d.get("availability", {})
+        asm_crew = d.get("substitute_assembly_crew", {})
+        asm_energy = d.get("substitute_assembly_energy", {})
+
+        # -------------------------
+        # Columns (same variable families as the Pyomo model)
+        # -------------------------
+        for name, keys in (
+            ("P", recipe_pairs), ("Q", methods), ("y", methods),
+            ("Oprod", outputs), ("Oinv", outputs), ("Minv", materials),
+            ("make_sub", subs), ("sub_inv", subs), ("sub_used_for", sub_item_pairs),
+            ("carried_used", items), ("carried_inv", items), ("item_used", items), ("item_short", items),
+        ):
+            mm.add_family(name, keys)
+        pos = {name: positions for name, (_, positions) in mm.families.items()}
+
+        mm.c = self._objective(mm, d)
+        mm.col_lb = np.zeros(mm.n_cols)
+        mm.col_ub = np.full(mm.n_cols, np.inf)
+        mm.integrality = np.zeros(mm.n_cols, dtype=np.int8)
+
+        # -------------------------
+        # Rows: entries are collected per entity as length-T arrays
+        # -------------------------
+        rows, cols, vals = [], [], []
+        week_range = np.arange(T)
+
+        def add(row_idx, col_idx, coef):
+            rows.append(row_idx)
+            cols.append(col_idx)
+            vals.append(np.broadcast_to(np.asarray(coef, dtype=float), np.shape(row_idx)))
+
+        def add_lag(row_idx, col_idx, coef):
+            # previous-week term: row for week t uses column for week t-1
+            add(row_idx[1:], col_idx[:-1], coef)
+
+        row_lb, row_ub = [], []
+
+        def bounds(lb, ub):
+            row_lb.append(np.broadcast_to(np.asarray(lb, dtype=float), (T,)))
+            row_ub.append(np.broadcast_to(np.asarray(ub, dtype=float), (T,)))
+
+        def first_week(value):
+            rhs = np.zeros(T)
+            rhs[0] = float(value)
+            return rhs
+
+        # link Q to P: Q[r,t] - sum_m P[m,r,t] == 0
+        base = mm.add_rows("con_link_Q", len(methods) * T)
+        for i, r in enumerate(methods):
+            rr = base + i * T + week_range
+            add(rr, mm.cols("Q", i), 1.0)
+            for m in idx["materials_for_method"][r]:
+                add(rr, mm.cols("P", pos["P"][(m, r)]), -1.0)
+            bounds(0.0, 0.0)
+
+        # outputs from processing: Oprod[o,t] - sum yield * P[m,r,t] == 0
+        base = mm.add_rows("con_output_prod", len(outputs) * T)
+        for i, o in enumerate(outputs):
+            rr = base + i * T + week_range
+            add(rr, mm.cols("Oprod", i), 1.0)
+            for y, m, r in idx["recipes_for_output"][o]:
+                add(rr, mm.cols("P", pos["P"][(m, r)]), -y)
+            bounds(0.0, 0.0)
+
+        # output inventory: Oinv[o,t] - Oinv[o,t-1] - Oprod[o,t] + consumed == initial (first week)
+        base = mm.add_rows("con_output_inv", len(outputs) * T)
+        for i, o in enumerate(outputs):
+            rr = base + i * T + week_range
+            oinv = mm.cols("Oinv", i)
+            add(rr, oinv, 1.0)
+            add_lag(rr, oinv, -1.0)
+            add(rr, mm.cols("Oprod", i), -1.0)
+            rhs = first_week(S_out0.get(o, 0.0))
+            bounds(rhs, rhs)
+            if o in Cap_out:
+                mm.col_ub[oinv] = Cap_out[o]
+        for (s, o), ratio in sub_recipe.items():
+            if ratio and s in pos["make_sub"] and o in pos["Oinv"]:
+                add(base + pos["Oinv"][o] * T + week_range, mm.cols("make_sub", pos["make_sub"][s]), ratio)
+
+        # material inventory: Minv[m,t] - Minv[m,t-1] - lifetime waste + processed == initial (first week)
+        base = mm.add_rows("con_material_inv", len(materials) * T)
+        for i, m in enumerate(materials):
+            rr = base + i * T + week_range
+            minv = mm.cols("Minv", i)
+            add(rr, minv, 1.0)
+            add_lag(rr, minv, -1.0)
+            for r in idx["methods_for_material"][m]:
+                add(rr, mm.cols("P", pos["P"][(m, r)]), 1.0)
+            rhs = first_week(S_in0.get(m, 0.0)) + [incoming_waste.get((m, t), 0.0) for t in weeks]
+            bounds(rhs, rhs)
+            if m in Cap_in:
+                mm.col_ub[minv] = Cap_in[m]
+
+        material_base = base
+
+        def add_waste(m, life, src_cols, coef):
+            # usage in week tau lands as waste in week tau + life (if that week is in the horizon)
+            target = mm.weeks + int(life)
+            tpos = np.minimum(np.searchsorted(mm.weeks, target), T - 1)
+            hit = mm.weeks[tpos] == target
+            add(material_base + pos["Minv"][m] * T + tpos[hit], src_cols[hit], -coef)
+
+        for (k, m), coef in item_waste.items():
+            if coef and k in pos["carried_used"] and m in pos["Minv"]:
+                add_waste(m, item_lifetime.get(k, 0), mm.cols("carried_used", pos["carried_used"][k]), coef)
+        for (s, m), coef in sub_waste.items():
+            if coef and s in pos["make_sub"] and m in pos["Minv"]:
+                for k in idx["items_for_sub"][s]:
+                    add_waste(m, sub_lifetime.get(s, 0), mm.cols("sub_used_for", pos["sub_used_for"][(s, k)]), coef)
+
+        # substitute inventory: sub_inv[s,t] - sub_inv[s,t-1] - make_sub[s,t] + used == initial (first week)
+        base = mm.add_rows("con_sub_inv", len(subs) * T)
+        for i, s in enumerate(subs):
+            rr = base + i * T + week_range
+            sinv = mm.cols("sub_inv", i)
+            add(rr, sinv, 1.0)
+            add_lag(rr, sinv, -1.0)
+            add(rr, mm.cols("make_sub", i), -1.0)
+            for k in idx["items_for_sub"][s]:
+                add(rr, mm.cols("sub_used_for", pos["sub_used_for"][(s, k)]), 1.0)
+            rhs = first_week(S_subs0.get(s, 0.0))
+            bounds(rhs, rhs)
+
+        # carried item inventory: carried_inv[k,t] - carried_inv[k,t-1] + carried_used[k,t] == initial (first week)
+        base = mm.add_rows("con_carried_inv", len(items) * T)
+        for i, k in enumerate(items):
+            rr = base + i * T + week_range
+            cinv = mm.cols("carried_inv", i)
+            add(rr, cinv, 1.0)
+            add_lag(rr, cinv, -1.0)
+            add(rr, mm.cols("carried_used", i), 1.0)
+            rhs = first_week(S_items0.get(k, 0.0))
+            bounds(rhs, rhs)
+
+        # usage composition: item_used[k,t] - carried_used[k,t] - sum_s sub_used_for[s,k,t] == 0
+        base = mm.add_rows("con_usage", len(items) * T)
+        for i, k in enumerate(items):
+            rr = base + i * T + week_range
+            add(rr, mm.cols("item_used", i), 1.0)
+            add(rr, mm.cols("carried_used", i), -1.0)
+            for s in idx["subs_for_item"][k]:
+                add(rr, mm.cols("sub_used_for", pos["sub_used_for"][(s, k)]), -1.0)
+            bounds(0.0, 0.0)
+
+        # demand satisfaction: item_used[k,t] + item_short[k,t] == demand
+        base = mm.add_rows("con_demand", len(items) * T)
+        for i, k in enumerate(items):
+            rr = base + i * T + week_range
+            add(rr, mm.cols("item_used", i), 1.0)
+            add(rr, mm.cols("item_short", i), 1.0)
+            demand = np.array([float(item_demands.get((k, t), 0.0)) for t in weeks])
+            bounds(demand, demand)
+
+        # processing capacity: Q[r,t] - max_capacity * y[r,t] <= 0; availability fixes y to 0
+        base = mm.add_rows("con_proc_cap", len(methods) * T)
+        for i, r in enumerate(methods):
+            rr = base + i * T + week_range
+            ycols = mm.cols("y", i)
+            add(rr, mm.cols("Q", i), 1.0)
+            add(rr, ycols, -np.array([float(R_max.get((r, t), 0.0)) for t in weeks]))
+            bounds(-np.inf, 0.0)
+            mm.integrality[ycols] = 1
+            mm.col_ub[ycols] = [0.0 if avail.get((r, t), 1) == 0 else 1.0 for t in weeks]
+
+        # min-lot: min_lot * y[r,t] - Q[r,t] <= 0
+        lot_methods = [(i, float(M_min.get(r, 0.0))) for i, r in enumerate(methods) if float(M_min.get(r, 0.0)) > 0]
+        base = mm.add_rows("con_min_lot", len(lot_methods) * T)
+        for j, (i, minlot) in enumerate(lot_methods):
+            rr = base + j * T + week_range
+            add(rr, mm.cols("y", i), minlot)
+            add(rr, mm.cols("Q", i), -1.0)
+            bounds(-np.inf, 0.0)
+
+        # resources (crew & energy) per week, including substitute assembly labor
+        for name, method_cost, assembly_cost, available in (
+            ("con_crew", C_crew, asm_crew, Crew),
+            ("con_energy", C_energy, asm_energy, Energy),
+        ):
+            rr = mm.add_rows(name, T) + week_range
+            for i, r in enumerate(methods):
+                if method_cost.get(r, 0.0):
+                    add(rr, mm.cols("Q", i), method_cost[r])
+            for i, s in enumerate(subs):
+                if assembly_cost.get(s, 0.0):
+                    add(rr, mm.cols("make_sub", i), assembly_cost[s])
+            bounds(-np.inf, np.array([float(available.get(t, float("inf"))) for t in weeks]))
+
+        # deadlines: cumulative usage up to the deadline week >= amount
+        deadlines = [dl for dl in d.get("deadlines", []) if "item" in dl]
+        base = mm.add_rows("con_deadlines", len(deadlines))
+        for j, dl in enumerate(deadlines):
+            used = mm.cols("item_used", pos["item_used"][dl["item"]])
+            hit = mm.weeks <= int(dl["week"])
+            add(np.full(int(hit.sum()), base + j), used[hit], 1.0)
+            row_lb.append(np.array([float(dl["amount"])]))
+            row_ub.append(np.array([np.inf]))
+
+        mm.A = csr_matrix(
+            (np.concatenate(vals) if vals else np.zeros(0),
+             (np.concatenate(rows) if rows else np.zeros(0, dtype=int),
+              np.concatenate(cols) if cols else np.zeros(0, dtype=int))),
+            shape=(mm.n_rows, mm.n_cols),
+        )
+        mm.row_lb = np.concatenate(row_lb) if row_lb else np.zeros(0)
+        mm.row_ub = np.concatenate(row_ub) if row_ub else np.zeros(0)
+        return mm
+
+    def _objective(self, mm, d: dict):
+        """Objective coefficient vector (maximize), recomputed from the weights on update()."""
+        methods = d["methods"]
+        outputs = d["outputs"]
+        items = d["items"]
+        subs = d["substitutes"]
+        C_crew = d.get("crew_cost", {})
+        C_energy = d.get("energy_cost", {})
+        RiskCost = d.get("risk_cost", {})
+        output_values = d.get("output_values", {})
+        sub_values = d.get("substitute_values", {})
+        item_mass = d.get("item_mass", {})
+        weights = {name: d.get("weights", {}).get(name, default) for name, default in WEIGHT_DEFAULTS.items()}
+        w_mass, w_value = weights["mass"], weights["value"]
+        w_crew, w_energy, w_risk = weights["crew"], weights["energy"], weights["risk"]
+        w_make, w_carry, w_short = weights["make"], weights["carry"], weights["shortage"]
+
+        c = np.zeros(mm.n_cols)
+        for i, o in enumerate(outputs):
+            c[mm.cols("Oprod", i)] = w_mass + w_value * output_values.get(o, 0.0)
+        for i, r in enumerate(methods):
+            c[mm.cols("Q", i)] = -(w_crew * C_crew.get(r, 0.0) + w_energy * C_energy.get(r, 0.0)
+                                      + w_risk * RiskCost.get(r, 0.0))
+        for i, s in enumerate(subs):
+            c[mm.cols("make_sub", i)] = w_make * sub_values.get(s, 0.0)
+        for i, k in enumerate(items):
+            c[mm.cols("carried_used", i)] = w_carry * item_mass.get(k, 0.0)
+            c[mm.cols("item_short", i)] = -w_short
+        return c
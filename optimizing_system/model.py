@@ -1,18 +1,125 @@
 # mars_recycling_optimizer.py
-# Requires: pyomo + a solver (cbc/glpk/gurobi/cplex)
+# Requires: pyomo + numpy + a solver (highs/cbc/glpk/gurobi/cplex)
 # Usage:
 #   from mars_recycling_optimizer import MarsRecyclingOptimizer
-#   opt = MarsRecyclingOptimizer(preferred_solvers=['cbc','glpk'])
+#   opt = MarsRecyclingOptimizer(preferred_solvers=['highs','cbc','glpk'])
 #   opt.setup(data_dict)
 #   opt.solve(tee=True)
 #   results = opt.get_results()
-
+#   if opt.update(edited_data_dict):   # only weights / demands / weekly crew & energy changed
+#       opt.solve()                    # re-solve without rebuilding
+#   data_dict["params"] = {"horizon_window": 26, "horizon_overlap": 4}   # optional rolling-horizon solve
+#   data_dict["warm_start"] = results  # previous get_results() (or its result_format.solution_tables())
+#                                      # is passed to the solver as a MIP start when it still fits the model
+#   data_dict["params"] = {"mode": "preview"}   # optional quick heuristic plan (LP relaxation + rounding)
+#   data_dict["params"] = {"presolve": False}   # build every entity (presolve drops ones that cannot matter)
+#   data_dict["params"] = {"duals": False}      # skip the shadow prices (results["duals"], one extra LP solve)
+#   data_dict["params"] = {"results": "columnar"}  # typed arrays per variable family instead of nested tables
+#   data_dict["params"] = {"results": "summary"}   # summary only (no per-week schedule/outputs/substitutes/items)
+#   sweep = opt.sweep([{"weights": {"value": v}} for v in (0.5, 1.0, 2.0)], plans=[2])
+#                                      # re-solves per override point -> {"frontier": [...], "plans": {"2": results}}
+
+import base64
+import hashlib
+import math
+import time
 from copy import deepcopy
+from types import SimpleNamespace
+
+import numpy as np
 from pyomo.environ import (
-    ConcreteModel, Set, Var, NonNegativeReals, Binary, ConstraintList,
-    Objective, SolverFactory, value, maximize
+    ConcreteModel, Set, Param, Var, NonNegativeReals, Binary, UnitInterval, ConstraintList,
+    Objective, Suffix, SolverFactory, value, maximize
+)
+from pyomo.common.errors import PyomoException
+from ares_shared.result_format import FAMILIES, INDEX_DTYPE, nested_tables, solution_tables, to_nested
+from ares_shared.structure import disposal_pairs
+from ares_shared.validation import validate
+from progress import watch_highs
+
+
+# objective weights and their defaults when missing from data["weights"]
+WEIGHT_DEFAULTS = {
+    "mass": 0.0,
+    "value": 0.0,
+    "crew": 0.0,
+    "energy": 0.0,
+    "risk": 0.0,
+    "make": 0.0,
+    "carry": 0.0,  # typically negative to penalize using carried mass
+    "shortage": 10000.0,
+}
+
+# inputs held as mutable parameters: changing only their values does not require a rebuild
+MUTABLE_INPUTS = ("weights", "item_demands", "crew_available", "energy_available")
+
+# constraint rows read back for shadow prices (all but crew/energy are indexed (entity, week)):
+# resource limits, processing capacity / min-lot, inventory balances and storage caps
+DUAL_ROWS = (
+    "crew", "energy", "proc_cap", "min_lot",
+    "output_inv", "material_inv", "sub_inv", "carried_inv", "output_cap", "input_cap",
 )
 
+# payload keys that do not affect the model
+NON_MODEL_INPUTS = ("job_id", "params", "warm_start")
+
+# solver probes and solver objects, created once per process and shared by every optimizer:
+# (optimizer class, solver name) -> probe dict / solver object
+_SOLVER_PROBES = {}
+_SOLVER_HANDLES = {}
+
+# variable families and their index (without the week) in both backends
+SOLUTION_FAMILIES = {
+    "P": "recipe_pairs", "Q": "methods", "y": "methods",
+    "Oprod": "outputs", "Oinv": "outputs", "Minv": "materials",
+    "make_sub": "substitutes", "sub_inv": "substitutes", "sub_used_for": "sub_item_pairs",
+    "carried_used": "items", "carried_inv": "items", "item_used": "items", "item_short": "items",
+}
+
+
+def _canonical(v):
+    """Order-independent form of dicts (entity lists keep their order) for hashing."""
+    if isinstance(v, dict):
+        return tuple(sorted(((_canonical(k), _canonical(x)) for k, x in v.items()), key=repr))
+    if isinstance(v, (list, tuple)):
+        return tuple(_canonical(x) for x in v)
+    return v
+
+
+def _columnar_family(values, dims, dtype) -> dict:
+    """One family of a columnar result (see result_format), sparse when that is smaller."""
+    flat = values.ravel()
+    nonzero = np.flatnonzero(flat)
+    itemsize = np.dtype(dtype).itemsize
+    family = {"dims": list(dims), "dtype": dtype}
+    if len(nonzero) * (np.dtype(INDEX_DTYPE).itemsize + itemsize) < len(flat) * itemsize:
+        family["index"] = base64.b64encode(nonzero.astype(INDEX_DTYPE).tobytes()).decode("ascii")
+        flat = flat[nonzero]
+    family["data"] = base64.b64encode(flat.astype(dtype).tobytes()).decode("ascii")
+    return family
+
+
+class _Value:
+    """A solution value exposed through `.value` like a Pyomo variable (also the matrix model's columns)."""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Solution:
+    """Stands in for the built model in get_results() after a rolling-horizon solve."""
+
+    def __init__(self, values, objective, sets, weeks):
+        # committed values as solution arrays (see MarsRecyclingOptimizer._solution_arrays); 0.0 where nothing was committed
+        self.keys = {key: list(sets[key]) for key in set(SOLUTION_FAMILIES.values())}
+        self.arrays = {}
+        for name, family in values.items():
+            entities = [e if isinstance(e, tuple) else (e,) for e in self.keys[SOLUTION_FAMILIES[name]]]
+            self.arrays[name] = np.array([[family.get(e + (t,), 0.0) for t in weeks] for e in entities],
+                                         dtype=float).reshape(len(entities), len(weeks))
+        self.objective = _Value(objective)
+
 
 class MarsRecyclingOptimizer:
     """
@@ -20,118 +127,791 @@ class MarsRecyclingOptimizer:
       - Items (carried) and Substitutes (craftable)
       - Waste is GENERATED FROM item/substitute usage (after lifetime)
       - Recycling methods convert raw materials -> outputs
+        (a material without a recipe for a method, i.e. no `yields` entry, is processed at zero
+        yield, and gets a processing variable only where that can matter: see ares_shared.structure.disposal_pairs)
       - Outputs are consumed to build substitutes
       - Resources: crew, energy, method capacity, availability, inventory caps
     API:
       - setup(data: dict)    # builds model (normalizes input)
-      - solve(tee=False)     # runs solver
+      - solve(tee=False, progress=None)  # runs solver; progress: progress.SolverProgress
+                             # (rolling horizon if params.horizon_window is shorter than the mission)
+      - update(data) -> bool # re-targets the built model if only MUTABLE_INPUTS values changed
+      - sweep(points, plans=()) -> dict  # re-solves per MUTABLE_INPUTS override point
       - get_results() -> dict
     """
 
+    # "highs" runs in memory through highspy (no LP file, no subprocess)
+    DEFAULT_SOLVERS = ["highs", "cbc", "glpk", "cplex", "gurobi"]
+
+    # solver option setting the thread count, for solvers that run multi-threaded
+    THREAD_OPTIONS = {"highs": "threads", "appsi_highs": "threads", "cbc": "threads", "cplex": "threads", "gurobi": "Threads"}
+
     def __init__(self, preferred_solvers=None):
-        self.solvers = preferred_solvers or ["cbc", "glpk", "cplex", "gurobi"]
+        self.solvers = preferred_solvers or list(self.DEFAULT_SOLVERS)
         self.model = None
         self.solver = None
+        self.solver_name = None
         self.solver_results = None
-        self._data = None
+        self._data = None      # model input (after presolve)
+        self._input = None     # full normalized input (get_results() reports every entity in it)
+        self.presolve_report = {}  # entities/limits removed by presolve: {kind: [names or weeks]}
+        self._horizon = None  # (window, overlap) weeks in rolling-horizon mode
+        self._relaxed = False  # y relaxed to [0, 1] (preview mode)
+        self.solve_info = {}   # extra solver_status fields of the last solve (mode, heuristic, lp_bound, gap)
+        self.time_limit = None     # seconds per solver run (None = no limit); the best solution found is loaded
+        self.solver_options = {}   # passed to the solver as-is, e.g. {"random_seed": 7} for HiGHS
+        self.duals = {}        # shadow prices / reduced costs of the last solve (see _dual_prices)
+        self.validation_errors = []  # structured errors of the last validation (see validation.validate)
 
     # --------------------------
     # Public API
     # --------------------------
     def setup(self, data: dict):
-        """Normalize input, validate, choose solver, and build model."""
-        normalized = self._normalize_input(data)
+        """Normalize input, validate, presolve, choose solver, and build model."""
+        normalized = self.normalize_input(data)
         if not self._validate_input(normalized):
-            raise ValueError("Input validation failed (see printed errors).")
-        self._data = normalized
+            raise ValueError("Input validation failed: " + "; ".join(e["message"] for e in self.validation_errors))
+        self._input = normalized
+        self._horizon = self._horizon_plan(normalized)
+        # rolling-horizon windows keep every entity: one idle in a window may hold stock a later window needs
+        self._data, self.presolve_report = (normalized, {}) if self._horizon is not None else self._presolve(normalized)
         self.solver = self._select_solver()
         if self.solver is None:
-            raise RuntimeError("No solver available. Install CBC/GLPK/CPLEX/Gurobi.")
-        self.model = self._build_model(normalized)
+            raise RuntimeError("No solver available. Install HiGHS (highspy)/CBC/GLPK/CPLEX/Gurobi.")
+        if self._horizon is not None:
+            # windows are built per solve; self.model holds the committed solution afterwards
+            self.model = None
+            print(f"Rolling horizon: {self._horizon[0]}-week windows, {self._horizon[1]}-week overlap.")
+            return
+        self.model = self._build_model(self._data)
         print("Model built successfully.")
 
-    def solve(self, tee=False):
-        if self.model is None or self.solver is None:
+    def solve(self, tee=False, progress=None):
+        """
+        Run the solver. With a `progress` (progress.SolverProgress), incumbent/bound
+        updates are reported while the solve runs (Pyomo's HiGHS interfaces only).
+        """
+        if self.solver is None or (self.model is None and self._horizon is None):
             raise RuntimeError("Call setup(data) before solve().")
-        self.solver_results = self.solver.solve(self.model, tee=tee)
+        self.solve_info = {"presolve": self.presolve_report} if self.presolve_report else {}
+        self.duals = {}
+        params = self._data.get("params") or {}
+        if self._horizon is not None:
+            self._solve_rolling(tee, progress)
+        elif params.get("mode") == "preview":
+            self._solve_preview(tee, progress)
+        else:
+            self._solve_model(tee, progress)
+        if self._horizon is None and params.get("duals", True):
+            self._dual_prices(tee)
         print("Solve finished.")
 
+    def _solve_model(self, tee, progress):
+        kwargs = {}
+        if self.time_limit:
+            kwargs["timelimit"] = self.time_limit
+        options = self._thread_options()
+        options.update(self.solver_options)
+        if options:
+            kwargs["options"] = options
+        start = self._mip_start()
+        resume_updates = None
+        if start:
+            if getattr(self.solver, "warm_start_capable", lambda: False)():
+                for name, index, v in start:
+                    getattr(self.model, name)[index].set_value(v, skip_validation=True)
+                kwargs["warmstart"] = True
+                print(f"Warm start: {len(start)} values from the previous solution.")
+            else:
+                resume_updates = self._highs_start(start)
+                if resume_updates is not None:
+                    print(f"Warm start: {len(start)} values from the previous solution.")
+                else:
+                    print("Warm start skipped: the selected solver does not accept a MIP start.")
+        unwatch = self._watch_progress(progress) if progress is not None else None
+        try:
+            self.solver_results = self.solver.solve(self.model, tee=tee, **kwargs)
+        finally:
+            if unwatch is not None:
+                unwatch()
+            if resume_updates is not None:
+                resume_updates()
+
+    def _highs_start(self, start):
+        """
+        Hand a MIP start to the highspy instance of Pyomo's persistent `highs` interface,
+        which does not take warmstart=True: setSolution() on its columns, as the matrix
+        backend does. The update solve() runs on a model it already holds would clear the
+        start, so the model is synced here and automatic updates are paused until the
+        returned callable resumes them. Other solvers get no start (returns None).
+        """
+        if not hasattr(self.solver, "set_instance"):
+            return None
+        if getattr(self.solver, "_model", None) is not self.model:
+            self.solver.set_instance(self.model)
+        else:
+            self.solver.update()
+        highs = getattr(self.solver, "_solver_model", None)
+        columns = getattr(self.solver, "_pyomo_var_to_solver_var_map", None)
+        if highs is None or columns is None or not hasattr(highs, "setSolution"):
+            return None
+        cols, vals = [], []
+        for name, index, v in start:
+            col = columns.get(id(getattr(self.model, name)[index]))
+            if col is not None:
+                cols.append(col)
+                vals.append(v)
+        highs.setSolution(len(cols), np.array(cols, dtype=np.int32), np.array(vals, dtype=np.float64))
+
+        auto_updates = self.solver.config.auto_updates
+        saved = {key: auto_updates[key] for key in auto_updates}
+        for key in saved:
+            auto_updates[key] = False
+
+        def resume():
+            for key, flag in saved.items():
+                auto_updates[key] = flag
+
+        return resume
+
+    def _watch_progress(self, progress):
+        """
+        Hook `progress` into the solver's highspy instance. Pyomo's persistent HiGHS
+        interfaces (highs, appsi_highs) create it in set_instance(), which solve() then
+        skips for the same model; other solvers report no progress (returns None).
+        """
+        if not hasattr(self.solver, "set_instance"):
+            return None
+        if getattr(self.solver, "_model", None) is not self.model:
+            self.solver.set_instance(self.model)
+        highs = getattr(self.solver, "_solver_model", None)
+        if highs is None or not hasattr(highs, "cbMipInterrupt"):
+            return None
+        return watch_highs(highs, progress)
+
+    def update(self, data: dict) -> bool:
+        """
+        Apply edited input data to the built model without rebuilding it.
+        Only value changes of MUTABLE_INPUTS are applied in place (the solver instance is kept,
+        so persistent solvers only see the changed coefficients/right-hand sides).
+        Returns False and leaves the model untouched if anything else changed (including what
+        presolve removes, or the weights changed which zero-yield pairs can matter, see
+        ares_shared.structure.disposal_pairs); call setup(data) then.
+        """
+        if self._data is None:
+            raise RuntimeError("Call setup(data) before update().")
+        normalized = self.normalize_input(data)
+        if self._horizon is not None or self._horizon_plan(normalized) is not None:
+            return False
+        reduced, report = self._presolve(normalized, verbose=False)
+        if report != self.presolve_report or disposal_pairs(reduced) != disposal_pairs(self._data):
+            return False
+        changes = self._diff_input(reduced)
+        if changes is None:
+            return False
+        if not self._validate_input(normalized):
+            raise ValueError("Input validation failed: " + "; ".join(e["message"] for e in self.validation_errors))
+        self._input = normalized
+        self._data = reduced
+        self._apply_changes(changes)
+        print(f"Model updated in place ({sum(len(v) for v in changes.values())} changed values).")
+        return True
+
+    @classmethod
+    def structure_fingerprint(cls, data: dict) -> str:
+        """
+        Hash of everything update() cannot change in place: entities, recipes, capacities,
+        coefficients and the weeks that have crew/energy limits (MUTABLE_INPUTS values,
+        job_id, params and warm_start are left out). Jobs with equal fingerprints can
+        share a built model through update().
+        """
+        d = cls.normalize_input(data)
+        structure = {key: v for key, v in d.items() if key not in MUTABLE_INPUTS and key not in NON_MODEL_INPUTS}
+        for key in ("crew_available", "energy_available"):
+            structure[key] = sorted(d.get(key, {}))
+        return hashlib.sha256(repr(_canonical(structure)).encode()).hexdigest()
+
+    def model_size(self) -> int:
+        """Variables + constraints of the built model (0 if none is built)."""
+        if self.model is None or not hasattr(self.model, "nvariables"):
+            return 0
+        return self.model.nvariables() + self.model.nconstraints()
+
     def get_results(self) -> dict:
         if self.model is None:
             raise RuntimeError("Model not built/solved.")
-        return self._extract_results()
+        results = self._extract_results()
+        if self.duals:
+            results["duals"] = self.duals
+        return results
 
     # --------------------------
-    # Input normalization
+    # Parameter sweeps
     # --------------------------
-    def _normalize_input(self, data: dict) -> dict:
-        """Normalize comma-string tuple keys into real tuples and fill defaults."""
-        d = deepcopy(data)
-
-        def parse_key_string(s):
-            parts = [p.strip() for p in s.split(",")]
-            parsed = []
-            for p in parts:
-                if p.isdigit():
-                    parsed.append(int(p))
-                else:
+    def sweep(self, points: list, plans=()) -> dict:
+        """
+        Solve the set-up data once per point of a parameter sweep.
+
+        Each point overrides MUTABLE_INPUTS values of the set-up data, e.g.
+        {"weights": {"value": 2.0}, "crew_available": {3: 20.0}}; its entries replace the
+        matching entries of the set-up data (other entries keep their set-up values).
+        Points are applied in place through update() and warm-started from the previous
+        point's solution; a point that update() cannot apply is set up from scratch. A point
+        that fails (no solution, or overrides that fail validation) gets an "error" in its
+        frontier row and the sweep goes on; the next point is set up from scratch.
+
+        Args:
+            points: List of override dicts
+            plans: Indices of the points whose full get_results() are returned (with a
+                JSON-safe solver_status)
+
+        Returns:
+            {"frontier": [one row per point: point, termination_condition, objective_value
+            and the scalar summary totals (or error)], "plans": {str(index): results}}
+        """
+        if self._input is None:
+            raise RuntimeError("Call setup(data) before sweep().")
+        for i, point in enumerate(points):
+            if not isinstance(point, dict) or any(key not in MUTABLE_INPUTS for key in point):
+                raise ValueError(f"Sweep point {i} may only override {', '.join(MUTABLE_INPUTS)}")
+        plans = set(plans)
+        if any(not isinstance(i, int) or not 0 <= i < len(points) for i in plans):
+            raise ValueError(f"Sweep plans must be point indices (0-{len(points) - 1})")
+
+        base = self._input
+        frontier = []
+        selected = {}
+        previous = None
+        rebuild = False  # the last point failed while being applied: the model may be half set up
+        for i, point in enumerate(points):
+            row = {"point": i}
+            started = time.time()
+            applying = True
+            try:
+                overrides = self.normalize_input(point)
+                data = dict(base)
+                for key in point:
+                    data[key] = {**base.get(key, {}), **overrides[key]}
+                if previous is not None:
+                    data["warm_start"] = previous
+                if rebuild or not self.update(data):
+                    print(f"Sweep point {i}: cannot update in place, building the model again.")
+                    self.setup(data)
+                applying = rebuild = False
+                self.solve()
+                solver_info = getattr(self.solver_results, "solver", None)
+                row["termination_condition"] = str(getattr(solver_info, "termination_condition", "unknown"))
+                if not getattr(solver_info, "has_solution", True):
+                    raise RuntimeError(f"No solution ({row['termination_condition']})")
+                results = self.get_results()
+                row.update({key: v for key, v in results["summary"].items() if not isinstance(v, dict)})
+                previous = solution_tables(results)
+                if i in plans:
+                    results["solver_status"] = {
+                        "status": str(getattr(solver_info, "status", "unknown")),
+                        "termination_condition": row["termination_condition"],
+                        **self.solve_info,
+                    }
+                    selected[str(i)] = results
+            except (RuntimeError, ValueError, KeyError, PyomoException) as e:
+                # no solution for this point (e.g. infeasible, or overrides that fail validation);
+                # the next point starts cold
+                print(f"Sweep point {i} failed: {e}")
+                row["error"] = str(e)
+                previous = None
+                rebuild = applying
+            row["elapsed"] = round(time.time() - started, 3)
+            frontier.append(row)
+
+        self.solve_info = {"presolve": self.presolve_report} if self.presolve_report else {}
+        self.solve_info.update({"mode": "sweep", "points": len(points), "solved": sum("error" not in row for row in frontier)})
+        return {"frontier": frontier, "plans": selected}
+
+    # --------------------------
+    # Preview (LP relaxation + rounding)
+    # --------------------------
+    def _solve_preview(self, tee, progress):
+        """
+        Quick heuristic plan for params.mode == "preview": solve the LP relaxation,
+        round the method on/off binaries y (a method runs in a week where the
+        relaxation processes at least its min-lot size there), then re-solve the LP
+        with y fixed. If that rounding is infeasible, all methods are switched off
+        instead. The relaxation's objective bounds the MILP optimum, so the reported
+        gap bounds how far the plan is from optimal.
+        """
+        d = self._data
+        tol = 1e-6
+        started = time.monotonic()
+        objective = bound = None
+        termination = "unknown"
+        self._relax_binaries(True)
+        try:
+            self._solve_model(tee, None)
+            termination = self._termination()
+            if termination == "optimal":
+                bound = self._objective_value()
+                min_lot = d.get("min_lot_size", {})
+                rounded = {}
+                for r in d["methods"]:
+                    for t in d["weeks"]:
+                        y_lp = self.model.y[r, t].value or 0.0
+                        q_lp = self.model.Q[r, t].value or 0.0
+                        on = y_lp > tol and q_lp >= float(min_lot.get(r, 0.0)) - tol
+                        rounded[(r, t)] = 1.0 if on else 0.0
+                off = dict.fromkeys(rounded, 0.0)
+                for candidate in ([rounded, off] if any(rounded.values()) else [off]):
+                    self._fix_binaries(candidate)
                     try:
-                        pf = float(p)
-                        parsed.append(pf)
-                    except:
-                        parsed.append(p)
-            return tuple(parsed)
-
-        # dictionaries that should have tuple keys (string keys like "plastic,1" allowed)
-        tuple_maps = [
-            ("item_demands", 2),
-            ("yields", 3),
-            ("max_capacity", 2),
-            ("availability", 2),
-            ("item_waste", 2),
-            ("substitute_make_recipe", 2),
+                        self._solve_model(tee, None)
+                        termination = self._termination()
+                    except (RuntimeError, PyomoException) as e:  # some interfaces raise when no feasible solution exists
+                        print(f"Preview: rounded plan rejected ({e}).")
+                        termination = "infeasible"
+                    if termination == "optimal":
+                        objective = self._objective_value()
+                        break
+                    print(f"Preview: rounded plan is {termination}, trying the next rounding.")
+            else:
+                print(f"Preview: LP relaxation is {termination}.")
+        finally:
+            self._fix_binaries(None)
+            self._relax_binaries(False)
+
+        self.solve_info.update({"mode": "preview", "heuristic": True, "lp_bound": bound})
+        if objective is None:
+            self.solver_results = SimpleNamespace(solver=SimpleNamespace(status="warning", termination_condition=termination))
+            return
+        gap = abs(bound - objective) / max(abs(objective), 1e-10)
+        self.solve_info["gap"] = gap
+        self.solver_results = SimpleNamespace(solver=SimpleNamespace(status="ok", termination_condition="heuristic"))
+        if progress is not None:
+            progress.report(incumbent=objective, bound=bound, elapsed=time.monotonic() - started)
+        print(f"Preview: objective={objective:.6f}, LP bound={bound:.6f}, gap={gap:.2%}")
+
+    def _relax_binaries(self, relaxed: bool):
+        """Switch y between {0, 1} and [0, 1]."""
+        self._relaxed = relaxed
+        for var in self.model.y.values():
+            var.domain = UnitInterval if relaxed else Binary
+
+    def _fix_binaries(self, values):
+        """Fix y to `values` ((method, week) -> 0/1), or free it again for None."""
+        for index, var in self.model.y.items():
+            if values is None:
+                var.unfix()
+            else:
+                var.fix(values[index])
+
+    def _termination(self) -> str:
+        solver_info = getattr(self.solver_results, "solver", None)
+        return str(getattr(solver_info, "termination_condition", "unknown"))
+
+    def _objective_value(self) -> float:
+        return float(value(self.model.objective))
+
+    # --------------------------
+    # Shadow prices
+    # --------------------------
+    def _dual_prices(self, tee):
+        """
+        Shadow prices of the plan just solved: y is fixed at its solved values and the
+        LP over the continuous variables is solved again for its duals (the plan itself
+        is kept). Every price is the objective change per unit increase of the right-hand
+        side: an hour of crew or unit of energy in a week, a kg of method capacity, a kg
+        (or unit) more in stock in a week, a kg of storage cap. reduced_costs.y is the
+        LP estimate of the objective change per unit increase of y (switching a method on).
+        Entities removed by presolve are not listed.
+        """
+        solver_info = getattr(self.solver_results, "solver", None)
+        if not getattr(solver_info, "has_solution", True) or self._termination() in ("infeasible", "unbounded", "infeasibleOrUnbounded"):
+            return
+        d = self._data
+        weeks = sorted(d["weeks"])
+        y = {(r, t): float(round(self.model.y[r, t].value or 0.0)) for r in d["methods"] for t in weeks}
+        try:
+            rows = self._lp_duals(y, tee)
+        except (RuntimeError, PyomoException) as e:
+            print(f"Shadow prices skipped: {e}")
+            return
+
+        def table(name, keys):
+            return {k: {t: rows[name][k, t] for t in weeks if (k, t) in rows[name]} for k in keys
+                    if any((k, t) in rows[name] for t in weeks)}
+
+        R_max = d.get("max_capacity", {})
+        M_min = d.get("min_lot_size", {})
+        avail = d.get("availability", {})
+        self.duals = {
+            "shadow_prices": {
+                "crew_available": {t: rows["crew"][t] for t in weeks if t in rows["crew"]},
+                "energy_available": {t: rows["energy"][t] for t in weeks if t in rows["energy"]},
+                # Q <= max_capacity * y: a kg more capacity only helps in weeks the method runs
+                "max_capacity": {r: {t: rows["proc_cap"].get((r, t), 0.0) * y[r, t] for t in weeks} for r in d["methods"]},
+                "output_inventory": table("output_inv", d["outputs"]),
+                "material_inventory": table("material_inv", d["materials"]),
+                "substitute_inventory": table("sub_inv", d["substitutes"]),
+                "carried_inventory": table("carried_inv", d["items"]),
+                "output_capacity": table("output_cap", d["outputs"]),
+                "input_capacity": table("input_cap", d["materials"]),
+            },
+            "reduced_costs": {
+                # y's columns: -max_capacity in the capacity row, +min_lot in the min-lot row
+                "y": {
+                    r: {
+                        t: float(R_max.get((r, t), 0.0)) * rows["proc_cap"].get((r, t), 0.0)
+                        - float(M_min.get(r, 0.0)) * rows["min_lot"].get((r, t), 0.0)
+                        for t in weeks if avail.get((r, t), 1) != 0
+                    }
+                    for r in d["methods"]
+                },
+            },
+        }
+
+    def _lp_duals(self, y, tee) -> dict:
+        """Duals {DUAL_ROWS name: {index: dual}} of the LP with y fixed to `y`; the solution is restored afterwards."""
+        m = self.model
+        saved = [(var, var.value) for var in m.component_data_objects(Var)]
+        results = self.solver_results
+        self._relax_binaries(True)
+        self._fix_binaries(y)
+        m.dual = Suffix(direction=Suffix.IMPORT)
+        try:
+            self._solve_model(tee, None)
+            if self._termination() != "optimal":
+                raise RuntimeError(f"LP with fixed binaries is {self._termination()}")
+            return {name: {index: float(m.dual.get(con, 0.0)) for index, con in m.dual_rows[name].items()}
+                    for name in DUAL_ROWS}
+        finally:
+            m.del_component(m.dual)
+            self._fix_binaries(None)
+            self._relax_binaries(False)
+            for var, v in saved:
+                var.set_value(v, skip_validation=True)
+            self.solver_results = results
+
+    # --------------------------
+    # Rolling horizon
+    # --------------------------
+    def _horizon_plan(self, d: dict):
+        """(window, overlap) from params.horizon_window / params.horizon_overlap, or None for one monolithic solve."""
+        params = d.get("params") or {}
+        window = int(params.get("horizon_window") or 0)
+        if window <= 0 or window >= len(d["weeks"]):
+            return None
+        overlap = int(params.get("horizon_overlap") or 0)
+        if not 0 <= overlap < window:
+            raise ValueError("params.horizon_overlap must be >= 0 and smaller than params.horizon_window")
+        return window, overlap
+
+    def _solve_rolling(self, tee, progress):
+        """
+        Solve overlapping windows of the mission in turn. Decisions in the first
+        window - overlap weeks of each window are committed; inventories at the end
+        of the committed weeks, lifetime waste still due from committed usage and
+        the remaining deadline amounts carry into the next window.
+        """
+        d = self._data
+        weeks = sorted(d["weeks"])
+        window, overlap = self._horizon
+        idx = self._sparse_index(d)
+        keys = {
+            "materials": d["materials"], "methods": d["methods"], "outputs": d["outputs"],
+            "items": d["items"], "substitutes": d["substitutes"],
+            "recipe_pairs": idx["recipe_pairs"], "sub_item_pairs": idx["sub_item_pairs"],
+        }
+        item_lifetime = d.get("item_lifetime", {})
+        sub_lifetime = d.get("substitute_lifetime", {})
+        week_set = set(weeks)
+
+        inventory = deepcopy(d["initial_inventory"])
+        incoming = dict(d.get("incoming_waste", {}))  # (material, week) -> kg due from earlier usage
+        used = {}  # item -> committed usage (for deadlines)
+        values = {name: {} for name in SOLUTION_FAMILIES}
+        status, termination = "ok", "optimal"
+        heuristic = False
+
+        start = 0
+        while start < len(weeks):
+            window_weeks = weeks[start:start + window]
+            committed = window_weeks if start + window >= len(weeks) else window_weeks[:window - overlap]
+            print(f"Rolling horizon: weeks {window_weeks[0]}-{window_weeks[-1]}, committing {committed[0]}-{committed[-1]}")
+
+            part = type(self)(self.solvers)
+            part.setup(self._window_data(window_weeks, inventory, incoming, used))
+            part.solve(tee=tee, progress=progress)
+            part_solver = getattr(part.solver_results, "solver", None)
+            part_termination = str(getattr(part_solver, "termination_condition", "unknown"))
+            heuristic = heuristic or part.solve_info.get("heuristic", False)
+            if part_termination == "heuristic":
+                part_termination = "optimal"  # the window's preview plan is feasible
+            if part_termination != "optimal":
+                status, termination = "warning", part_termination
+            if part_termination in ("infeasible", "unbounded", "infeasibleOrUnbounded"):
+                print(f"Rolling horizon stopped: window starting week {window_weeks[0]} is {part_termination}.")
+                break
+
+            for name, key in SOLUTION_FAMILIES.items():
+                family = getattr(part.model, name)
+                for entity in keys[key]:
+                    index = entity if isinstance(entity, tuple) else (entity,)
+                    for t in committed:
+                        # a window may lack disposal pairs of the full mission (see ares_shared.structure.disposal_pairs)
+                        v = family[index + (t,)].value if index + (t,) in family else None
+                        # all families are nonnegative; drop solver round-off below zero
+                        values[name][index + (t,)] = max(float(v), 0.0) if v is not None else 0.0
+
+            # carry state past the last committed week
+            last = committed[-1]
+            for group, name in (("materials", "Minv"), ("outputs", "Oinv"), ("items", "carried_inv"), ("substitutes", "sub_inv")):
+                inventory[group] = {e: values[name][(e, last)] for e in keys[group]}
+            for t in committed:
+                for (k, m), coef in d.get("item_waste", {}).items():
+                    due = t + int(item_lifetime.get(k, 0))
+                    if coef and due > last and due in week_set and (k, t) in values["carried_used"]:
+                        incoming[(m, due)] = incoming.get((m, due), 0.0) + coef * values["carried_used"][(k, t)]
+                for (s, m), coef in d.get("substitute_waste", {}).items():
+                    due = t + int(sub_lifetime.get(s, 0))
+                    if coef and due > last and due in week_set:
+                        for (s2, k) in keys["sub_item_pairs"]:
+                            if s2 == s:
+                                incoming[(m, due)] = incoming.get((m, due), 0.0) + coef * values["sub_used_for"][(s, k, t)]
+                for k in keys["items"]:
+                    used[k] = used.get(k, 0.0) + values["item_used"][(k, t)]
+
+            start += len(committed)
+
+        objective = value(self._objective_expr(d, lambda name, index: values[name].get(index, 0.0),
+                                               self._weights(d), weeks, keys))
+        self.model = _Solution(values, objective, keys, weeks)
+        if heuristic and termination == "optimal":
+            termination = "heuristic"
+        self.solver_results = SimpleNamespace(solver=SimpleNamespace(status=status, termination_condition=termination))
+        self.solve_info.update({"mode": "rolling_horizon", "heuristic": heuristic})
+
+    def _window_data(self, window_weeks, inventory, incoming, used) -> dict:
+        """Input data for one rolling-horizon window (week-indexed inputs cut to the window)."""
+        d = self._data
+        week_set = set(window_weeks)
+        wd = dict(d)
+        wd["weeks"] = list(window_weeks)
+        wd["params"] = {"mode": (d.get("params") or {}).get("mode"), "presolve": False}
+        wd.pop("warm_start", None)
+        for key in ("item_demands", "max_capacity", "availability"):
+            wd[key] = {k: v for k, v in d.get(key, {}).items() if k[-1] in week_set}
+        for key in ("crew_available", "energy_available"):
+            if key in d:
+                wd[key] = {t: v for t, v in d[key].items() if t in week_set}
+        wd["initial_inventory"] = deepcopy(inventory)
+        wd["incoming_waste"] = {(m, t): v for (m, t), v in incoming.items() if t in week_set}
+        # deadlines due in this window, less what committed weeks already used
+        wd["deadlines"] = [
+            {**dl, "amount": max(0.0, float(dl["amount"]) - used.get(dl["item"], 0.0))}
+            for dl in d.get("deadlines", [])
+            if "item" in dl and int(dl["week"]) in week_set
         ]
-        for key, _len in tuple_maps:
-            if key in d and isinstance(d[key], dict):
-                normalized_dict = {}
-                for k, v in d[key].items():
-                    if isinstance(k, str):
-                        tk = parse_key_string(k)
-                    elif isinstance(k, (list, tuple)):
-                        tk = tuple(int(x) if isinstance(x, str) and x.isdigit() else x for x in k)
-                    else:
-                        tk = (k,)
-                    normalized_dict[tk] = v
-                d[key] = normalized_dict
-
-        # normalize time dictionaries keys (crew_available / energy_available) -> int weeks
-        for tdict in ("crew_available", "energy_available"):
-            if tdict in d and isinstance(d[tdict], dict):
-                new = {}
-                for wk, val in d[tdict].items():
-                    wk_parsed = int(wk) if isinstance(wk, str) and wk.isdigit() else wk
-                    new[wk_parsed] = val
-                d[tdict] = new
+        return wd
+
+    # --------------------------
+    # MIP start
+    # --------------------------
+    def _mip_start(self) -> list:
+        """
+        (variable name, index, value) triples read back from a previous get_results()
+        attached as data["warm_start"]. Empty if there is none or its weeks/methods
+        no longer match the model; entries for entities or recipe/substitution pairs
+        that are not in the model are dropped.
+        """
+        if self._relaxed:
+            return []  # y is relaxed or fixed by the preview heuristic
+        previous = to_nested(self._data.get("warm_start") or {})
+        schedule = previous.get("schedule") or []
+        if not schedule:
+            return []
+        weeks = sorted(self._data["weeks"])
+        methods = set(self._input["methods"])
+        if [w.get("week") for w in schedule] != weeks or any(set(w.get("methods", {})) != methods for w in schedule):
+            print("Warm start skipped: the previous solution has different weeks or methods.")
+            return []
+
+        m = self.model
+        kept_methods = set(self._data["methods"])
+        outputs = set(self._data["outputs"])
+        items = set(self._data["items"])
+        subs = set(self._data["substitutes"])
+        week_set = set(weeks)
+        start = []
+        for w in schedule:
+            t = w["week"]
+            for r, entry in w["methods"].items():
+                if r not in kept_methods:
+                    continue
+                start.append(("y", (r, t), float(entry.get("is_running", 0))))
+                start.append(("Q", (r, t), float(entry.get("processed_kg", 0.0))))
+                for mat, v in (entry.get("by_material") or {}).items():
+                    if (mat, r) in m.MR:
+                        start.append(("P", (mat, r, t), float(v)))
+        for o in previous.get("outputs") or []:
+            if o.get("output") in outputs:
+                for w in o.get("weeks", []):
+                    if w.get("week") in week_set:
+                        start.append(("Oprod", (o["output"], w["week"]), float(w.get("produced_kg", 0.0))))
+                        start.append(("Oinv", (o["output"], w["week"]), float(w.get("inventory_kg", 0.0))))
+        for s in previous.get("substitutes") or []:
+            if s.get("substitute") in subs:
+                for w in s.get("weeks", []):
+                    if w.get("week") in week_set:
+                        t = w["week"]
+                        start.append(("make_sub", (s["substitute"], t), float(w.get("made", 0.0))))
+                        start.append(("sub_inv", (s["substitute"], t), float(w.get("inventory", 0.0))))
+                        for k, v in (w.get("used_for") or {}).items():
+                            if (s["substitute"], k) in m.SK:
+                                start.append(("sub_used_for", (s["substitute"], k, t), float(v)))
+        for k in previous.get("items") or []:
+            if k.get("item") in items:
+                for w in k.get("weeks", []):
+                    if w.get("week") in week_set:
+                        t = w["week"]
+                        start.append(("item_used", (k["item"], t), float(w.get("used_total", 0.0))))
+                        start.append(("carried_used", (k["item"], t), float(w.get("used_carried", 0.0))))
+                        start.append(("item_short", (k["item"], t), float(w.get("shortage", 0.0))))
+        return start
+
+    # --------------------------
+    # In-place updates
+    # --------------------------
+    def _diff_input(self, new: dict):
+        """
+        Changed MUTABLE_INPUTS values between the current data and `new`, as
+        {input_name: {key: new_value}}; None if a structural input (or the set of
+        weeks with crew/energy limits) changed.
+        """
+        old = self._data
+        for key in set(old) | set(new):
+            if key in MUTABLE_INPUTS or key in NON_MODEL_INPUTS:
+                continue
+            if old.get(key) != new.get(key):
+                return None
+        for key in ("crew_available", "energy_available"):
+            if set(old.get(key, {})) != set(new.get(key, {})):
+                return None
+
+        changes = {}
+        old_w, new_w = old.get("weights", {}), new.get("weights", {})
+        changes["weights"] = {
+            name: new_w.get(name, default)
+            for name, default in WEIGHT_DEFAULTS.items()
+            if old_w.get(name, default) != new_w.get(name, default)
+        }
+        old_dem, new_dem = old.get("item_demands", {}), new.get("item_demands", {})
+        changes["item_demands"] = {
+            key: new_dem.get(key, 0.0)
+            for key in set(old_dem) | set(new_dem)
+            if old_dem.get(key, 0.0) != new_dem.get(key, 0.0)
+        }
+        for key in ("crew_available", "energy_available"):
+            old_r, new_r = old.get(key, {}), new.get(key, {})
+            changes[key] = {t: v for t, v in new_r.items() if old_r[t] != v}
+        return changes
+
+    def _apply_changes(self, changes: dict):
+        m = self.model
+        for name, v in changes["weights"].items():
+            m.w[name] = float(v)
+        for (k, t), v in changes["item_demands"].items():
+            m.demand[k, t] = float(v)
+        for t, v in changes["crew_available"].items():
+            m.crew_available[t] = float(v)
+        for t, v in changes["energy_available"].items():
+            m.energy_available[t] = float(v)
+
+    # --------------------------
+    # Input normalization
+    # --------------------------
+    @staticmethod
+    def normalize_input(data: dict, in_place=False) -> dict:
+        """
+        Normalize tuple keys and fill defaults, converting each key once and copying no values.
+
+        Keyed maps may arrive with real tuple keys, "plastic,1" strings, or the
+        "('plastic', 1)" strings of a JSON message; weekly crew/energy maps may have "3"
+        string weeks. Maps whose keys are already normalized are kept as they are.
+
+        Args:
+            data: Input data dictionary
+            in_place: Convert `data` itself (e.g. a freshly decoded message), draining each
+                converted map as its replacement is built; otherwise only the top-level dict
+                and the maps that need converting are new
+
+        Returns:
+            Normalized data; it shares unconverted maps and values with `data`, so treat both as read-only
+        """
+        d = data if in_place else dict(data)
+
+        def parse_part(p):
+            p = p.strip().strip("'\"")
+            if p.isdigit():
+                return int(p)
+            if p[:1] in ("-", ".") or p[:1].isdigit():
+                try:
+                    return float(p)
+                except ValueError:
+                    pass
+            return p
+
+        def parse_key(k):
+            if isinstance(k, str):
+                k = k.strip()
+                if k.startswith("(") and k.endswith(")"):
+                    k = k[1:-1]
+                return tuple(parse_part(p) for p in k.split(","))
+            if isinstance(k, (list, tuple)):
+                return tuple(int(x) if isinstance(x, str) and x.isdigit() else x for x in k)
+            return (k,)
+
+        def parse_week(k):
+            return int(k) if isinstance(k, str) and k.isdigit() else k
+
+        def tuple_key(k):
+            return isinstance(k, tuple) and not any(isinstance(x, str) and x.isdigit() for x in k)
+
+        def week_key(k):
+            return not (isinstance(k, str) and k.isdigit())
+
+        def rekey(m, convert):
+            if not in_place:
+                return {convert(k): v for k, v in m.items()}
+            converted = {}
+            for k in list(m):
+                converted[convert(k)] = m.pop(k)
+            return converted
+
+        # dictionaries that should have tuple keys
+        tuple_maps = (
+            "item_demands", "yields", "max_capacity", "availability", "item_waste",
+            "substitute_waste", "substitute_make_recipe", "incoming_waste",
+        )
+        for key in tuple_maps:
+            if isinstance(d.get(key), dict) and not all(tuple_key(k) for k in d[key]):
+                d[key] = rekey(d[key], parse_key)
+
+        # time dictionaries (crew_available / energy_available) -> int weeks
+        for key in ("crew_available", "energy_available"):
+            if isinstance(d.get(key), dict) and not all(week_key(k) for k in d[key]):
+                d[key] = rekey(d[key], parse_week)
 
         # ensure nested structures exist
-        d.setdefault("item_demands", {})
-        d.setdefault("item_waste", {})
-        d.setdefault("substitute_make_recipe", {})
-        d.setdefault("substitute_assembly_crew", {})
-        d.setdefault("substitute_assembly_energy", {})
-        d.setdefault("substitute_values", {})
-        d.setdefault("substitute_mass", {})
-        d.setdefault("weights", {})
+        for key in ("item_demands", "item_waste", "substitute_make_recipe", "substitute_assembly_crew",
+                    "substitute_assembly_energy", "substitute_values", "substitute_mass", "weights",
+                    "substitutes_can_replace"):
+            d.setdefault(key, {})
 
         # ensure initial_inventory contains sub-keys
-        d.setdefault("initial_inventory", {})
-        d["initial_inventory"].setdefault("materials", {})
-        d["initial_inventory"].setdefault("outputs", {})
-        d["initial_inventory"].setdefault("items", {})
-        d["initial_inventory"].setdefault("substitutes", {})
-
-        # ensure substitutes_can_replace exists
-        d.setdefault("substitutes_can_replace", {})
+        inventory = d.get("initial_inventory") or {}
+        if not all(group in inventory for group in ("materials", "outputs", "items", "substitutes")):
+            inventory = inventory if in_place else dict(inventory)
+            for group in ("materials", "outputs", "items", "substitutes"):
+                inventory.setdefault(group, {})
+        d["initial_inventory"] = inventory
 
         return d
 
@@ -139,103 +919,292 @@ class MarsRecyclingOptimizer:
     # Input validation
     # --------------------------
     def _validate_input(self, d: dict) -> bool:
-        errors = []
-        # required lists
-        for name in ("materials", "methods", "outputs", "items", "substitutes", "weeks"):
-            if name not in d or not isinstance(d[name], list) or len(d[name]) == 0:
-                errors.append(f"'{name}' must be a non-empty list")
-
-        # weeks must be ints
-        if "weeks" in d:
-            for w in d["weeks"]:
-                if not isinstance(w, int):
-                    errors.append("All entries in 'weeks' must be integers")
-
-        # check tuple dicts consistency: yields, max_capacity, availability
-        for (mat, r, out), v in d.get("yields", {}).items():
-            if mat not in d["materials"]:
-                errors.append(f"yields: material '{mat}' not in materials")
-            if r not in d["methods"]:
-                errors.append(f"yields: method '{r}' not in methods")
-            if out not in d["outputs"]:
-                errors.append(f"yields: output '{out}' not in outputs")
-            if not isinstance(v, (int, float)) or v < 0:
-                errors.append(f"yields value for ({mat},{r},{out}) must be >= 0")
-
-        for (r, wk), v in d.get("max_capacity", {}).items():
-            if r not in d["methods"]:
-                errors.append(f"max_capacity method '{r}' not in methods")
-            if wk not in d["weeks"]:
-                errors.append(f"max_capacity week '{wk}' not in weeks")
-
-        for (r, wk), v in d.get("availability", {}).items():
-            if r not in d["methods"]:
-                errors.append(f"availability method '{r}' not in methods")
-            if wk not in d["weeks"]:
-                errors.append(f"availability week '{wk}' not in weeks")
-            if v not in (0, 1):
-                errors.append(f"availability value for ({r},{wk}) must be 0 or 1")
-
-        # item_demands keys (item, week)
-        for (item, wk), v in d.get("item_demands", {}).items():
-            if item not in d["items"]:
-                errors.append(f"item_demands: '{item}' not in items")
-            if wk not in d["weeks"]:
-                errors.append(f"item_demands: week '{wk}' not in weeks")
-            if not isinstance(v, (int, float)) or v < 0:
-                errors.append(f"item_demands value for ({item},{wk}) must be >= 0")
-
-        # item_waste (item, material)
-        for (item, mat), v in d.get("item_waste", {}).items():
-            if item not in d["items"]:
-                errors.append(f"item_waste: item '{item}' not found")
-            if mat not in d["materials"]:
-                errors.append(f"item_waste: material '{mat}' not found")
-            if not isinstance(v, (int, float)) or v < 0:
-                errors.append(f"item_waste value for ({item},{mat}) must be >= 0")
-
-        # substitute_make_recipe (sub, output)
-        for (sub, out), v in d.get("substitute_make_recipe", {}).items():
-            if sub not in d["substitutes"]:
-                errors.append(f"substitute_make_recipe: substitute '{sub}' not in substitutes")
-            if out not in d["outputs"]:
-                errors.append(f"substitute_make_recipe: output '{out}' not in outputs")
-            if not isinstance(v, (int, float)) or v < 0:
-                errors.append(f"substitute_make_recipe value for ({sub},{out}) must be >= 0")
-
-        # substitutes_can_replace
-        for item, subs in d.get("substitutes_can_replace", {}).items():
-            if item not in d.get("items", []):
-                errors.append(f"substitutes_can_replace: '{item}' not in items")
-            for s in subs:
-                if s not in d.get("substitutes", []):
-                    errors.append(f"substitutes_can_replace: '{s}' not in substitutes")
-
-        # basic numeric dictionaries existence & types are assumed — not all fields mandatory
-
-        if errors:
+        """Run validation.validate() on normalized input and print its errors."""
+        self.validation_errors = validate(d)
+        if self.validation_errors:
             print("Input validation errors:")
-            for e in errors:
-                print("  -", e)
+            for e in self.validation_errors:
+                print("  -", e["message"])
             return False
 
         print("Input validation passed.")
         return True
 
+    # --------------------------
+    # Presolve
+    # --------------------------
+    def _presolve(self, d: dict, verbose=True):
+        """
+        Drop entities and limits that cannot change the optimum before the model is built
+        (params.presolve = false turns this off):
+          - methods without capacity, or unavailable, in every week
+          - items with no demand and no deadline (they are never used)
+          - substitutes no remaining item can use whose making is worth nothing (w_make * value <= 0),
+            consumes no capped output and frees no crew/energy
+          - outputs without objective weight, storage cap or remaining substitute consuming them
+          - materials no remaining method processes and whose inventory cannot hit a storage cap
+          - infinite storage caps and crew/energy limits, and limits no remaining method or substitute draws on
+        Weeks are all kept: inventories link each week to the next.
+
+        Returns:
+            (reduced data for the model builders, {kind: [removed names or weeks]})
+        """
+        if (d.get("params") or {}).get("presolve") is False:
+            return d, {}
+        weeks = sorted(d["weeks"])
+        w = self._weights(d)
+        R_max = d.get("max_capacity", {})
+        avail = d.get("availability", {})
+        yields = d.get("yields", {})
+        removed = {}
+
+        def finite(v):
+            return v is not None and math.isfinite(float(v))
+
+        methods = [
+            r for r in d["methods"]
+            if any(float(R_max.get((r, t), 0.0)) > 0 and avail.get((r, t), 1) != 0 for t in weeks)
+        ]
+
+        demanded = {k for (k, _), v in d.get("item_demands", {}).items() if v > 0}
+        demanded |= {dl["item"] for dl in d.get("deadlines", []) if "item" in dl and float(dl["amount"]) > 0}
+        items = [k for k in d["items"] if k in demanded]
+        item_set = set(items)
+
+        Cap_out = {o: v for o, v in d.get("output_capacity", {}).items() if finite(v)}
+        sub_recipe = d.get("substitute_make_recipe", {})
+        usable = {s for k, allowed in d.get("substitutes_can_replace", {}).items() if k in item_set for s in allowed}
+        # making a substitute nobody uses still pays off if it is rewarded, drains a capped output
+        # (the only way to empty it), or frees crew/energy (negative assembly cost)
+        rewarded = {s for s, v in d.get("substitute_values", {}).items() if w["make"] * v > 0}
+        draining = {s for (s, o), ratio in sub_recipe.items() if ratio and o in Cap_out}
+        freeing = {s for key in ("substitute_assembly_crew", "substitute_assembly_energy")
+                   for s, v in d.get(key, {}).items() if v < 0}
+        subs = [s for s in d["substitutes"] if s in usable or s in rewarded or s in draining or s in freeing]
+        sub_set = set(subs)
+
+        output_values = d.get("output_values", {})
+        consumed = {o for (s, o), ratio in sub_recipe.items() if ratio and s in sub_set}
+        outputs = [
+            o for o in d["outputs"]
+            if o in consumed or o in Cap_out or w["mass"] + w["value"] * output_values.get(o, 0.0) != 0
+        ]
+
+        method_set = set(methods)
+        Cap_in = {m: v for m, v in d.get("input_capacity", {}).items() if finite(v)}
+        processed = {m for (m, r, _) in yields if r in method_set}
+        processed |= {m for m, r in disposal_pairs(d) if r in method_set}
+        wasted = {m for (k, m), coef in d.get("item_waste", {}).items() if coef and k in item_set}
+        wasted |= {m for (s, m), coef in d.get("substitute_waste", {}).items() if coef and s in sub_set}
+        S_in0 = d.get("initial_inventory", {}).get("materials", {})
+        incoming_total = {}
+        for (m, _), v in d.get("incoming_waste", {}).items():
+            incoming_total[m] = incoming_total.get(m, 0.0) + v
+        # an unprocessed material only piles up; that matters only if it can exceed its cap
+        materials = [
+            m for m in d["materials"]
+            if m in processed or (m in Cap_in and (m in wasted or S_in0.get(m, 0.0) + incoming_total.get(m, 0.0) > Cap_in[m]))
+        ]
+
+        r = dict(d)
+        for key, kept in (("methods", methods), ("items", items), ("substitutes", subs),
+                          ("outputs", outputs), ("materials", materials)):
+            dropped = [e for e in d[key] if e not in set(kept)]
+            if dropped:
+                removed[key] = dropped
+            r[key] = kept
+        r["item_demands"] = {key: v for key, v in d.get("item_demands", {}).items() if key[0] in item_set}
+        r["deadlines"] = [dl for dl in d.get("deadlines", []) if "item" not in dl or dl["item"] in item_set]
+        for key, caps in (("output_capacity", Cap_out), ("input_capacity", Cap_in)):
+            dropped = [e for e in d.get(key, {}) if e not in caps]
+            if dropped:
+                removed[key] = dropped
+                r[key] = caps
+        for key, method_cost, assembly_cost in (
+            ("crew_available", d.get("crew_cost", {}), d.get("substitute_assembly_crew", {})),
+            ("energy_available", d.get("energy_cost", {}), d.get("substitute_assembly_energy", {})),
+        ):
+            drawn = any(method_cost.get(m, 0.0) for m in methods) or any(assembly_cost.get(s, 0.0) for s in subs)
+            limits = {t: v for t, v in d.get(key, {}).items() if finite(v) and (drawn or v < 0)}
+            dropped = sorted(t for t in d.get(key, {}) if t not in limits)
+            if dropped:
+                removed[key] = dropped
+                r[key] = limits
+
+        # keep at least one entity of each kind so the model keeps its shape
+        for key in ("methods", "items", "substitutes", "outputs", "materials"):
+            if not r[key]:
+                r[key] = d[key][:1]
+                removed[key] = removed[key][1:]
+                if not removed[key]:
+                    del removed[key]
+        if removed and verbose:
+            print("Presolve removed: " + "; ".join(f"{key}: {', '.join(map(str, v))}" for key, v in removed.items()))
+        return (r, removed) if removed else (d, {})
+
     # --------------------------
     # Solver selection
     # --------------------------
     def _select_solver(self):
         for name in self.solvers:
-            try:
-                solver = SolverFactory(name)
-                if solver.available():
-                    print(f"Selected solver: {name}")
-                    return solver
-            except Exception:
-                continue
+            if self._probe(name)["available"]:
+                print(f"Selected solver: {name}")
+                self.solver_name = name
+                return self._solver_handle(name)
         return None
 
+    def _thread_options(self) -> dict:
+        """Thread count option of the selected solver, if its probe recorded one (see probe_solvers)."""
+        threads = self._probe(self.solver_name)["threads"] if self.solver_name else None
+        if threads and self.solver_name in self.THREAD_OPTIONS:
+            return {self.THREAD_OPTIONS[self.solver_name]: threads}
+        return {}
+
+    def _solver_handle(self, name):
+        """
+        The process-wide solver object for `name`. Persistent interfaces load whichever
+        model they are asked to solve (set_instance() when it is not the one they hold).
+        """
+        return _SOLVER_HANDLES[(type(self), name)]
+
+    @classmethod
+    def probe_solvers(cls, names=None, threads=None) -> dict:
+        """
+        Availability and capabilities of solvers, probed once per process
+
+        Args:
+            names: Solver names (defaults to DEFAULT_SOLVERS)
+            threads: Threads per solve for the multi-threaded solvers (THREAD_OPTIONS);
+                None leaves them at their default. Fixed by the first probe in the process.
+
+        Returns:
+            {name: {"available", "version", "warm_start", "persistent", "threads"}}
+            ("threads" is None for a solver default, 1 for single-threaded solvers)
+        """
+        return {name: cls._probe(name, threads) for name in (names or cls.DEFAULT_SOLVERS)}
+
+    @classmethod
+    def _probe(cls, name, threads=None) -> dict:
+        key = (cls, name)
+        if key not in _SOLVER_PROBES:
+            probe = cls._probe_solver(name)
+            probe["threads"] = threads if name in cls.THREAD_OPTIONS else 1
+            _SOLVER_PROBES[key] = probe
+        return _SOLVER_PROBES[key]
+
+    @classmethod
+    def _probe_solver(cls, name) -> dict:
+        """Check a Pyomo solver once (executable solvers search the PATH and may run a subprocess)."""
+        probe = {"available": False, "version": None, "warm_start": False, "persistent": False}
+        try:
+            solver = SolverFactory(name)
+            if not solver.available():
+                return probe
+        except Exception:
+            return probe
+        _SOLVER_HANDLES[(cls, name)] = solver
+        probe["available"] = True
+        try:
+            version = solver.version()
+            probe["version"] = ".".join(map(str, version)) if version else None
+        except Exception:
+            pass
+        try:
+            probe["warm_start"] = bool(getattr(solver, "warm_start_capable", lambda: False)())
+        except Exception:
+            pass
+        probe["persistent"] = hasattr(solver, "set_instance")
+        # the persistent highs interface gets its MIP start through highspy (see _highs_start)
+        probe["warm_start"] = probe["warm_start"] or (probe["persistent"] and hasattr(solver, "_pyomo_var_to_solver_var_map"))
+        return probe
+
+    # --------------------------
+    # Sparse index construction
+    # --------------------------
+    def _sparse_index(self, d: dict) -> dict:
+        """Index sets and adjacency lists shared by the model builders (only nonzero structure is kept)."""
+        materials = d["materials"]
+        methods = d["methods"]
+        outputs = d["outputs"]
+        items = d["items"]
+        subs = d["substitutes"]
+        weeks = sorted(d["weeks"])
+        item_lifetime = d.get("item_lifetime", {})
+        sub_lifetime = d.get("substitute_lifetime", {})
+        item_waste = d.get("item_waste", {})
+        sub_waste = d.get("substitute_waste", {})
+
+        # substitute/item pairs allowed by substitutes_can_replace (sparse index for sub_used_for)
+        week_set = set(weeks)
+        material_set = set(materials)
+        item_set = set(items)
+        sub_set = set(subs)
+        sub_item_pairs = []
+        items_for_sub = {s: [] for s in subs}
+        subs_for_item = {k: [] for k in items}
+        for k, allowed_subs in d.get("substitutes_can_replace", {}).items():
+            if k not in item_set:
+                continue
+            for s in allowed_subs:
+                if s in sub_set and k not in items_for_sub[s]:
+                    sub_item_pairs.append((s, k))
+                    items_for_sub[s].append(k)
+                    subs_for_item[k].append(s)
+
+        # (material, method) pairs that have a recipe (sparse index for P) and output -> recipe adjacency
+        method_set = set(methods)
+        output_set = set(outputs)
+        recipe_pairs = []
+        methods_for_material = {m: [] for m in materials}
+        materials_for_method = {r: [] for r in methods}
+        recipes_for_output = {o: [] for o in outputs}
+        for (m, r, o), y in d.get("yields", {}).items():
+            if m not in material_set or r not in method_set:
+                continue
+            # an output removed by presolve still makes (m, r) a recipe pair; it just gets no Oprod row
+            if r not in methods_for_material[m]:
+                recipe_pairs.append((m, r))
+                methods_for_material[m].append(r)
+                materials_for_method[r].append(m)
+            if y and o in output_set:
+                recipes_for_output[o].append((y, m, r))
+        # zero-yield pairs (disposal) that can change the optimum: they drain inventory and add throughput only
+        for m, r in disposal_pairs(d):
+            recipe_pairs.append((m, r))
+            methods_for_material[m].append(r)
+            materials_for_method[r].append(m)
+
+        # lifetime-shifted waste index: (material, week) -> usage terms whose waste lands in that week.
+        # Usage at tau generates waste at tau + lifetime, so only nonzero waste entries are walked.
+        item_waste_into = {}
+        for (k, m), coef in item_waste.items():
+            if not coef or k not in item_set or m not in material_set:
+                continue
+            life_k = int(item_lifetime.get(k, 0))
+            for tau in weeks:
+                if tau + life_k in week_set:
+                    item_waste_into.setdefault((m, tau + life_k), []).append((coef, k, tau))
+        sub_waste_into = {}
+        for (s, m), coef in sub_waste.items():
+            if not coef or s not in sub_set or m not in material_set:
+                continue
+            life_s = int(sub_lifetime.get(s, 0))
+            for tau in weeks:
+                if tau + life_s in week_set:
+                    sub_waste_into.setdefault((m, tau + life_s), []).append((coef, s, tau))
+
+        return {
+            "sub_item_pairs": sub_item_pairs,
+            "items_for_sub": items_for_sub,
+            "subs_for_item": subs_for_item,
+            "recipe_pairs": recipe_pairs,
+            "methods_for_material": methods_for_material,
+            "materials_for_method": materials_for_method,
+            "recipes_for_output": recipes_for_output,
+            "item_waste_into": item_waste_into,
+            "sub_waste_into": sub_waste_into,
+        }
+
     # --------------------------
     # Model building
     # --------------------------
@@ -258,22 +1227,28 @@ class MarsRecyclingOptimizer:
         model.S = Set(initialize=subs)
         model.T = Set(initialize=weeks)
 
+        idx = self._sparse_index(d)
+        items_for_sub = idx["items_for_sub"]
+        subs_for_item = idx["subs_for_item"]
+        methods_for_material = idx["methods_for_material"]
+        materials_for_method = idx["materials_for_method"]
+        recipes_for_output = idx["recipes_for_output"]
+        item_waste_into = idx["item_waste_into"]
+        sub_waste_into = idx["sub_waste_into"]
+        model.SK = Set(dimen=2, initialize=idx["sub_item_pairs"])
+        model.MR = Set(dimen=2, initialize=idx["recipe_pairs"])
+
         # convenient dict accessors with defaults
         S_in0 = d.get("initial_inventory", {}).get("materials", {})
         S_out0 = d.get("initial_inventory", {}).get("outputs", {})
         S_items0 = d.get("initial_inventory", {}).get("items", {})
         S_subs0 = d.get("initial_inventory", {}).get("substitutes", {})
 
-        item_mass = d.get("item_mass", {})
         sub_mass = d.get("substitute_mass", {})
         item_demands = d.get("item_demands", {})  # keys (item, week)
-        item_lifetime = d.get("item_lifetime", {})  # item->int
-        sub_lifetime = d.get("substitute_lifetime", {})  # sub->int
-        item_waste = d.get("item_waste", {})
-        sub_waste = d.get("substitute_waste", {})
         sub_recipe = d.get("substitute_make_recipe", {})
+        incoming_waste = d.get("incoming_waste", {})  # keys (material, week): waste due from usage before the first week
 
-        yields = d.get("yields", {})
         R_max = d.get("max_capacity", {})
         M_min = d.get("min_lot_size", {})
         C_crew = d.get("crew_cost", {})
@@ -283,25 +1258,25 @@ class MarsRecyclingOptimizer:
         Cap_out = d.get("output_capacity", {})
         Cap_in = d.get("input_capacity", {})
         avail = d.get("availability", {})
-        RiskCost = d.get("risk_cost", {})
-        output_values = d.get("output_values", {})
-        sub_values = d.get("substitute_values", {})
-        substitutes_can_replace = d.get("substitutes_can_replace", {})
 
+        # -------------------------
+        # Mutable parameters (see update())
+        # -------------------------
         weights = d.get("weights", {})
-        w_mass = weights.get("mass", 0.0)
-        w_value = weights.get("value", 0.0)
-        w_crew = weights.get("crew", 0.0)
-        w_energy = weights.get("energy", 0.0)
-        w_risk = weights.get("risk", 0.0)
-        w_make = weights.get("make", 0.0)
-        w_carry = weights.get("carry", 0.0)  # typically negative to penalize using carried mass
-        w_short = weights.get("shortage", 10000.0)
+        model.w = Param(list(WEIGHT_DEFAULTS), mutable=True,
+                        initialize={name: float(weights.get(name, default)) for name, default in WEIGHT_DEFAULTS.items()})
+        model.demand = Param(model.K, model.T, mutable=True,
+                             initialize=lambda _, k, t: float(item_demands.get((k, t), 0.0)))
+        # weeks without a limit get no resource row (an infinite right-hand side could not be updated later)
+        model.crew_available = Param([t for t in weeks if t in Crew], mutable=True,
+                                     initialize=lambda _, t: float(Crew[t]))
+        model.energy_available = Param([t for t in weeks if t in Energy], mutable=True,
+                                       initialize=lambda _, t: float(Energy[t]))
 
         # -------------------------
         # Decision variables
         # -------------------------
-        model.P = Var(model.M, model.R, model.T, domain=NonNegativeReals)   # material processed by method (kg)
+        model.P = Var(model.MR, model.T, domain=NonNegativeReals)           # material processed by method (kg, recipe and disposal pairs only)
         model.Q = Var(model.R, model.T, domain=NonNegativeReals)            # total processed per method-week
         model.y = Var(model.R, model.T, domain=Binary)                      # method on/off
 
@@ -313,7 +1288,7 @@ class MarsRecyclingOptimizer:
         model.make_sub = Var(model.S, model.T, domain=NonNegativeReals)    # units made of substitute s in week t
         model.sub_inv = Var(model.S, model.T, domain=NonNegativeReals)     # substitute inventory end-week
 
-        model.sub_used_for = Var(model.S, model.K, model.T, domain=NonNegativeReals)  # units of sub s used for item k in week t
+        model.sub_used_for = Var(model.SK, model.T, domain=NonNegativeReals)  # units of sub s used for item k in week t (allowed pairs only)
 
         model.carried_used = Var(model.K, model.T, domain=NonNegativeReals)  # carried units used
         model.carried_inv = Var(model.K, model.T, domain=NonNegativeReals)   # carried inventory end-week
@@ -331,10 +1306,13 @@ class MarsRecyclingOptimizer:
         # -------------------------
         # Constraints
         # -------------------------
+        # rows whose duals are reported as shadow prices (see _dual_prices): name -> {index: constraint}
+        model.dual_rows = {name: {} for name in DUAL_ROWS}
+
         model.con_link_Q = ConstraintList()
         for r in model.R:
             for t in model.T:
-                model.con_link_Q.add(model.Q[r, t] == sum(model.P[m, r, t] for m in model.M))
+                model.con_link_Q.add(model.Q[r, t] == sum(model.P[m, r, t] for m in materials_for_method[r]))
 
         # outputs from processing (yields)
         model.con_output_prod = ConstraintList()
@@ -342,7 +1320,7 @@ class MarsRecyclingOptimizer:
             for t in model.T:
                 model.con_output_prod.add(
                     model.Oprod[o, t] ==
-                    sum(yields.get((m, r, o), 0.0) * model.P[m, r, t] for m in model.M for r in model.R)
+                    sum(y * model.P[m, r, t] for y, m, r in recipes_for_output[o])
                 )
 
         # output inventory: prev + produced - consumed_by_substitute_making
@@ -351,10 +1329,12 @@ class MarsRecyclingOptimizer:
             for t in model.T:
                 prev_inv = S_out0.get(o, 0.0) if t == first_week else model.Oinv[o, prev[t]]
                 consumes = sum(sub_recipe.get((s, o), 0.0) * model.make_sub[s, t] for s in model.S)
-                model.con_output_inv.add(model.Oinv[o, t] == prev_inv + model.Oprod[o, t] - consumes)
+                model.dual_rows["output_inv"][o, t] = model.con_output_inv.add(
+                    model.Oinv[o, t] == prev_inv + model.Oprod[o, t] - consumes
+                )
                 # capacity if specified
                 if o in Cap_out:
-                    model.con_output_inv.add(model.Oinv[o, t] <= Cap_out[o])
+                    model.dual_rows["output_cap"][o, t] = model.con_output_inv.add(model.Oinv[o, t] <= Cap_out[o])
 
         # material inventory: prev + base_waste + item/substitute-derived waste - processed
         model.con_material_inv = ConstraintList()
@@ -363,36 +1343,33 @@ class MarsRecyclingOptimizer:
                 prev_inv = S_in0.get(m, 0.0) if t == first_week else model.Minv[m, prev[t]]
 
                 # contributions from used carried items whose lifetime ends now
-                carried_waste = 0
-                for k in model.K:
-                    life_k = int(d.get("item_lifetime", {}).get(k, 0))
-                    # if usage at tau generates waste at t: tau + life_k == t
-                    for tau in model.T:
-                        if tau + life_k == t:
-                            carried_waste += item_waste.get((k, m), 0.0) * model.carried_used[k, tau]
+                carried_waste = sum(
+                    coef * model.carried_used[k, tau] for coef, k, tau in item_waste_into.get((m, t), ())
+                )
 
                 # contributions from substitutes used earlier whose lifetime expires now
-                subs_waste = 0
-                for s in model.S:
-                    life_s = int(d.get("substitute_lifetime", {}).get(s, 0))
-                    for tau in model.T:
-                        if tau + life_s == t:
-                            # sum over which item that substitute was used for
-                            subs_waste += sum(sub_waste.get((s, m), 0.0) * model.sub_used_for[s, k, tau] for k in model.K)
-
-                processed = sum(model.P[m, r, t] for r in model.R)
-                model.con_material_inv.add(model.Minv[m, t] == prev_inv + carried_waste + subs_waste - processed)
+                # (summed over which item that substitute was used for)
+                subs_waste = sum(
+                    coef * model.sub_used_for[s, k, tau]
+                    for coef, s, tau in sub_waste_into.get((m, t), ())
+                    for k in items_for_sub[s]
+                )
+
+                processed = sum(model.P[m, r, t] for r in methods_for_material[m])
+                model.dual_rows["material_inv"][m, t] = model.con_material_inv.add(
+                    model.Minv[m, t] == prev_inv + incoming_waste.get((m, t), 0.0) + carried_waste + subs_waste - processed
+                )
                 # capacity if specified
                 if m in Cap_in:
-                    model.con_material_inv.add(model.Minv[m, t] <= Cap_in[m])
+                    model.dual_rows["input_cap"][m, t] = model.con_material_inv.add(model.Minv[m, t] <= Cap_in[m])
 
         # substitute inventories
         model.con_sub_inv = ConstraintList()
         for s in model.S:
             for t in model.T:
                 prev_s = S_subs0.get(s, 0.0) if t == first_week else model.sub_inv[s, prev[t]]
-                used = sum(model.sub_used_for[s, k, t] for k in model.K)
-                model.con_sub_inv.add(model.sub_inv[s, t] == prev_s + model.make_sub[s, t] - used)
+                used = sum(model.sub_used_for[s, k, t] for k in items_for_sub[s])
+                model.dual_rows["sub_inv"][s, t] = model.con_sub_inv.add(model.sub_inv[s, t] == prev_s + model.make_sub[s, t] - used)
 
         # carried item inventories (decrease when used)
         model.con_carried_inv = ConstraintList()
@@ -400,9 +1377,13 @@ class MarsRecyclingOptimizer:
             for t in model.T:
                 if t == first_week:
                     init = float(S_items0.get(k, 0.0))
-                    model.con_carried_inv.add(model.carried_inv[k, t] == init - model.carried_used[k, t])
+                    model.dual_rows["carried_inv"][k, t] = model.con_carried_inv.add(
+                        model.carried_inv[k, t] == init - model.carried_used[k, t]
+                    )
                 else:
-                    model.con_carried_inv.add(model.carried_inv[k, t] == model.carried_inv[k, prev[t]] - model.carried_used[k, t])
+                    model.dual_rows["carried_inv"][k, t] = model.con_carried_inv.add(
+                        model.carried_inv[k, t] == model.carried_inv[k, prev[t]] - model.carried_used[k, t]
+                    )
 
         # usage composition and demand satisfaction
         model.con_usage_demand = ConstraintList()
@@ -410,31 +1391,21 @@ class MarsRecyclingOptimizer:
             for t in model.T:
                 # item_used = carried_used + substitutes used for this item
                 model.con_usage_demand.add(
-                    model.item_used[k, t] == model.carried_used[k, t] + sum(model.sub_used_for[s, k, t] for s in model.S)
+                    model.item_used[k, t] == model.carried_used[k, t] + sum(model.sub_used_for[s, k, t] for s in subs_for_item[k])
                 )
-                demand_val = float(item_demands.get((k, t), 0.0))
-                model.con_usage_demand.add(model.item_used[k, t] + model.item_short[k, t] == demand_val)
-
-        # disallow substitute usage if not allowed by mapping
-        model.con_sub_allowed = ConstraintList()
-        for s in model.S:
-            for k in model.K:
-                allowed = s in substitutes_can_replace.get(k, [])
-                if not allowed:
-                    for t in model.T:
-                        model.con_sub_allowed.add(model.sub_used_for[s, k, t] == 0)
+                model.con_usage_demand.add(model.item_used[k, t] + model.item_short[k, t] == model.demand[k, t])
 
         # processing capacity, availability, min-lot
         model.con_proc_cap = ConstraintList()
         for r in model.R:
             for t in model.T:
                 rmax = float(R_max.get((r, t), 0.0))
-                model.con_proc_cap.add(model.Q[r, t] <= rmax * model.y[r, t])
+                model.dual_rows["proc_cap"][r, t] = model.con_proc_cap.add(model.Q[r, t] <= rmax * model.y[r, t])
                 if avail.get((r, t), 1) == 0:
                     model.con_proc_cap.add(model.y[r, t] == 0)
                 minlot = float(M_min.get(r, 0.0))
                 if minlot > 0:
-                    model.con_proc_cap.add(minlot * model.y[r, t] <= model.Q[r, t])
+                    model.dual_rows["min_lot"][r, t] = model.con_proc_cap.add(minlot * model.y[r, t] <= model.Q[r, t])
 
         # link Q and P already with con_link_Q
 
@@ -445,8 +1416,10 @@ class MarsRecyclingOptimizer:
             recycle_energy = sum(C_energy.get(r, 0.0) * model.Q[r, t] for r in model.R)
             assembly_crew = sum(d.get("substitute_assembly_crew", {}).get(s, 0.0) * model.make_sub[s, t] for s in model.S)
             assembly_energy = sum(d.get("substitute_assembly_energy", {}).get(s, 0.0) * model.make_sub[s, t] for s in model.S)
-            model.con_resource.add(recycle_crew + assembly_crew <= float(Crew.get(t, float("inf"))))
-            model.con_resource.add(recycle_energy + assembly_energy <= float(Energy.get(t, float("inf"))))
+            if t in model.crew_available:
+                model.dual_rows["crew"][t] = model.con_resource.add(recycle_crew + assembly_crew <= model.crew_available[t])
+            if t in model.energy_available:
+                model.dual_rows["energy"][t] = model.con_resource.add(recycle_energy + assembly_energy <= model.energy_available[t])
 
         # deadlines: cumulative usage up to deadline >= required
         model.con_deadlines = ConstraintList()
@@ -460,148 +1433,200 @@ class MarsRecyclingOptimizer:
         # -------------------------
         # Objective
         # -------------------------
-        total_output_value = sum(output_values.get(o, 0.0) * model.Oprod[o, t] for o in model.O for t in model.T)
-        total_output_mass = sum(model.Oprod[o, t] for o in model.O for t in model.T)
-        total_crew_cost = sum(C_crew.get(r, 0.0) * model.Q[r, t] for r in model.R for t in model.T)
-        total_energy_cost = sum(C_energy.get(r, 0.0) * model.Q[r, t] for r in model.R for t in model.T)
-        total_risk_cost = sum(RiskCost.get(r, 0.0) * model.Q[r, t] for r in model.R for t in model.T)
-        substitutes_value = sum(sub_values.get(s, 0.0) * model.make_sub[s, t] for s in model.S for t in model.T)
-        carried_mass_used = sum(item_mass.get(k, 0.0) * model.carried_used[k, t] for k in model.K for t in model.T)
-        total_shortage = sum(model.item_short[k, t] for k in model.K for t in model.T)
-
-        # Note: w_carry expected typically negative to **penalize** using carried items (i.e. prefer making substitutes).
         model.objective = Objective(
-            expr=(
-                w_mass * total_output_mass
-                + w_value * total_output_value
-                - w_crew * total_crew_cost
-                - w_energy * total_energy_cost
-                - w_risk * total_risk_cost
-                + w_make * substitutes_value
-                + w_carry * carried_mass_used
-                - w_short * total_shortage
-            ),
+            expr=self._objective_expr(d, lambda name, index: getattr(model, name)[index], model.w, weeks),
             sense=maximize
         )
 
         return model
 
+    def _weights(self, d: dict) -> dict:
+        weights = d.get("weights", {})
+        return {name: float(weights.get(name, default)) for name, default in WEIGHT_DEFAULTS.items()}
+
+    def _objective_expr(self, d: dict, var, w, weeks, keys=None):
+        """
+        Objective over `weeks`; var(name, index) gives the variable (or its value) and
+        w the weights, so this serves the Pyomo model and committed rolling-horizon values.
+        """
+        keys = keys or d
+        C_crew = d.get("crew_cost", {})
+        C_energy = d.get("energy_cost", {})
+        RiskCost = d.get("risk_cost", {})
+        output_values = d.get("output_values", {})
+        sub_values = d.get("substitute_values", {})
+        item_mass = d.get("item_mass", {})
+
+        total_output_value = sum(output_values.get(o, 0.0) * var("Oprod", (o, t)) for o in keys["outputs"] for t in weeks)
+        total_output_mass = sum(var("Oprod", (o, t)) for o in keys["outputs"] for t in weeks)
+        total_crew_cost = sum(C_crew.get(r, 0.0) * var("Q", (r, t)) for r in keys["methods"] for t in weeks)
+        total_energy_cost = sum(C_energy.get(r, 0.0) * var("Q", (r, t)) for r in keys["methods"] for t in weeks)
+        total_risk_cost = sum(RiskCost.get(r, 0.0) * var("Q", (r, t)) for r in keys["methods"] for t in weeks)
+        substitutes_value = sum(sub_values.get(s, 0.0) * var("make_sub", (s, t)) for s in keys["substitutes"] for t in weeks)
+        carried_mass_used = sum(item_mass.get(k, 0.0) * var("carried_used", (k, t)) for k in keys["items"] for t in weeks)
+        total_shortage = sum(var("item_short", (k, t)) for k in keys["items"] for t in weeks)
+
+        # Note: w_carry expected typically negative to **penalize** using carried items (i.e. prefer making substitutes).
+        return (
+            w["mass"] * total_output_mass
+            + w["value"] * total_output_value
+            - w["crew"] * total_crew_cost
+            - w["energy"] * total_energy_cost
+            - w["risk"] * total_risk_cost
+            + w["make"] * substitutes_value
+            + w["carry"] * carried_mass_used
+            - w["shortage"] * total_shortage
+        )
+
     # --------------------------
     # Extract results
     # --------------------------
-    def _extract_results(self) -> dict:
+    def _solution_arrays(self):
+        """
+        Solution values read in one pass per variable family
+
+        Returns:
+            (keys, arrays): {"methods": [...], ..., "recipe_pairs": [...], "sub_item_pairs": [...]}
+            with the entities in the model, and {family: array of entities x sorted weeks}
+            for every SOLUTION_FAMILIES family (rows in keys order; unset values are 0)
+        """
         m = self.model
-        d = self._data
+        if isinstance(m, _Solution):
+            return m.keys, m.arrays
+        sets = {"materials": m.M, "methods": m.R, "outputs": m.O, "items": m.K, "substitutes": m.S,
+                "recipe_pairs": m.MR, "sub_item_pairs": m.SK}
+        keys = {key: list(entities) for key, entities in sets.items()}
+        arrays = {}
+        for name, key in SOLUTION_FAMILIES.items():
+            # indices iterate entity-major over the sorted weeks; None (never set) becomes NaN, then 0
+            values = np.array(list(getattr(m, name).extract_values().values()), dtype=float)
+            arrays[name] = np.nan_to_num(values, copy=False).reshape(len(keys[key]), len(m.T))
+        return keys, arrays
+
+    def _solution_objective(self, keys, x) -> float:
+        """Objective value of the solution arrays: _objective_expr over whole rows of weeks at once."""
+        pos = {key: {e: i for i, e in enumerate(entities)} for key, entities in keys.items()}
+
+        def row(name, index):
+            return x[name][pos[SOLUTION_FAMILIES[name]][index[0]]]
+
+        # a single stand-in week: every term is an entity's row, so the expression sums to a per-week array
+        return float(np.sum(self._objective_expr(self._data, row, self._weights(self._data), [None], keys)))
+
+    def _extract_results(self) -> dict:
+        d = self._input  # full input: entities removed by presolve get their (fixed) values back
         weeks = sorted(d["weeks"])
+        T = len(weeks)
         materials = d["materials"]
         methods = d["methods"]
         outputs = d["outputs"]
         items = d["items"]
         subs = d["substitutes"]
-
-        def sv(x):
-            # Prefer direct .value when available to avoid Pyomo error logs on uninitialized vars
-            if hasattr(x, "value"):
-                try:
-                    v_attr = x.value
-                    return float(v_attr) if v_attr is not None else 0.0
-                except Exception:
-                    return 0.0
-            # Fallback for expressions/objectives/params without .value
-            try:
-                v = value(x)
-                return float(v) if v is not None else 0.0
-            except Exception:
-                return 0.0
-
-        schedule = []
-        for t in weeks:
-            t_entry = {"week": t, "methods": {}}
-            for r in methods:
-                t_entry["methods"][r] = {
-                    "processed_kg": sv(m.Q[r, t]),
-                    "is_running": int(round(sv(m.y[r, t]))),
-                    "by_material": {mat: sv(m.P[mat, r, t]) for mat in materials}
-                }
-            schedule.append(t_entry)
-
-        outputs_list = []
+        keys, x = self._solution_arrays()
+
+        def full(name, entities, key):
+            """Family values for every input entity (rows of entities the model does not have stay 0)."""
+            rows = np.zeros((len(entities), T))
+            pos = {e: i for i, e in enumerate(entities)}
+            rows[[pos[e] for e in keys[key]]] = x[name]
+            return rows
+
+        Q = full("Q", methods, "methods")
+        y = np.rint(full("y", methods, "methods")).astype(int)
+        Oprod = full("Oprod", outputs, "outputs")
+        Oinv = full("Oinv", outputs, "outputs")
+        make_sub = full("make_sub", subs, "substitutes")
+        sub_inv = full("sub_inv", subs, "substitutes")
+        carried_used = full("carried_used", items, "items")
+        item_used = full("item_used", items, "items")
+        item_short = full("item_short", items, "items")
+
+        # material x method and substitute x item values over the recipe / substitution pairs
+        material_pos = {mat: i for i, mat in enumerate(materials)}
+        method_pos = {r: i for i, r in enumerate(methods)}
+        item_pos = {k: i for i, k in enumerate(items)}
+        sub_pos = {s: i for i, s in enumerate(subs)}
+        pair_pos = {pair: i for i, pair in enumerate(keys["recipe_pairs"])}
+        P = np.zeros((len(materials), len(methods), T))
+        if keys["recipe_pairs"]:
+            P[[material_pos[mat] for mat, _ in keys["recipe_pairs"]], [method_pos[r] for _, r in keys["recipe_pairs"]]] = x["P"]
+        used_for = np.zeros((len(subs), len(items), T))
+        if keys["sub_item_pairs"]:
+            used_for[[sub_pos[s] for s, _ in keys["sub_item_pairs"]], [item_pos[k] for _, k in keys["sub_item_pairs"]]] = x["sub_used_for"]
+
+        kept = {name: set(keys[name]) for name in ("outputs", "substitutes")}
+        S_out0 = d.get("initial_inventory", {}).get("outputs", {})
         for o in outputs:
-            outputs_list.append({
-                "output": o,
-                "weeks": [{"week": t, "produced_kg": sv(m.Oprod[o, t]), "inventory_kg": sv(m.Oinv[o, t])} for t in weeks]
-            })
-
-        substitutes_table = []
-        for s in subs:
-            substitutes_table.append({
-                "substitute": s,
-                "weeks": [{"week": t, "made": sv(m.make_sub[s, t]), "inventory": sv(m.sub_inv[s, t]), "used_for": {k: sv(m.sub_used_for[s, k, t]) for k in items}} for t in weeks]
-            })
-
-        items_table = []
-        for k in items:
-            items_table.append({
-                "item": k,
-                "weeks": [{"week": t, "used_total": sv(m.item_used[k, t]), "used_carried": sv(m.carried_used[k, t]), "shortage": sv(m.item_short[k, t])} for t in weeks]
-            })
-
-        # Calculate substitute breakdown
-        substitute_breakdown = {}
+            if o not in kept["outputs"]:
+                # presolved: nothing consumes or values the output, so production follows from the yields
+                i = outputs.index(o)
+                for (mat, r, o2), v in d.get("yields", {}).items():
+                    if o2 == o and v and (mat, r) in pair_pos:
+                        Oprod[i] += v * x["P"][pair_pos[(mat, r)]]
+                Oinv[i] = float(S_out0.get(o, 0.0)) + np.cumsum(Oprod[i])
+        S_subs0 = d.get("initial_inventory", {}).get("substitutes", {})
         for s in subs:
-            total_made = sum(sv(m.make_sub[s, t]) for t in weeks)
-            substitute_breakdown[s] = total_made
+            if s not in kept["substitutes"]:
+                # presolved: nothing to replace and no value in making it, so the stock stays as it is
+                sub_inv[sub_pos[s]] = float(S_subs0.get(s, 0.0))
 
-        # Calculate weight loss from carried items
+        # Calculate substitute breakdown and weight loss from carried items
+        substitutes_made = make_sub.sum(axis=1)
+        substitute_breakdown = dict(zip(subs, substitutes_made.tolist()))
         item_mass = d.get("item_mass", {})
         S_items0 = d.get("initial_inventory", {}).get("items", {})
-        
-        carried_weight_loss = {}
-        total_weight_loss = 0.0
-        total_initial_carriage_weight = 0.0
-        total_final_carriage_weight = 0.0
-        
-        for k in items:
-            mass_per_item = item_mass.get(k, 0.0)
-            initial_units = S_items0.get(k, 0.0)
-            total_used = sum(sv(m.carried_used[k, t]) for t in weeks)
-            final_units = initial_units - total_used
-            
-            initial_weight = mass_per_item * initial_units
-            final_weight = mass_per_item * final_units
-            weight_loss = mass_per_item * total_used
-            
-            carried_weight_loss[k] = {
-                "initial_units": initial_units,
+        mass_per_item = np.array([item_mass.get(k, 0.0) for k in items], dtype=float)
+        initial_units = np.array([S_items0.get(k, 0.0) for k in items], dtype=float)
+        units_used = carried_used.sum(axis=1)
+        final_units = initial_units - units_used
+        carried_weight_loss = {
+            k: {
+                "initial_units": initial,
                 "units_used": total_used,
-                "final_units": final_units,
-                "mass_per_unit": mass_per_item,
-                "initial_weight": initial_weight,
-                "final_weight": final_weight,
-                "total_weight_loss": weight_loss
+                "final_units": final,
+                "mass_per_unit": mass,
+                "initial_weight": mass * initial,
+                "final_weight": mass * final,
+                "total_weight_loss": mass * total_used
             }
-            
-            total_initial_carriage_weight += initial_weight
-            total_final_carriage_weight += final_weight
-            total_weight_loss += weight_loss
+            for k, initial, total_used, final, mass in zip(
+                items, initial_units.tolist(), units_used.tolist(), final_units.tolist(), mass_per_item.tolist())
+        }
 
+        objective = self.model.objective  # Pyomo objective, or a solution value with .value
         summary = {
-            "objective_value": sv(m.objective),
-            "total_processed_kg": sum(sv(m.Q[r, t]) for r in methods for t in weeks),
-            "total_output_produced_kg": sum(sv(m.Oprod[o, t]) for o in outputs for t in weeks),
-            "total_substitutes_made": sum(sv(m.make_sub[s, t]) for s in subs for t in weeks),
+            "objective_value": objective.value if hasattr(objective, "value") else self._solution_objective(keys, x),
+            "total_processed_kg": float(Q.sum()),
+            "total_output_produced_kg": float(Oprod.sum()),
+            "total_substitutes_made": float(substitutes_made.sum()),
             "substitute_breakdown": substitute_breakdown,
-            "total_initial_carriage_weight": total_initial_carriage_weight,
-            "total_final_carriage_weight": total_final_carriage_weight,
-            "total_carried_weight_loss": total_weight_loss,
+            "total_initial_carriage_weight": float(mass_per_item @ initial_units),
+            "total_final_carriage_weight": float(mass_per_item @ final_units),
+            "total_carried_weight_loss": float(mass_per_item @ units_used),
             "carried_weight_loss_by_item": carried_weight_loss
         }
-
-        return {
-            "schedule": schedule,
-            "outputs": outputs_list,
-            "substitutes": substitutes_table,
-            "items": items_table,
-            "summary": summary,
-            "solver_status": getattr(self.solver_results, "solver", None).__dict__ if self.solver_results else None
+        solver_status = getattr(self.solver_results, "solver", None).__dict__ if self.solver_results else None
+        result_format = (self._data.get("params") or {}).get("results") or "full"
+        if result_format == "summary":
+            # compact results: the nested tables are not built
+            return {"summary": summary, "solver_status": solver_status}
+
+        entities = {"materials": materials, "methods": methods, "outputs": outputs, "items": items, "substitutes": subs}
+        families = {
+            "Q": Q, "y": y, "P": P, "Oprod": Oprod, "Oinv": Oinv, "make_sub": make_sub, "sub_inv": sub_inv,
+            "sub_used_for": used_for, "item_used": item_used, "carried_used": carried_used, "item_short": item_short,
         }
+        if result_format == "columnar":
+            return {
+                "format": "columnar",
+                "weeks": weeks,
+                "entities": entities,
+                "families": {name: _columnar_family(families[name], dims, dtype) for name, (dims, dtype) in FAMILIES.items()},
+                "summary": summary,
+                "solver_status": solver_status
+            }
+        if result_format != "full":
+            raise ValueError(f"Unknown params.results '{result_format}' (expected full, columnar or summary)")
+        results = nested_tables(weeks, entities, {name: values.ravel().tolist() for name, values in families.items()})
+        results.update(summary=summary, solver_status=solver_status)
+        return results
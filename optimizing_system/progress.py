@@ -0,0 +1,89 @@
+"""
+Solver progress reporting for anytime solving
+
+SolverProgress turns incumbent/bound updates from a running solve into throttled
+progress events {incumbent, bound, gap, elapsed}; watch_highs() feeds it from the
+MIP callbacks of a highspy instance (matrix backend, and Pyomo's HiGHS interfaces).
+"""
+import math
+import time
+
+
+class SolverProgress:
+    """Collects progress updates and passes them on to `callback(event)`"""
+
+    def __init__(self, callback, interval=1.0):
+        """
+        Args:
+            callback: Called with each progress event dict
+            interval: Minimum seconds between events (a new incumbent is always reported)
+        """
+        self.callback = callback
+        self.interval = interval
+        self.last = None
+        self._last_emitted = None
+
+    def report(self, incumbent=None, bound=None, elapsed=None):
+        """
+        Report the current incumbent objective, best bound and elapsed solve time
+
+        Args:
+            incumbent: Objective value of the best solution found so far (None if none yet)
+            bound: Best proven bound on the objective (None if unknown)
+            elapsed: Seconds since the solve started
+        """
+        incumbent = _finite(incumbent)
+        bound = _finite(bound)
+        if incumbent is None and bound is None:
+            return
+        gap = None
+        if incumbent is not None and bound is not None:
+            gap = abs(bound - incumbent) / max(abs(incumbent), 1e-10)
+        event = {
+            "incumbent": incumbent,
+            "bound": bound,
+            "gap": gap,
+            "elapsed": round(elapsed, 3) if elapsed is not None else None,
+        }
+
+        now = time.monotonic()
+        improved = incumbent is not None and (self.last is None or incumbent != self.last["incumbent"])
+        if not improved and self._last_emitted is not None and now - self._last_emitted < self.interval:
+            return
+        if self.last is not None and (event["incumbent"], event["bound"]) == (self.last["incumbent"], self.last["bound"]):
+            return
+        self.last = event
+        self._last_emitted = now
+        try:
+            self.callback(event)
+        except Exception as e:
+            print(f"Error reporting solver progress: {e}")
+
+
+def watch_highs(highs, progress):
+    """
+    Report MIP progress of a highspy.Highs instance (new incumbents and periodic bound updates)
+
+    Args:
+        highs: highspy.Highs instance about to run
+        progress: SolverProgress receiving the updates
+
+    Returns:
+        Function that removes the callbacks again
+    """
+    def on_event(event):
+        data = event.data_out
+        progress.report(incumbent=data.mip_primal_bound, bound=data.mip_dual_bound, elapsed=data.running_time)
+
+    highs.cbMipImprovingSolution.subscribe(on_event)
+    highs.cbMipInterrupt.subscribe(on_event)
+
+    def unwatch():
+        highs.cbMipImprovingSolution.unsubscribe(on_event)
+        highs.cbMipInterrupt.unsubscribe(on_event)
+
+    return unwatch
+
+
+def _finite(v):
+    return float(v) if v is not None and math.isfinite(v) else None
@@ -0,0 +1,160 @@
+"""
+Solver racing
+
+Runs several solver configurations ("strategies") on the same job in separate
+processes and keeps the first proven-optimal result; a strategy proving the
+model infeasible or unbounded ends the race with an error. Every strategy gets
+the race deadline as its time limit, so if none proves optimality in time the
+best solution found wins instead. Strategies still running when the race is
+decided are terminated. Processes are spawned, not forked: a forked child would
+inherit the worker's HiGHS thread pool in an unusable state.
+
+A strategy is written "backend:solver[:option=value...]", e.g. "pyomo:highs",
+"matrix:highs:random_seed=7"; options go to the solver as-is.
+"""
+import multiprocessing
+import queue
+import time
+
+# terminations proving the model has no optimal plan
+NO_PLAN = ("infeasible", "unbounded", "infeasibleOrUnbounded")
+
+
+def parse_strategy(spec):
+    """
+    Parse a strategy string
+
+    Args:
+        spec: "backend:solver[:option=value...]"
+
+    Returns:
+        {"name": spec, "backend": ..., "solver": ..., "options": {option: value}}
+    """
+    parts = [p.strip() for p in spec.split(":")]
+    if len(parts) < 2 or not parts[0] or not parts[1]:
+        raise ValueError(f"Invalid race strategy '{spec}' (expected backend:solver[:option=value...])")
+    options = {}
+    for part in parts[2:]:
+        option, _, v = part.partition("=")
+        options[option.strip()] = _option_value(v.strip())
+    return {"name": spec, "backend": parts[0], "solver": parts[1], "options": options}
+
+
+def race(optimizer_classes, strategies, data, workers, timeout):
+    """
+    Race strategies on one job
+
+    Args:
+        optimizer_classes: {backend: optimizer class}
+        strategies: Parsed strategies (see parse_strategy), in start order
+        data: Optimization data dictionary
+        workers: Maximum number of strategies running at once
+        timeout: Seconds until the best solution so far is taken
+
+    Returns:
+        (results, race_info): get_results() of the winner (solver_status already a
+        JSON-safe summary) and {"winner", "strategies", "elapsed"} for solver_status
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    start = time.monotonic()
+    deadline = start + timeout
+    pending = list(strategies)
+    running = {}   # strategy name -> process
+    outcomes = {}  # strategy name -> outcome dict (see _run_strategy)
+    winner = None
+
+    try:
+        while winner is None and (pending or running):
+            while pending and len(running) < max(1, workers):
+                strategy = pending.pop(0)
+                # wall-clock deadline: the child's own clock starts only after it has been spawned
+                stop_at = time.time() + max(deadline - time.monotonic(), 0.0)
+                process = ctx.Process(
+                    target=_run_strategy,
+                    args=(optimizer_classes[strategy["backend"]], strategy, data, stop_at, results),
+                    daemon=True,
+                )
+                process.start()
+                running[strategy["name"]] = process
+                print(f"Race: started {strategy['name']}")
+
+            try:
+                # strategies stop at their time limit; allow a little longer to load and send the solution
+                outcome = results.get(timeout=max(deadline - time.monotonic(), 0.0) + 10.0)
+            except queue.Empty:
+                print("Race: deadline passed without further results.")
+                break
+            name = outcome["strategy"]
+            process = running.pop(name, None)
+            if process is not None:
+                process.join(timeout=1.0)
+            outcomes[name] = outcome
+            print(f"Race: {name} finished ({outcome.get('termination_condition') or outcome.get('error')}) "
+                  f"after {outcome['elapsed']:.2f}s")
+            if outcome.get("termination_condition") == "optimal" and outcome.get("results") is not None:
+                winner = outcome
+            elif outcome.get("termination_condition") in NO_PLAN:
+                raise RuntimeError(f"Model is {outcome['termination_condition']} (proven by {name})")
+    finally:
+        for name, process in running.items():
+            if process.is_alive():
+                process.terminate()
+                print(f"Race: stopped {name}")
+            process.join(timeout=1.0)
+
+    if winner is None:
+        # best feasible solution among the strategies that hit their time limit
+        feasible = [o for o in outcomes.values() if o.get("results") is not None]
+        if not feasible:
+            errors = "; ".join(f"{name}: {o.get('error') or o.get('termination_condition')}" for name, o in outcomes.items())
+            raise RuntimeError(f"No race strategy found a solution ({errors or 'none finished'})")
+        winner = max(feasible, key=lambda o: o["objective"])
+
+    race_info = {
+        "winner": winner["strategy"],
+        "strategies": {
+            name: {"termination_condition": o.get("termination_condition"), "objective": o.get("objective"),
+                   "elapsed": o["elapsed"], **({"error": o["error"]} if o.get("error") else {})}
+            for name, o in outcomes.items()
+        },
+        "elapsed": round(time.monotonic() - start, 3),
+    }
+    return winner["results"], race_info
+
+
+def _run_strategy(optimizer_cls, strategy, data, stop_at, results):
+    """Solve in a child process and send {strategy, termination_condition, objective, results, elapsed[, error]}"""
+    started = time.monotonic()
+    outcome = {"strategy": strategy["name"]}
+    try:
+        model = optimizer_cls(preferred_solvers=[strategy["solver"]])
+        model.solver_options = dict(strategy["options"])
+        model.setup(data)
+        model.time_limit = max(stop_at - time.time(), 1.0)  # what is left after building the model
+        model.solve()
+        solver_info = getattr(model.solver_results, "solver", None)
+        termination = str(getattr(solver_info, "termination_condition", "unknown"))
+        outcome["termination_condition"] = termination
+        if termination not in NO_PLAN and getattr(solver_info, "has_solution", True):
+            output = model.get_results()
+            output["solver_status"] = {
+                "status": str(getattr(solver_info, "status", "unknown")),
+                "termination_condition": termination,
+                **model.solve_info,
+            }
+            outcome["results"] = output
+            outcome["objective"] = output["summary"]["objective_value"]
+    except Exception as e:
+        outcome["error"] = str(e)
+    outcome["elapsed"] = round(time.monotonic() - started, 3)
+    results.put(outcome)
+
+
+def _option_value(v):
+    for cast in (int, float):
+        try:
+            return cast(v)
+        except ValueError:
+            pass
+    return {"true": True, "false": False}.get(v.lower(), v)
@@ -0,0 +1,73 @@
+"""
+Test script to check the matrix-form backend against the Pyomo backend
+
+Both backends are set up and solved on the same instance; the objective values
+must agree and get_results() must have the same structure.
+"""
+import sys
+import time
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_worker import build_sample_data
+
+
+def run_backend(optimizer, data):
+    """
+    Set up and solve one backend
+
+    Args:
+        optimizer: MarsRecyclingOptimizer (or subclass) instance
+        data: Optimization data dictionary
+
+    Returns:
+        (results, build_seconds, solve_seconds)
+    """
+    start = time.time()
+    optimizer.setup(data)
+    built = time.time()
+    optimizer.solve()
+    solved = time.time()
+    return optimizer.get_results(), built - start, solved - built
+
+
+def compare_backends(data, pyomo_solvers=None, matrix_solvers=None, rel_tol=1e-6):
+    """
+    Solve the same instance with both backends and compare the results
+
+    Args:
+        data: Optimization data dictionary
+        pyomo_solvers: preferred_solvers for the Pyomo backend
+        matrix_solvers: preferred_solvers for the matrix backend
+        rel_tol: Relative tolerance on the objective value
+
+    Returns:
+        True if objectives and result structure match
+    """
+    reference, ref_build, ref_solve = run_backend(MarsRecyclingOptimizer(pyomo_solvers), data)
+    candidate, cand_build, cand_solve = run_backend(MatrixRecyclingOptimizer(matrix_solvers), data)
+
+    ref_obj = reference['summary']['objective_value']
+    cand_obj = candidate['summary']['objective_value']
+    same_objective = abs(ref_obj - cand_obj) <= rel_tol * max(1.0, abs(ref_obj))
+    same_structure = (
+        set(reference) == set(candidate)
+        and [w['week'] for w in reference['schedule']] == [w['week'] for w in candidate['schedule']]
+        and [o['output'] for o in reference['outputs']] == [o['output'] for o in candidate['outputs']]
+        and [s['substitute'] for s in reference['substitutes']] == [s['substitute'] for s in candidate['substitutes']]
+        and [k['item'] for k in reference['items']] == [k['item'] for k in candidate['items']]
+    )
+
+    print(f"Pyomo  backend: objective={ref_obj:.6f} build={ref_build:.3f}s solve={ref_solve:.3f}s")
+    print(f"Matrix backend: objective={cand_obj:.6f} build={cand_build:.3f}s solve={cand_solve:.3f}s")
+    print(f"Objective match: {same_objective}, structure match: {same_structure}")
+    return same_objective and same_structure
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("COMPARING PYOMO AND MATRIX BACKENDS")
+    print("="*60)
+
+    ok = compare_backends(build_sample_data())
+    sys.exit(0 if ok else 1)
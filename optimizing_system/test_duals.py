@@ -0,0 +1,118 @@
+"""
+Tests for shadow prices (MarsRecyclingOptimizer._dual_prices / _lp_duals)
+
+A shadow price is the objective change per unit increase of a right-hand side with
+the plan's on/off decisions y fixed. The LP with y fixed is solved again with every
+weekly crew and energy limit moved by +-DELTA: its value is concave in the limit, so
+the price must lie between the slope to the right and the slope to the left (and
+equal both where the two agree). Storage-cap and capacity prices must not be
+negative, and capacity in a week a method is off is worth nothing. Run with pytest,
+or as a script.
+"""
+import contextlib
+import io
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_worker import build_sample_data
+
+DELTA = 0.01
+TOL = 1e-6
+
+
+def build_limited_data():
+    """Sample data where crew limits the even weeks and energy the odd ones"""
+    data = build_sample_data()
+    data["crew_available"] = {t: 2.0 for t in data["weeks"]}
+    data["energy_available"] = {t: 5.0 if t % 2 else 60.0 for t in data["weeks"]}
+    return data
+
+
+def solve_duals(optimizer_class, data):
+    optimizer = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(data)
+        optimizer.solve()
+    return optimizer
+
+
+def fixed_lp_value(optimizer, data):
+    """Objective of the LP with y fixed at the solved plan, for (possibly edited) data"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert optimizer.update(data)
+        optimizer._solve_model(False, None)
+    assert optimizer._termination() == "optimal"
+    return optimizer._objective_value()
+
+
+def check_resource_prices(optimizer_class):
+    data = build_limited_data()
+    optimizer = solve_duals(optimizer_class, data)
+    prices = optimizer.duals["shadow_prices"]
+    weeks = sorted(data["weeks"])
+    _, arrays = optimizer._solution_arrays()
+    y = {(r, t): float(round(v)) for r, row in zip(optimizer._data["methods"], arrays["y"]) for t, v in zip(weeks, row)}
+
+    optimizer._relax_binaries(True)
+    optimizer._fix_binaries(y)
+    base = fixed_lp_value(optimizer, data)
+    binding = set()
+    for key in ("crew_available", "energy_available"):
+        for t in weeks:
+            price = prices[key][t]
+            assert price >= -TOL, f"{key}[{t}] = {price}: more of a resource cannot hurt"
+            right, left = (
+                (fixed_lp_value(optimizer, dict(data, **{key: {**data[key], t: data[key][t] + step}})) - base) / step
+                for step in (DELTA, -DELTA)
+            )
+            assert right - TOL <= price <= left + TOL, f"{key}[{t}] = {price} outside [{right}, {left}]"
+            if abs(left - right) <= TOL:
+                assert abs(price - right) <= TOL
+            if price > TOL:
+                binding.add((key, t % 2))
+    # the instance is meant to exercise both resources
+    assert binding == {("crew_available", 0), ("energy_available", 1)}, binding
+
+
+def check_signs(optimizer_class):
+    # small method capacities and storage caps: the plastic cap forces processing the methods cannot keep up with
+    data = build_sample_data()
+    data["max_capacity"] = dict.fromkeys(data["max_capacity"], 2.0)
+    data["output_capacity"] = {"filament": 4.0, "insulation": 4.0}
+    data["input_capacity"] = {"plastic": 12.0, "textile": 12.0}
+    optimizer = solve_duals(optimizer_class, data)
+    prices = optimizer.duals["shadow_prices"]
+    for key in ("output_capacity", "input_capacity", "max_capacity"):
+        for entity, weeks in prices[key].items():
+            assert all(v >= -TOL for v in weeks.values()), f"{key}[{entity}] has a negative price: {weeks}"
+    assert max(prices["input_capacity"]["plastic"].values()) > TOL
+    assert all(max(weeks.values()) > TOL for weeks in prices["max_capacity"].values())
+    _, arrays = optimizer._solution_arrays()
+    for r, row in zip(optimizer._data["methods"], arrays["y"]):
+        for t, on in zip(sorted(data["weeks"]), row):
+            if round(on) == 0:
+                assert prices["max_capacity"][r][t] == 0.0
+    return prices
+
+
+def test_pyomo_resource_prices():
+    check_resource_prices(MarsRecyclingOptimizer)
+
+
+def test_matrix_resource_prices():
+    check_resource_prices(MatrixRecyclingOptimizer)
+
+
+def test_price_signs_agree_across_backends():
+    pyomo_prices = check_signs(MarsRecyclingOptimizer)
+    matrix_prices = check_signs(MatrixRecyclingOptimizer)
+    for entity, weeks in pyomo_prices["input_capacity"].items():
+        for t, price in weeks.items():
+            assert abs(price - matrix_prices["input_capacity"][entity][t]) <= 1e-6 * max(1.0, abs(price))
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,105 @@
+"""
+Tests for model size and run-time estimates (ares_shared.estimate)
+
+model_counts() must match the model MarsRecyclingOptimizer actually builds (presolve
+off), including the zero-yield disposal pairs, and fit()/predict() must recover a
+known log-log relation from synthetic run stats. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+import math
+
+from pyomo.environ import Var
+
+from ares_shared.estimate import MIN_RUNS, fit, job_mode, model_counts, predict, run_stats
+from ares_shared.structure import disposal_pairs
+from model import MarsRecyclingOptimizer
+from test_worker import build_sample_data
+
+
+def built_counts(data):
+    """Variables, binaries and constraints of the Pyomo model built without presolve"""
+    optimizer = MarsRecyclingOptimizer(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(dict(data, params={"presolve": False}))
+    m = optimizer.model
+    binaries = sum(1 for v in m.component_data_objects(Var) if v.is_binary())
+    return {"variables": m.nvariables(), "binaries": binaries, "constraints": m.nconstraints()}
+
+
+def counts(data):
+    return model_counts(MarsRecyclingOptimizer.normalize_input(data))
+
+
+def test_sample_counts():
+    data = build_sample_data()
+    assert counts(data) == {"variables": 224, "binaries": 16, "constraints": 216}
+    assert counts(data) == built_counts(data)
+
+
+def test_counts_follow_the_data():
+    data = build_sample_data()
+    # compress loses its recipes; plastic (capped, and wasted into by item usage) keeps a disposal pair on it
+    data["yields"] = {key: v for key, v in data["yields"].items() if key[1] != "compress"}
+    data["min_lot_size"] = {"extrude": 1.0, "compress": 0.0}
+    data["input_capacity"] = {"plastic": 50.0}
+    data["output_capacity"] = {}
+    data["energy_available"] = {1: 35.0, 2: 45.0}
+    data["deadlines"] = data["deadlines"][:1]
+    assert disposal_pairs(MarsRecyclingOptimizer.normalize_input(data)) == [("plastic", "compress")]
+    assert counts(data) == built_counts(data)
+
+
+def synthetic_runs(n, coefficients):
+    """Run stats whose measures follow log y = b0 + b1 log1p(v) + b2 log1p(b) + b3 log1p(c) exactly"""
+    runs = []
+    for i in range(n):
+        c = {"variables": 100 * (i + 1) ** 2, "binaries": 10 * (i % 4 + 1), "constraints": 300 * (i + 1) + 50 * (i % 3)}
+        x = [1.0] + [math.log1p(c[f]) for f in ("variables", "binaries", "constraints")]
+        y = math.exp(sum(b * v for b, v in zip(coefficients, x)))
+        runs.append(run_stats(c, "full", "pyomo", build_seconds=y / 10, solve_seconds=y, memory_mb=50 + y))
+    return runs
+
+
+def test_fit_recovers_coefficients():
+    coefficients = [-6.0, 0.8, 0.5, 0.3]
+    models = fit(synthetic_runs(12, coefficients))
+    solve = models["solve_seconds"]
+    assert solve["runs"] == 12
+    assert all(abs(b - expected) <= 0.05 for b, expected in zip(solve["coefficients"], coefficients)), solve
+    assert solve["rmse_log"] <= 1e-3
+
+    job = {"variables": 50000, "binaries": 30, "constraints": 40000}
+    expected = math.exp(coefficients[0] + sum(b * math.log1p(job[f]) for b, f in
+                                              zip(coefficients[1:], ("variables", "binaries", "constraints"))))
+    predicted = predict(models, job)
+    assert abs(predicted["solve_seconds"] - expected) <= 0.02 * expected
+    assert set(predicted) == {"build_seconds", "solve_seconds", "memory_mb"}
+
+
+def test_too_few_runs():
+    runs = synthetic_runs(MIN_RUNS - 1, [0.0, 1.0, 0.0, 0.0])
+    assert fit(runs) == {}
+    assert predict(fit(runs), {"variables": 1, "binaries": 1, "constraints": 1}) == {
+        "build_seconds": None, "solve_seconds": None, "memory_mb": None,
+    }
+    # runs without a measure (a cached model reports no build time) are skipped for it
+    runs = synthetic_runs(MIN_RUNS, [0.0, 1.0, 0.0, 0.0])
+    runs[0]["build_seconds"] = None
+    assert set(fit(runs)) == {"solve_seconds", "memory_mb"}
+
+
+def test_job_mode():
+    assert job_mode({}, 8) == "full"
+    assert job_mode(None, 8) == "full"
+    assert job_mode({"mode": "preview"}, 8) == "preview"
+    assert job_mode({"horizon_window": 3, "mode": "preview"}, 8) == "rolling_horizon"
+    assert job_mode({"horizon_window": 8}, 8) == "full"  # a window as long as the mission is one solve
+    assert job_mode({"sweep": [{}], "horizon_window": 3}, 8) == "sweep"
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
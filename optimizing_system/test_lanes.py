@@ -0,0 +1,87 @@
+"""
+Tests for size-aware request lanes (ares_shared.lanes)
+
+Run with pytest, or as a script.
+"""
+from ares_shared.estimate import model_counts
+from ares_shared.lanes import DEFAULT_LANES, PREVIEW_SIZE, SUMMARY_SIZE, job_size, lane_for, lane_queue, parse_lanes, parse_weights
+from model import MarsRecyclingOptimizer
+from test_worker import build_sample_data
+
+
+def expect_value_error(function, *args):
+    try:
+        function(*args)
+    except ValueError:
+        return
+    raise AssertionError(f"{function.__name__}{args} did not raise ValueError")
+
+
+def test_parse_lanes():
+    assert parse_lanes(DEFAULT_LANES) == [("small", 20000), ("medium", 100000), ("large", None)]
+    assert parse_lanes(" small : 10 , , large ") == [("small", 10), ("large", None)]
+    assert parse_lanes("only") == [("only", None)]
+    # the last lane may have a limit too; bigger jobs still go to it
+    assert parse_lanes("small:10,large:20") == [("small", 10), ("large", 20)]
+
+
+def test_parse_lanes_rejects_invalid_specs():
+    for spec in ("", " , ", "small,large", "small:10,medium,large", "small:ten,large"):
+        expect_value_error(parse_lanes, spec)
+
+
+def test_lane_for_boundaries():
+    lanes = parse_lanes("small:100,medium:1000,large")
+    assert lane_for(0, lanes) == "small"
+    assert lane_for(100, lanes) == "small"
+    assert lane_for(101, lanes) == "medium"
+    assert lane_for(1000, lanes) == "medium"
+    assert lane_for(1001, lanes) == "large"
+    assert lane_for(10 ** 9, lanes) == "large"
+    # a limited last lane takes everything bigger
+    assert lane_for(21, parse_lanes("small:10,large:20")) == "large"
+
+
+def test_sample_mission_lane():
+    data = MarsRecyclingOptimizer.normalize_input(build_sample_data())
+    size = model_counts(data)["variables"]
+    lanes = parse_lanes(f"tiny:{size - 1},exact:{size},large")
+    assert lane_for(size, lanes) == "exact"
+    assert lane_for(size, parse_lanes(DEFAULT_LANES)) == "small"
+
+
+def test_job_size():
+    assert job_size(1000, None) == job_size(1000, {}) == 1000
+    assert job_size(1000, {"mode": "full", "results": "columnar"}) == 1000
+    assert job_size(1000, {"mode": "preview"}) == int(1000 * PREVIEW_SIZE)
+    assert job_size(1000, {"results": "summary"}) == int(1000 * SUMMARY_SIZE)
+    assert job_size(1000, {"mode": "preview", "results": "summary"}) == int(1000 * PREVIEW_SIZE * SUMMARY_SIZE)
+
+
+def test_previews_go_to_smaller_lanes():
+    lanes = parse_lanes(DEFAULT_LANES)
+    # a full solve of 150,000 variables is a large job; its preview is a small one
+    assert lane_for(job_size(150000, {}), lanes) == "large"
+    assert lane_for(job_size(150000, {"mode": "preview"}), lanes) == "small"
+    assert lane_for(job_size(150000, {"results": "summary"}), lanes) == "medium"
+
+
+def test_parse_weights():
+    lanes = parse_lanes(DEFAULT_LANES)
+    assert parse_weights("", lanes) == [("small", 0), ("medium", 0), ("large", 0)]
+    assert parse_weights("small:4, large:2", lanes) == [("small", 4), ("large", 2)]
+    assert parse_weights("medium", lanes) == [("medium", 0)]
+    assert parse_weights("small:-3", lanes) == [("small", 0)]
+    expect_value_error(parse_weights, "huge:2", lanes)
+    expect_value_error(parse_weights, "small:many", lanes)
+
+
+def test_lane_queue():
+    assert lane_queue("optimization_requests", "small") == "optimization_requests.small"
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,73 @@
+"""
+Tests for the matrix backend's in-memory solvers (MatrixRecyclingOptimizer)
+
+Each array solver must reach the objective of the Pyomo model on the same
+instance, with integral method on/off decisions. Every solve runs in its own
+process: OR-Tools and highspy both bundle HiGHS, and some builds of the two cannot
+be loaded into one process. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_worker import build_sample_data
+
+SOLVERS = ("highs", "ortools_cbc", "ortools_scip", "scipy")
+TOL = 1e-6
+
+
+def _solve(backend, solver, data):
+    optimizer = {"pyomo": MarsRecyclingOptimizer, "matrix": MatrixRecyclingOptimizer}[backend]([solver] if solver else None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(data)
+        optimizer.solve()
+    termination = str(optimizer.solver_results.solver.termination_condition)
+    y = [optimizer.model.y[r, t].value for r in data["methods"] for t in data["weeks"]]
+    return termination, optimizer.get_results()["summary"]["objective_value"], y
+
+
+def solve(backend, solver, data):
+    """(termination, objective, y values) of a solve in a fresh process (solver None: the backend's default order)"""
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_solve, backend, solver, data).result()
+
+
+def check_solvers(data):
+    _, expected, _ = solve("pyomo", "highs", data)
+    for name in SOLVERS:
+        termination, objective, y = solve("matrix", name, data)
+        assert termination == "optimal", name
+        assert abs(objective - expected) <= TOL * max(1.0, abs(expected)), (name, objective, expected)
+        assert all(min(abs(v), abs(v - 1)) <= TOL for v in y), name
+
+
+def test_sample():
+    check_solvers(build_sample_data())
+
+
+def test_limited_resources():
+    # crew and energy run short, so methods compete for them and some demand goes unmet
+    data = build_sample_data()
+    data["crew_available"] = {t: 2.0 for t in data["weeks"]}
+    data["energy_available"] = {t: 5.0 if t % 2 else 60.0 for t in data["weeks"]}
+    check_solvers(data)
+
+
+def test_default_solvers():
+    # both backends default to HiGHS in memory, which needs no solver binary
+    data = build_sample_data()
+    (pyomo_termination, expected, _), (matrix_termination, objective, _) = (
+        solve(backend, None, data) for backend in ("pyomo", "matrix")
+    )
+    assert pyomo_termination == matrix_termination == "optimal"
+    assert abs(objective - expected) <= TOL * max(1.0, abs(expected))
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
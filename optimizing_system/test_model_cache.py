@@ -0,0 +1,89 @@
+"""
+Tests for the solving processes' built-model cache (structure_fingerprint, _get_model)
+
+Jobs that differ only in MUTABLE_INPUTS values (or in job_id / params) must share a
+fingerprint and be applied to the cached model in place; any structural edit must
+get a new fingerprint and a fresh build. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+
+from config import Config
+from model import MarsRecyclingOptimizer
+from test_update import edit
+from test_worker import build_sample_data
+from worker import JobSolver
+
+fingerprint = MarsRecyclingOptimizer.structure_fingerprint
+
+
+def test_fingerprint_ignores_values():
+    data = build_sample_data()
+    expected = fingerprint(data)
+    assert fingerprint(edit(data)) == expected
+    assert fingerprint(dict(data, job_id="other", params={"mode": "preview"})) == expected
+    assert fingerprint(dict(reversed(list(data.items())))) == expected
+
+
+def test_fingerprint_changes_with_structure():
+    data = build_sample_data()
+    expected = fingerprint(data)
+    for changed in (
+        dict(data, yields={**data["yields"], ("plastic", "extrude", "filament"): 0.5}),
+        dict(data, max_capacity=dict.fromkeys(data["max_capacity"], 4.0)),
+        dict(data, crew_available={t: v for t, v in data["crew_available"].items() if t != 3}),
+        dict(data, items=data["items"] + ["unused_tool"]),
+    ):
+        assert fingerprint(changed) != expected
+
+
+def get_model(worker, job_id, data):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, _ = worker._get_model(job_id, "pyomo", ["highs"], data)
+    return model
+
+
+def make_worker():
+    return JobSolver(lambda job_id, event: None)
+
+
+def test_cache_hit_across_jobs():
+    worker = make_worker()
+    data = build_sample_data()
+    first = get_model(worker, "job-1", data)
+    # another job, same structure: the built model is updated in place
+    assert get_model(worker, "job-2", edit(data)) is first
+    assert len(worker.models) == 1
+    with contextlib.redirect_stdout(io.StringIO()):
+        first.solve()
+        fresh = MarsRecyclingOptimizer(["highs"])
+        fresh.setup(edit(data))
+        fresh.solve()
+    updated, expected = (o.get_results()["summary"]["objective_value"] for o in (first, fresh))
+    assert abs(updated - expected) <= 1e-6 * max(1.0, abs(expected))
+    # a structural edit is built from scratch and cached alongside
+    changed = dict(data, max_capacity=dict.fromkeys(data["max_capacity"], 4.0))
+    assert get_model(worker, "job-3", changed) is not first
+    assert len(worker.models) == 2
+
+
+def test_cache_eviction():
+    worker = make_worker()
+    data = build_sample_data()
+    size, Config.MODEL_CACHE_SIZE = Config.MODEL_CACHE_SIZE, 2
+    try:
+        first = get_model(worker, "job-1", data)
+        for capacity in (4.0, 5.0):
+            get_model(worker, "job", dict(data, max_capacity=dict.fromkeys(data["max_capacity"], capacity)))
+        assert len(worker.models) == 2
+        # the least recently used model was dropped
+        assert get_model(worker, "job-1", data) is not first
+    finally:
+        Config.MODEL_CACHE_SIZE = size
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,71 @@
+"""
+Tests for input key normalization (MarsRecyclingOptimizer.normalize_input)
+
+Every key spelling a payload may use must normalize to the same data, maps that
+are already normalized must be shared rather than copied, and in-place
+normalization must re-key the given dict itself. Run with pytest, or as a script.
+"""
+import json
+
+from model import MarsRecyclingOptimizer
+from test_worker import build_sample_data
+
+normalize_input = MarsRecyclingOptimizer.normalize_input
+
+
+def as_message(data, key=str):
+    """data as a decoded JSON message, tuple keys written with key(tuple)"""
+    def encode(value):
+        if isinstance(value, dict):
+            return {key(k) if isinstance(k, tuple) else k: encode(v) for k, v in value.items()}
+        return value
+    return json.loads(json.dumps(encode(data)))
+
+
+def test_key_spellings():
+    expected = normalize_input(build_sample_data())
+    # "('plastic', 1)" as the backend sends them, "plastic,1" and "plastic, 1"
+    for key in (str, lambda k: ",".join(map(str, k)), lambda k: ", ".join(map(str, k))):
+        assert normalize_input(as_message(build_sample_data(), key)) == expected
+    assert normalize_input({"item_demands": {("spare_part", "2"): 1.0}})["item_demands"] == {("spare_part", 2): 1.0}
+    assert normalize_input({"yields": {"plastic, extrude, filament": 0.5}})["yields"] == {("plastic", "extrude", "filament"): 0.5}
+    assert normalize_input({"availability": {"('plastic', -1.5)": 2.0}})["availability"] == {("plastic", -1.5): 2.0}
+    assert normalize_input({"crew_available": {"3": 20.0, 4: 10.0}})["crew_available"] == {3: 20.0, 4: 10.0}
+
+
+def test_defaults():
+    d = normalize_input({})
+    assert d["initial_inventory"] == {"materials": {}, "outputs": {}, "items": {}, "substitutes": {}}
+    assert d["weights"] == {} and d["item_demands"] == {}
+
+
+def test_normalized_maps_are_shared():
+    data = build_sample_data()
+    d = normalize_input(data)
+    assert d is not data
+    for key in ("item_demands", "yields", "crew_available", "initial_inventory", "materials"):
+        assert d[key] is data[key], key
+
+
+def test_copy_leaves_input_unchanged():
+    message = as_message(build_sample_data())
+    before = json.dumps(message, sort_keys=True)
+    d = normalize_input(message)
+    assert json.dumps(message, sort_keys=True) == before
+    assert d["item_demands"] is not message["item_demands"]
+
+
+def test_in_place():
+    message = as_message(build_sample_data())
+    demands = message["item_demands"]
+    d = normalize_input(message, in_place=True)
+    assert d is message
+    assert demands == {}  # drained into its replacement
+    assert d == normalize_input(build_sample_data())
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
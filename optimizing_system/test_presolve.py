@@ -0,0 +1,96 @@
+"""
+Tests for the presolve pass (MarsRecyclingOptimizer._presolve)
+
+Presolve must not change the optimum: every case is solved with presolve on and
+off and the objective values compared. Entities presolve removes must still get
+their rows in the results. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+
+from model import MarsRecyclingOptimizer
+from test_worker import build_sample_data
+
+
+def solve(data, presolve):
+    data = dict(data, params={"presolve": presolve, "duals": False})
+    optimizer = MarsRecyclingOptimizer(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(data)
+        optimizer.solve()
+    return optimizer
+
+
+def solve_objective(data, presolve):
+    """
+    Set up and solve data with presolve on or off
+
+    Returns:
+        (objective value, presolve report)
+    """
+    optimizer = solve(data, presolve)
+    return optimizer.get_results()["summary"]["objective_value"], optimizer.presolve_report
+
+
+def assert_same_optimum(data):
+    with_presolve, report = solve_objective(data, True)
+    without_presolve, _ = solve_objective(data, False)
+    assert abs(with_presolve - without_presolve) <= 1e-6 * max(1.0, abs(without_presolve)), (
+        f"presolve changed the optimum: {with_presolve} != {without_presolve} (removed {report})"
+    )
+    return report
+
+
+def build_unused_data():
+    """Sample data plus a substitute, an item and a method that cannot matter"""
+    data = build_sample_data()
+    data["substitutes"] = data["substitutes"] + ["spare_bracket"]
+    data["items"] = data["items"] + ["unused_tool"]
+    data["initial_inventory"]["items"]["unused_tool"] = 3.0
+    data["max_capacity"].update({("idle_press", t): 0.0 for t in data["weeks"]})
+    data["methods"] = data["methods"] + ["idle_press"]
+    return data
+
+
+def test_sample_data():
+    assert_same_optimum(build_sample_data())
+
+
+def test_unused_substitute_drains_capped_output():
+    # insulation_pad replaces no item and is worth nothing, but making it is the only way
+    # to empty the capped insulation stock, so more (valuable) insulation can be produced
+    data = build_sample_data()
+    data["substitutes_can_replace"] = {"spare_part": ["printed_part"], "insulation_patch": []}
+    data["substitute_values"] = {"printed_part": 3.0, "insulation_pad": 0.0}
+    data["output_capacity"] = {"filament": 20.0, "insulation": 5.0}
+    data["output_values"] = {"filament": 2.0, "insulation": 10.0}
+    report = assert_same_optimum(data)
+    assert "insulation_pad" not in report.get("substitutes", [])
+
+
+def test_unused_worthless_entities_are_removed():
+    report = assert_same_optimum(build_unused_data())
+    assert report["substitutes"] == ["spare_bracket"]
+    assert report["items"] == ["unused_tool"]
+    assert report["methods"] == ["idle_press"]
+
+
+def test_removed_entities_keep_their_rows():
+    data = build_unused_data()
+    presolved, full = (solve(data, presolve).get_results() for presolve in (True, False))
+    for table, key in (("outputs", "output"), ("substitutes", "substitute"), ("items", "item")):
+        assert [row[key] for row in presolved[table]] == [row[key] for row in full[table]], table
+    assert [sorted(week["methods"]) for week in presolved["schedule"]] == [sorted(week["methods"]) for week in full["schedule"]]
+    # the removed entities' rows are what the full model solves to
+    assert [week["methods"]["idle_press"] for week in presolved["schedule"]] == [week["methods"]["idle_press"] for week in full["schedule"]]
+    assert presolved["substitutes"][-1] == full["substitutes"][-1]
+    assert presolved["items"][-1] == full["items"][-1]
+    unused = presolved["summary"]["carried_weight_loss_by_item"]["unused_tool"]
+    assert unused["initial_units"] == unused["final_units"] == 3.0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
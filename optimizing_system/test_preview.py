@@ -0,0 +1,65 @@
+"""
+Tests for preview mode (MarsRecyclingOptimizer._solve_preview)
+
+The rounded plan must be feasible for the full MILP (binary y, every constraint
+met), its objective at most the MILP optimum, and the optimum at most the LP
+bound. Both backends are checked; each plan is loaded into the Pyomo model to
+check the constraints. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+from types import SimpleNamespace
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_rolling_horizon import constraint_violations, load_solution, solve
+from test_worker import build_sample_data
+
+
+def check_preview(optimizer_class, data):
+    preview = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        preview.setup(dict(data, params={"mode": "preview", "presolve": False, "duals": False}))
+        preview.solve()
+    milp = solve(data, presolve=False)
+    optimum = milp._objective_value()
+
+    info = preview.solve_info
+    assert info["mode"] == "preview" and info["heuristic"] is True
+    assert preview._termination() == "heuristic"
+    objective = preview.get_results()["summary"]["objective_value"]
+    tol = 1e-6 * max(1.0, abs(optimum))
+    assert objective <= optimum + tol
+    assert optimum <= info["lp_bound"] + tol
+    assert abs(info["gap"] - abs(info["lp_bound"] - objective) / max(abs(objective), 1e-10)) <= 1e-9
+
+    keys, arrays = preview._solution_arrays()
+    load_solution(milp, SimpleNamespace(keys=keys, arrays=arrays))
+    violations = constraint_violations(milp.model)
+    assert not violations, f"preview plan violates {violations[:5]}"
+    assert abs(milp._objective_value() - objective) <= tol
+    return arrays
+
+
+def test_pyomo_preview():
+    check_preview(MarsRecyclingOptimizer, build_sample_data())
+
+
+def test_matrix_preview():
+    check_preview(MatrixRecyclingOptimizer, build_sample_data())
+
+
+def test_min_lots_above_capacity_keep_methods_off():
+    # no week can reach the min lot, so every method stays off and the plan only uses stock
+    data = build_sample_data()
+    data["min_lot_size"] = {"extrude": 9.0, "compress": 9.0}
+    for optimizer_class in (MarsRecyclingOptimizer, MatrixRecyclingOptimizer):
+        arrays = check_preview(optimizer_class, data)
+        assert not arrays["y"].any()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
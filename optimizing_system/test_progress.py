@@ -0,0 +1,75 @@
+"""
+Tests for solver progress reporting (progress.py)
+
+SolverProgress must always pass on new incumbents, throttle bound-only updates and
+drop repeats; solves on either backend's HiGHS must report progress that ends at
+the optimum. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+import math
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from progress import SolverProgress
+from test_worker import build_sample_data
+
+
+def test_events():
+    events = []
+    progress = SolverProgress(events.append, interval=3600)
+    progress.report(incumbent=None, bound=None, elapsed=0.1)
+    progress.report(incumbent=None, bound=math.inf, elapsed=0.1)  # nothing known yet
+    assert events == []
+    progress.report(incumbent=8.0, bound=10.0, elapsed=0.1234)
+    assert events == [{"incumbent": 8.0, "bound": 10.0, "gap": 0.25, "elapsed": 0.123}]
+    progress.report(incumbent=8.0, bound=9.0, elapsed=0.2)  # bound only, within the interval
+    progress.report(incumbent=9.0, bound=9.0, elapsed=0.3)  # new incumbent
+    assert [e["incumbent"] for e in events] == [8.0, 9.0] and events[-1]["gap"] == 0.0
+    assert progress.last == events[-1]
+
+
+def test_bound_updates_after_interval():
+    events = []
+    progress = SolverProgress(events.append, interval=0)
+    progress.report(incumbent=-math.inf, bound=10.0, elapsed=0.0)
+    progress.report(incumbent=None, bound=10.0, elapsed=0.1)  # unchanged
+    progress.report(incumbent=None, bound=9.5, elapsed=0.2)
+    assert [(e["incumbent"], e["bound"], e["gap"]) for e in events] == [(None, 10.0, None), (None, 9.5, None)]
+
+
+def test_callback_errors_do_not_stop_the_solve():
+    def fail(event):
+        raise RuntimeError("queue closed")
+
+    progress = SolverProgress(fail, interval=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        progress.report(incumbent=1.0, bound=2.0, elapsed=0.0)
+    assert progress.last["incumbent"] == 1.0
+
+
+def check_solve(optimizer_class):
+    events = []
+    optimizer = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(build_sample_data())
+        optimizer.solve(progress=SolverProgress(events.append, interval=0))
+    objective = optimizer.get_results()["summary"]["objective_value"]
+    assert events
+    assert abs(events[-1]["incumbent"] - objective) <= 1e-6 * max(1.0, abs(objective))
+    assert all(e["elapsed"] >= 0 for e in events)
+
+
+def test_pyomo_progress():
+    check_solve(MarsRecyclingOptimizer)
+
+
+def test_matrix_progress():
+    check_solve(MatrixRecyclingOptimizer)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
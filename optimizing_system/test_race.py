@@ -0,0 +1,122 @@
+"""
+Tests for solver racing (race.py)
+
+The first proven optimum must win and be the same optimum a plain solve finds;
+strategies that fail are recorded, a proven infeasible model ends the race with
+an error, and strategies still running are stopped. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+import time
+from types import SimpleNamespace
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from race import parse_strategy, race
+from test_worker import build_sample_data
+
+
+class InfeasibleOptimizer:
+    """Stand-in optimizer whose solve proves the model infeasible"""
+
+    def __init__(self, preferred_solvers=None):
+        self.solve_info = {}
+
+    def setup(self, data):
+        pass
+
+    def solve(self):
+        self.solver_results = SimpleNamespace(solver=SimpleNamespace(status="warning", termination_condition="infeasible"))
+
+
+class BrokenOptimizer(InfeasibleOptimizer):
+    """Stand-in optimizer that fails to build"""
+
+    def setup(self, data):
+        raise ValueError("no usable solver")
+
+
+class SlowOptimizer(InfeasibleOptimizer):
+    """Stand-in optimizer that takes far longer than any test"""
+
+    def solve(self):
+        time.sleep(120)
+
+
+OPTIMIZERS = {
+    "pyomo": MarsRecyclingOptimizer,
+    "matrix": MatrixRecyclingOptimizer,
+    "infeasible": InfeasibleOptimizer,
+    "broken": BrokenOptimizer,
+    "slow": SlowOptimizer,
+}
+
+
+def error(call, *args):
+    """Message of the exception call(*args) raises"""
+    try:
+        call(*args)
+    except (ValueError, RuntimeError) as e:
+        return str(e)
+    raise AssertionError(f"{call.__name__}{args} did not raise")
+
+
+def run(specs, workers=4, timeout=60):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return race(OPTIMIZERS, [parse_strategy(spec) for spec in specs], build_sample_data(), workers, timeout)
+
+
+def objective(optimizer_class):
+    optimizer = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(build_sample_data())
+        optimizer.solve()
+    return optimizer.get_results()["summary"]["objective_value"]
+
+
+def test_parse_strategy():
+    assert parse_strategy("matrix:highs:random_seed=7:mip_rel_gap=0.01:presolve=off:parallel=true") == {
+        "name": "matrix:highs:random_seed=7:mip_rel_gap=0.01:presolve=off:parallel=true",
+        "backend": "matrix",
+        "solver": "highs",
+        "options": {"random_seed": 7, "mip_rel_gap": 0.01, "presolve": "off", "parallel": True},
+    }
+    assert parse_strategy(" pyomo : highs ")["options"] == {}
+    for spec in ("highs", "pyomo:", ":highs"):
+        assert "Invalid race strategy" in error(parse_strategy, spec)
+
+
+def test_optimal_strategy_wins():
+    started = time.monotonic()
+    results, info = run(["slow:any", "pyomo:highs"])
+    assert time.monotonic() - started < 60  # the slow strategy was stopped, not waited for
+    assert info["winner"] == "pyomo:highs"
+    assert list(info["strategies"]) == ["pyomo:highs"]
+    assert results["solver_status"]["termination_condition"] == "optimal"
+    expected = objective(MarsRecyclingOptimizer)
+    assert abs(results["summary"]["objective_value"] - expected) <= 1e-6 * max(1.0, abs(expected))
+
+
+def test_failed_strategies_are_recorded():
+    results, info = run(["broken:any", "matrix:highs"], workers=1)
+    assert info["winner"] == "matrix:highs"
+    assert info["strategies"]["broken:any"]["error"] == "no usable solver"
+    expected = objective(MatrixRecyclingOptimizer)
+    assert abs(results["summary"]["objective_value"] - expected) <= 1e-6 * max(1.0, abs(expected))
+
+
+def test_no_solution():
+    assert "No race strategy found a solution" in error(run, ["broken:any"])
+
+
+def test_infeasible_ends_the_race():
+    started = time.monotonic()
+    assert "Model is infeasible" in error(run, ["slow:any", "infeasible:any"])
+    assert time.monotonic() - started < 60
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,95 @@
+"""
+Tests for the columnar result format (ares_shared.result_format)
+
+The same solve is read back as nested tables and as columnar families: decoding the
+families must give exactly the nested tables, for dense and sparse families, a
+rolling-horizon solution and both backends, and a columnar result must give the
+same warm start as the nested one. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+import json
+
+from ares_shared.result_format import COLUMNAR_KEYS, FAMILIES, NESTED_KEYS, decode, solution_tables, to_nested
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_worker import build_sample_data
+
+
+def results_in(optimizer, result_format):
+    """get_results() of a solved optimizer in another result format"""
+    optimizer._data["params"] = dict(optimizer._data.get("params") or {}, results=result_format)
+    results = optimizer.get_results()
+    results.pop("solver_status")  # the worker replaces it with a JSON-safe one
+    # the worker sends results as JSON; the tables must survive it unchanged
+    return json.loads(json.dumps(results))
+
+
+def solve(optimizer_class, data, **params):
+    optimizer = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(dict(data, params=dict(params, duals=False)))
+        optimizer.solve()
+    return optimizer
+
+
+def check_round_trip(optimizer):
+    full = results_in(optimizer, "full")
+    columnar = results_in(optimizer, "columnar")
+    assert columnar["format"] == "columnar"
+    assert set(columnar["families"]) == set(FAMILIES)
+    nested = to_nested(columnar)
+    assert {key: nested[key] for key in NESTED_KEYS} == {key: full[key] for key in NESTED_KEYS}
+    assert nested["summary"] == full["summary"]
+    assert not set(COLUMNAR_KEYS) & set(nested)
+    return columnar
+
+
+def test_pyomo_round_trip():
+    columnar = check_round_trip(solve(MarsRecyclingOptimizer, build_sample_data()))
+    # the sample's shortages and substitute usage are mostly zero, so some families go sparse
+    assert any("index" in family for family in columnar["families"].values())
+    assert any("index" not in family for family in columnar["families"].values())
+
+
+def test_matrix_round_trip():
+    check_round_trip(solve(MatrixRecyclingOptimizer, build_sample_data()))
+
+
+def test_rolling_horizon_round_trip():
+    check_round_trip(solve(MarsRecyclingOptimizer, build_sample_data(), horizon_window=3, horizon_overlap=1))
+
+
+def test_decode_sizes():
+    columnar = results_in(solve(MarsRecyclingOptimizer, build_sample_data()), "columnar")
+    sizes = {name: len(entities) for name, entities in columnar["entities"].items()}
+    sizes["weeks"] = len(columnar["weeks"])
+    for name, values in decode(columnar).items():
+        dims, _ = FAMILIES[name]
+        expected = 1
+        for dim in dims:
+            expected *= sizes[dim]
+        assert len(values) == expected, name
+    assert all(v in (0, 1) for v in decode(columnar)["y"])
+
+
+def test_solution_tables():
+    optimizer = solve(MarsRecyclingOptimizer, build_sample_data())
+    full = results_in(optimizer, "full")
+    columnar = results_in(optimizer, "columnar")
+    assert set(solution_tables(full)) == set(NESTED_KEYS)
+    assert set(solution_tables(columnar)) == set(COLUMNAR_KEYS)
+    assert solution_tables(results_in(optimizer, "summary")) is None
+    # both give the same MIP start
+    starts = []
+    for previous in (full, columnar):
+        optimizer._data["warm_start"] = solution_tables(previous)
+        starts.append(optimizer._mip_start())
+    assert starts[0] and starts[0] == starts[1]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
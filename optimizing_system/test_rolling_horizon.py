@@ -0,0 +1,111 @@
+"""
+Tests for rolling-horizon solves (MarsRecyclingOptimizer._solve_rolling)
+
+The windows' committed decisions, put together, must be a feasible plan for the
+whole mission: they are loaded into the monolithic model and every constraint is
+checked. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+
+from pyomo.environ import Constraint, Var, value
+
+from model import MarsRecyclingOptimizer, SOLUTION_FAMILIES
+from test_worker import build_sample_data
+
+
+def constraint_violations(model, tol=1e-6):
+    """
+    Constraints and variable bounds/domains the current values of a Pyomo model violate
+
+    Returns:
+        [(component name, amount), ...]
+    """
+    violations = []
+    for con in model.component_data_objects(Constraint, active=True):
+        body = value(con.body)
+        if con.has_lb() and body < value(con.lower) - tol:
+            violations.append((con.name, value(con.lower) - body))
+        if con.has_ub() and body > value(con.upper) + tol:
+            violations.append((con.name, body - value(con.upper)))
+    for var in model.component_data_objects(Var):
+        v = var.value
+        if v is None:
+            violations.append((var.name, None))
+            continue
+        if var.has_lb() and v < var.lb - tol:
+            violations.append((var.name, var.lb - v))
+        if var.has_ub() and v > var.ub + tol:
+            violations.append((var.name, v - var.ub))
+        if var.is_binary() and min(abs(v), abs(v - 1)) > tol:
+            violations.append((var.name, v))
+    return violations
+
+
+def solve(data, **params):
+    optimizer = MarsRecyclingOptimizer(["highs"])
+    data = dict(data, params=dict(params, duals=False))
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(data)
+        optimizer.solve()
+    return optimizer
+
+
+def load_solution(optimizer, solution):
+    """Set the values of a rolling-horizon solution (_Solution) into a built model"""
+    weeks = sorted(optimizer._data["weeks"])
+    for name, key in SOLUTION_FAMILIES.items():
+        family = getattr(optimizer.model, name)
+        for row, entity in zip(solution.arrays[name], solution.keys[key]):
+            index = entity if isinstance(entity, tuple) else (entity,)
+            for t, v in zip(weeks, row):
+                if index + (t,) in family:
+                    family[index + (t,)].set_value(float(v), skip_validation=True)
+
+
+def check_rolling(data, window, overlap):
+    rolling = solve(data, horizon_window=window, horizon_overlap=overlap)
+    assert rolling.solve_info["mode"] == "rolling_horizon"
+    assert rolling._termination() in ("optimal", "heuristic")
+
+    full = solve(data, presolve=False)
+    optimum = full._objective_value()
+    load_solution(full, rolling.model)
+    violations = constraint_violations(full.model)
+    assert not violations, f"rolling plan violates {violations[:5]}"
+
+    objective = rolling.model.objective.value
+    assert abs(full._objective_value() - objective) <= 1e-6 * max(1.0, abs(objective))
+    assert objective <= optimum + 1e-6 * max(1.0, abs(optimum))
+    assert rolling.get_results()["summary"]["objective_value"] == objective
+
+
+def test_overlapping_windows():
+    check_rolling(build_sample_data(), 3, 1)
+
+
+def test_windows_without_overlap():
+    check_rolling(build_sample_data(), 4, 0)
+
+
+def test_window_data_cuts_week_inputs():
+    optimizer = solve(build_sample_data(), horizon_window=3, horizon_overlap=1)
+    inventory = {"materials": {"plastic": 1.0}, "outputs": {}, "items": {}, "substitutes": {}}
+    wd = optimizer._window_data([3, 4, 5], inventory, {("plastic", 4): 2.0, ("plastic", 7): 3.0}, {"spare_part": 9.0})
+    assert wd["weeks"] == [3, 4, 5]
+    assert {t for (_, t) in wd["max_capacity"]} == {3, 4, 5}
+    assert set(wd["crew_available"]) == {3, 4, 5}
+    assert wd["initial_inventory"] == inventory
+    assert wd["incoming_waste"] == {("plastic", 4): 2.0}
+    # only deadlines due in the window, less the committed usage
+    assert wd["deadlines"] == [
+        {"item": "spare_part", "week": 4, "amount": 0.0},
+        {"item": "insulation_patch", "week": 5, "amount": 9.0},
+    ]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
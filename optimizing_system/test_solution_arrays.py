@@ -0,0 +1,63 @@
+"""
+Tests for array solution extraction (MarsRecyclingOptimizer._solution_arrays)
+
+The arrays of every variable family must hold exactly the values of the solved
+model's variables, on both backends; the objective evaluated from the arrays must
+equal the model's, and summary-only results must equal the full summary. Run
+with pytest, or as a script.
+"""
+import contextlib
+import io
+
+from model import SOLUTION_FAMILIES, MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_worker import build_sample_data
+
+
+def solve(optimizer_class, params=None):
+    optimizer = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(dict(build_sample_data(), params=params or {}))
+        optimizer.solve()
+    return optimizer
+
+
+def check_arrays(optimizer_class):
+    optimizer = solve(optimizer_class)
+    keys, arrays = optimizer._solution_arrays()
+    weeks = sorted(optimizer._data["weeks"])
+    assert set(arrays) == set(SOLUTION_FAMILIES)
+    for name, key in SOLUTION_FAMILIES.items():
+        assert arrays[name].shape == (len(keys[key]), len(weeks)), name
+        family = getattr(optimizer.model, name)
+        for i, entity in enumerate(keys[key]):
+            for j, t in enumerate(weeks):
+                index = (*entity, t) if isinstance(entity, tuple) else (entity, t)
+                assert arrays[name][i, j] == (family[index].value or 0.0), (name, index)
+    assert any(arrays[name].any() for name in arrays)
+    return optimizer, keys, arrays
+
+
+def test_pyomo_arrays():
+    optimizer, keys, arrays = check_arrays(MarsRecyclingOptimizer)
+    expected = optimizer.model.objective()
+    assert abs(optimizer._solution_objective(keys, arrays) - expected) <= 1e-6 * max(1.0, abs(expected))
+
+
+def test_matrix_arrays():
+    check_arrays(MatrixRecyclingOptimizer)
+
+
+def test_summary_results():
+    for optimizer_class in (MarsRecyclingOptimizer, MatrixRecyclingOptimizer):
+        full = solve(optimizer_class).get_results()
+        summary = solve(optimizer_class, {"results": "summary"}).get_results()
+        assert not {"schedule", "outputs", "substitutes", "items"} & set(summary)  # no nested tables
+        assert summary["summary"] == full["summary"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
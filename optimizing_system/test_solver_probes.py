@@ -0,0 +1,77 @@
+"""
+Tests for per-process solver probes and shared solver objects (probe_solvers)
+
+Each solver is probed once per process and backend; optimizers select the shared
+solver object, and a persistent interface handed one model after another must
+still solve each of them correctly. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+
+import model
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_worker import build_sample_data
+
+
+def test_probes():
+    probes = MarsRecyclingOptimizer.probe_solvers(["highs", "no_such_solver"])
+    assert probes["highs"]["available"] and probes["highs"]["persistent"]
+    assert probes["highs"]["version"]
+    assert not probes["no_such_solver"]["available"]
+    matrix = MatrixRecyclingOptimizer.probe_solvers(["highs", "scipy"])
+    assert matrix["highs"]["available"] and matrix["highs"]["warm_start"]
+    assert matrix["scipy"]["available"] and not matrix["scipy"]["warm_start"]
+
+
+def test_probed_once_per_process():
+    calls = []
+    original = MarsRecyclingOptimizer.__dict__["_probe_solver"]
+
+    def counting(cls, name):
+        calls.append((cls, name))
+        return original.__func__(cls, name)
+
+    for key in [key for key in model._SOLVER_PROBES if key[1] == "highs"]:
+        del model._SOLVER_PROBES[key]
+    MarsRecyclingOptimizer._probe_solver = classmethod(counting)
+    try:
+        for _ in range(3):
+            MarsRecyclingOptimizer.probe_solvers(["highs"])
+            MatrixRecyclingOptimizer.probe_solvers(["highs"])
+    finally:
+        MarsRecyclingOptimizer._probe_solver = original
+    # one probe per backend; the matrix backend probes its own solvers
+    assert calls == [(MarsRecyclingOptimizer, "highs")]
+    assert MatrixRecyclingOptimizer.probe_solvers(["highs"])["highs"]["available"]
+
+
+def test_shared_persistent_solver():
+    data = build_sample_data()
+    other = build_sample_data()
+    other["item_demands"] = {key: 2 * v for key, v in data["item_demands"].items()}
+    first, second = MarsRecyclingOptimizer(["highs"]), MarsRecyclingOptimizer(["highs"])
+    objectives = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        first.setup(data)
+        second.setup(other)
+        assert first.solver is second.solver
+        # the shared interface is handed the two models in turn
+        for optimizer in (first, second, first, second):
+            optimizer.solve()
+            objectives.append(optimizer.get_results()["summary"]["objective_value"])
+        for d in (data, other):
+            fresh = MarsRecyclingOptimizer(["highs"])
+            fresh.setup(d)
+            fresh.solve()
+            objectives.append(fresh.get_results()["summary"]["objective_value"])
+    assert objectives[0] != objectives[1]
+    for i, expected in enumerate(objectives[4:] * 2):
+        assert abs(objectives[i] - expected) <= 1e-6 * max(1.0, abs(expected)), (i, objectives)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,34 @@
+"""
+Tests for the model structure shared by the builders and the counts (ares_shared.structure)
+
+disposal_pairs() must keep a pair without a recipe exactly where disposing of the
+material through the method can matter. Run with pytest, or as a script.
+"""
+from ares_shared.structure import disposal_pairs
+from model import MarsRecyclingOptimizer
+from test_worker import build_sample_data
+
+
+def test_disposal_pairs():
+    data = MarsRecyclingOptimizer.normalize_input(build_sample_data())
+    assert disposal_pairs(data) == []  # every pair has a recipe
+    data["yields"] = {key: v for key, v in data["yields"].items() if key[:2] != ("textile", "extrude")}
+    # textile is capped and wasted into, so draining it through extrude can matter
+    assert disposal_pairs(data) == [("textile", "extrude")]
+    # nothing to gain: textile uncapped, extrude without min lot, and processing costs
+    data["input_capacity"] = {"plastic": 50.0}
+    data["min_lot_size"] = {"compress": 1.0}
+    assert disposal_pairs(data) == []
+    # textile can fill extrude's min lot
+    data["min_lot_size"] = {"extrude": 1.0, "compress": 1.0}
+    assert disposal_pairs(data) == [("textile", "extrude")]
+    # unless extrude has no capacity in any week
+    data["max_capacity"] = {key: v for key, v in data["max_capacity"].items() if key[0] != "extrude"}
+    assert disposal_pairs(data) == []
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,111 @@
+"""
+Tests for parameter sweeps (MarsRecyclingOptimizer.sweep)
+
+Every point of a sweep, solved in place on one built model, must reach the same
+optimum as a model built from scratch for that point's data, on both backends.
+A point that fails is recorded in its frontier row and the sweep goes on. Run
+with pytest, or as a script.
+"""
+import contextlib
+import io
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_worker import build_sample_data
+
+POINTS = [
+    {},
+    {"weights": {"crew": 2.0, "shortage": 500.0}},
+    {"crew_available": {1: 4.0, 4: 3.0}, "energy_available": {2: 10.0}},
+    {"item_demands": {("spare_part", 2): 9.0}},
+]
+
+
+def point_data(data, point):
+    """data with the point's entries replacing the matching entries"""
+    return {**data, **{key: {**data[key], **overrides} for key, overrides in point.items()}}
+
+
+def fresh_objective(optimizer_class, data):
+    optimizer = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(data)
+        optimizer.solve()
+    return optimizer.get_results()["summary"]["objective_value"]
+
+
+def run_sweep(optimizer_class, points, plans=()):
+    optimizer = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.setup(build_sample_data())
+        return optimizer, optimizer.sweep(points, plans)
+
+
+def check_sweep(optimizer_class):
+    data = build_sample_data()
+    optimizer, result = run_sweep(optimizer_class, POINTS, plans=[1])
+    assert [row["point"] for row in result["frontier"]] == list(range(len(POINTS)))
+    objectives = []
+    for row, point in zip(result["frontier"], POINTS):
+        assert "error" not in row and row["termination_condition"] == "optimal", row
+        expected = fresh_objective(optimizer_class, point_data(data, point))
+        assert abs(row["objective_value"] - expected) <= 1e-6 * max(1.0, abs(expected)), (row, expected)
+        objectives.append(expected)
+    assert len(set(objectives)) > 1  # the points matter
+    assert list(result["plans"]) == ["1"]
+    plan = result["plans"]["1"]
+    assert plan["summary"]["objective_value"] == result["frontier"][1]["objective_value"]
+    assert plan["solver_status"]["termination_condition"] == "optimal"
+    assert optimizer.solve_info["mode"] == "sweep" and optimizer.solve_info["solved"] == len(POINTS)
+
+
+def test_pyomo_sweep():
+    check_sweep(MarsRecyclingOptimizer)
+
+
+def test_matrix_sweep():
+    check_sweep(MatrixRecyclingOptimizer)
+
+
+def check_failed_point(optimizer_class):
+    data = build_sample_data()
+    points = [POINTS[1], {"item_demands": {("no_such_item", 2): 5.0}}, POINTS[2], POINTS[3]]
+    optimizer, result = run_sweep(optimizer_class, points)
+    failed = result["frontier"][1]
+    assert "no_such_item" in failed["error"] and "objective_value" not in failed
+    for i in (0, 2, 3):
+        row = result["frontier"][i]
+        expected = fresh_objective(optimizer_class, point_data(data, points[i]))
+        assert abs(row["objective_value"] - expected) <= 1e-6 * max(1.0, abs(expected)), (row, expected)
+    assert optimizer.solve_info["solved"] == 3
+
+
+def test_pyomo_failed_point():
+    check_failed_point(MarsRecyclingOptimizer)
+
+
+def test_matrix_failed_point():
+    check_failed_point(MatrixRecyclingOptimizer)
+
+
+def test_invalid_sweeps():
+    for points, plans in (
+        ([{"yields": {}}], ()),   # not a MUTABLE_INPUTS entry
+        (["weights"], ()),
+        ([{}], [1]),              # no such point
+    ):
+        optimizer = MarsRecyclingOptimizer(["highs"])
+        with contextlib.redirect_stdout(io.StringIO()):
+            optimizer.setup(build_sample_data())
+        try:
+            optimizer.sweep(points, plans)
+        except ValueError:
+            continue
+        raise AssertionError(f"sweep({points}, {plans}) was accepted")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
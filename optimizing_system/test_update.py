@@ -0,0 +1,98 @@
+"""
+Tests for in-place updates (MarsRecyclingOptimizer.update)
+
+A value-only edit applied to the built model must solve to the same optimum as a
+model built from scratch for the edited data, on both backends; structural edits
+must be refused and leave the model as it was. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from test_worker import build_sample_data
+
+TOL = 1e-6
+
+
+def objective(optimizer):
+    return optimizer.get_results()["summary"]["objective_value"]
+
+
+def solve(optimizer, data=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        if data is not None:
+            optimizer.setup(data)
+        optimizer.solve()
+    return objective(optimizer)
+
+
+def edit(data):
+    """Copy of data with new values for every kind of MUTABLE_INPUTS entry"""
+    edited = dict(data)
+    edited["weights"] = dict(data["weights"], crew=2.0, make=1.0, shortage=500.0)
+    edited["item_demands"] = dict(data["item_demands"])
+    edited["item_demands"][("spare_part", 2)] = 9.0
+    edited["item_demands"][("insulation_patch", 2)] = 3.0
+    edited["crew_available"] = {**data["crew_available"], 1: 4.0, 4: 3.0}
+    edited["energy_available"] = {**data["energy_available"], 2: 10.0, 5: 12.0}
+    return edited
+
+
+def check_update(optimizer_class):
+    data = build_sample_data()
+    optimizer = optimizer_class(["highs"])
+    before = solve(optimizer, data)
+
+    edited = edit(data)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert optimizer.update(edited) is True
+    updated = solve(optimizer)
+    fresh = solve(optimizer_class(["highs"]), edited)
+    assert abs(updated - fresh) <= TOL * max(1.0, abs(fresh)), (updated, fresh)
+    assert abs(updated - before) > TOL  # the edit matters
+
+    # and back again
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert optimizer.update(data) is True
+    assert abs(solve(optimizer) - before) <= TOL * max(1.0, abs(before))
+
+
+def check_structural_edit(optimizer_class):
+    data = build_sample_data()
+    optimizer = optimizer_class(["highs"])
+    before = solve(optimizer, data)
+    model = optimizer.model
+    for changed in (
+        dict(data, yields={**data["yields"], ("plastic", "extrude", "filament"): 0.5}),
+        dict(data, max_capacity=dict.fromkeys(data["max_capacity"], 4.0)),
+        # a week without a crew limit has no resource row to update
+        dict(data, crew_available={t: v for t, v in data["crew_available"].items() if t != 3}),
+    ):
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert optimizer.update(changed) is False
+        assert optimizer.model is model
+        assert abs(solve(optimizer) - before) <= TOL * max(1.0, abs(before))
+
+
+def test_pyomo_update():
+    check_update(MarsRecyclingOptimizer)
+
+
+def test_matrix_update():
+    check_update(MatrixRecyclingOptimizer)
+
+
+def test_pyomo_structural_edit():
+    check_structural_edit(MarsRecyclingOptimizer)
+
+
+def test_matrix_structural_edit():
+    check_structural_edit(MatrixRecyclingOptimizer)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
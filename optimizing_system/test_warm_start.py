@@ -0,0 +1,67 @@
+"""
+Tests for MIP starts from a previous solution (data["warm_start"])
+
+A start must reach HiGHS on both backends: the first incumbent HiGHS reports is the
+previous optimum (cold, its heuristics find a worse solution first). On the Pyomo
+backend the start goes through the highspy instance of the persistent `highs`
+interface, so edits applied in place must still reach the solver, and the shared
+interface must be left with its automatic updates on. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+
+from model import MarsRecyclingOptimizer
+from matrix_model import MatrixRecyclingOptimizer
+from progress import SolverProgress
+from test_update import TOL, edit, objective, solve
+from test_worker import build_sample_data
+
+
+def incumbents(optimizer):
+    """Incumbents HiGHS reports while solving the set-up optimizer"""
+    events = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.solve(progress=SolverProgress(events.append, interval=0))
+    return [e["incumbent"] for e in events if e["incumbent"] is not None]
+
+
+def check_start_is_used(optimizer_class):
+    data = build_sample_data()
+    first = optimizer_class(["highs"])
+    previous = solve(first, data)
+    warm = optimizer_class(["highs"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        warm.setup(dict(data, warm_start=first.get_results()))
+    found = incumbents(warm)
+    assert abs(found[0] - previous) <= TOL * max(1.0, abs(previous)), found
+    assert abs(objective(warm) - previous) <= TOL * max(1.0, abs(previous))
+
+
+def test_pyomo_start_is_used():
+    check_start_is_used(MarsRecyclingOptimizer)
+
+
+def test_matrix_start_is_used():
+    check_start_is_used(MatrixRecyclingOptimizer)
+
+
+def test_pyomo_start_after_update():
+    data = build_sample_data()
+    edited = edit(data)
+    expected = solve(MarsRecyclingOptimizer(["highs"]), edited)
+    optimizer = MarsRecyclingOptimizer(["highs"])
+    solve(optimizer, data)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert optimizer.update(dict(edited, warm_start=optimizer.get_results()))
+    incumbents(optimizer)
+    # the edits were applied although the solve did not update the solver itself
+    assert abs(objective(optimizer) - expected) <= TOL * max(1.0, abs(expected))
+    auto_updates = optimizer.solver.config.auto_updates
+    assert all(auto_updates[key] for key in auto_updates)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
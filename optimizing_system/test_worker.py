@@ -164,9 +164,9 @@ def listen_for_response(request_id=None, rabbitmq_host='localhost',
     return response
 
 
-if __name__ == "__main__":
-    # Sample data for testing
-    sample_data = {
+def build_sample_data():
+    """Sample optimization data for testing (8-week, two-method mission)"""
+    return {
         'materials': ["plastic", "textile"],
         'methods': ["extrude", "compress"],
         'outputs': ["filament", "insulation"],
@@ -272,8 +272,11 @@ if __name__ == "__main__":
             {'item': 'insulation_patch', 'week': 8, 'amount': 20.0}
         ]
     }
-    
-    
+
+
+if __name__ == "__main__":
+    sample_data = build_sample_data()
+
     print("="*60)
     print("SENDING OPTIMIZATION REQUEST TO RABBITMQ WORKER")
     print("="*60)
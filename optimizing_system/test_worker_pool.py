@@ -0,0 +1,193 @@
+"""
+Tests for the worker's solving processes and connection handling (OptimizationWorker)
+
+Requests are handed to the process pool and solved side by side while the
+connection thread stays free; every request is acknowledged once, after its
+response is published, and a killed solving process gets the pool restarted and
+its jobs requeued once. RabbitMQ is replaced by a fake connection that runs
+the callbacks handed to it on the test's thread. Run with pytest, or as a script.
+"""
+import contextlib
+import io
+import json
+import os
+import queue
+import time
+from types import SimpleNamespace
+
+import worker as worker_module
+from config import Config
+from test_worker import build_sample_data, convert_tuple_keys_to_strings
+from worker import OptimizationWorker
+
+TIMEOUT = 120
+
+
+class FakeChannel:
+    """Records publishes, acks and nacks in one log"""
+
+    def __init__(self, fail_responses=False):
+        self.is_open = True
+        self.fail_responses = fail_responses
+        self.log = []
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        if self.fail_responses and routing_key == Config.OUTPUT_QUEUE:
+            raise ConnectionError("channel closed")
+        self.log.append(("publish", routing_key, json.loads(body)))
+
+    def basic_ack(self, delivery_tag):
+        self.log.append(("ack", delivery_tag))
+
+    def basic_nack(self, delivery_tag, requeue):
+        self.log.append(("nack", delivery_tag, requeue))
+
+    def stop_consuming(self):
+        self.is_open = False
+
+    def responses(self):
+        return {entry[2]["job_id"]: entry[2] for entry in self.log if entry[:2] == ("publish", Config.OUTPUT_QUEUE)}
+
+
+class FakeConnection:
+    """Queues the callbacks handed over with add_callback_threadsafe; serve() runs them"""
+
+    def __init__(self):
+        self.is_open = True
+        self.callbacks = queue.Queue()
+
+    def add_callback_threadsafe(self, callback):
+        self.callbacks.put(callback)
+
+    def close(self):
+        self.is_open = False
+
+
+def crash_or_solve(body):
+    """Pool task: solve the request, after sleeping message["sleep"] seconds, or kill the process if message["crash"]"""
+    message = json.loads(body)
+    time.sleep(message.get("sleep", 0))
+    if message.get("crash"):
+        os._exit(1)
+    return worker_module._solve_in_process(body)
+
+
+def start_processes(worker):
+    """
+    Have every solving process of the pool running: the pool spawns processes on demand
+    and only watches one for dying from its next event on
+    """
+    for future in [worker.pool.submit(time.sleep, 0.5) for _ in range(worker.processes)]:
+        future.result()
+
+
+@contextlib.contextmanager
+def running_worker(processes=2, **channel_options):
+    solve_in_process = worker_module._solve_in_process
+    worker_module._solve_in_process = crash_or_solve
+    with contextlib.redirect_stdout(io.StringIO()):
+        worker = OptimizationWorker(processes=processes)
+        worker.connection, worker.channel = FakeConnection(), FakeChannel(**channel_options)
+        worker._start_pool()
+        worker._start_progress_thread()
+    start_processes(worker)
+    try:
+        yield worker
+    finally:
+        worker_module._solve_in_process = solve_in_process
+        with contextlib.redirect_stdout(io.StringIO()):
+            worker.stop()
+
+
+def deliver(worker, tag, job_id, redelivered=False, **options):
+    message = {"job_id": job_id, "data": convert_tuple_keys_to_strings(build_sample_data()), **options}
+    method = SimpleNamespace(delivery_tag=tag, redelivered=redelivered, routing_key=Config.INPUT_QUEUE)
+    with contextlib.redirect_stdout(io.StringIO()):
+        worker.process_message(worker.channel, method, SimpleNamespace(message_id=job_id), json.dumps(message))
+
+
+def serve(worker):
+    """Run the handed-over callbacks, as the connection thread does, until no request is left running"""
+    deadline = time.monotonic() + TIMEOUT
+    with contextlib.redirect_stdout(io.StringIO()):
+        while worker.running or not worker.connection.callbacks.empty():
+            worker.connection.callbacks.get(timeout=max(deadline - time.monotonic(), 0))()
+
+
+def settled(log, tag):
+    """Log entries of one delivery tag: ("ack", tag) or ("nack", tag, requeue)"""
+    return [entry for entry in log if entry[0] in ("ack", "nack") and entry[1] == tag]
+
+
+def test_jobs_solve_in_the_pool():
+    with running_worker() as worker:
+        started = time.monotonic()
+        deliver(worker, 1, "job-1", sleep=2)
+        deliver(worker, 2, "job-2", sleep=2)
+        assert time.monotonic() - started < 1  # handed over, not solved, on the connection thread
+        assert len(worker.running) == 2
+        serve(worker)
+        log = worker.channel.log
+    responses = worker.channel.responses()
+    assert [responses[job]["status"] for job in ("job-1", "job-2")] == ["success", "success"]
+    assert responses["job-1"]["results"]["summary"] == responses["job-2"]["results"]["summary"]
+    for tag, job in ((1, "job-1"), (2, "job-2")):
+        published = next(i for i, entry in enumerate(log) if entry[0] == "publish" and entry[2]["job_id"] == job
+                         and entry[1] == Config.OUTPUT_QUEUE)
+        assert settled(log, tag) == [("ack", tag)] and log.index(("ack", tag)) > published
+    # progress events of the solves were forwarded to the connection thread and published
+    assert any(entry[:2] == ("publish", Config.PROGRESS_QUEUE) and entry[2]["job_id"] == "job-1" for entry in log)
+
+
+def test_unpublished_response_is_requeued():
+    with running_worker(processes=1, fail_responses=True) as worker:
+        deliver(worker, 1, "job-1")
+        serve(worker)
+    assert settled(worker.channel.log, 1) == [("nack", 1, True)]
+
+
+def test_killed_process_requeues_the_jobs_of_its_pool():
+    with running_worker() as worker:
+        pool = worker.pool
+        deliver(worker, 1, "job-1", sleep=5)
+        deliver(worker, 2, "job-2", crash=True)
+        serve(worker)
+        assert worker.pool is not pool
+        assert worker.channel.responses() == {}
+        assert settled(worker.channel.log, 1) == [("nack", 1, True)] and settled(worker.channel.log, 2) == [("nack", 2, True)]
+        # redelivered, the innocent job solves and the job that kills its process again gets an error
+        start_processes(worker)
+        deliver(worker, 3, "job-1", redelivered=True)
+        serve(worker)
+        deliver(worker, 4, "job-2", redelivered=True, crash=True)
+        serve(worker)
+    responses = worker.channel.responses()
+    assert responses["job-1"]["status"] == "success" and responses["job-2"]["status"] == "error"
+    assert settled(worker.channel.log, 3) == [("ack", 3)] and settled(worker.channel.log, 4) == [("ack", 4)]
+
+
+def test_heartbeat():
+    connections = []
+
+    class Connection:
+        def __init__(self, parameters):
+            connections.append(parameters)
+
+        def channel(self):
+            return SimpleNamespace(queue_declare=lambda **kwargs: None)
+
+    blocking_connection = worker_module.pika.BlockingConnection
+    worker_module.pika.BlockingConnection = Connection
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            OptimizationWorker(processes=1).connect()
+    finally:
+        worker_module.pika.BlockingConnection = blocking_connection
+    assert connections[0].heartbeat == Config.HEARTBEAT
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
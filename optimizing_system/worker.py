@@ -1,162 +1,451 @@
+import functools
 import json
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
 import pika
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from ares_shared.estimate import model_counts, run_stats
+from ares_shared.lanes import lane_queue, parse_weights
 from model import MarsRecyclingOptimizer
-from pyomo.environ import value
+from matrix_model import MatrixRecyclingOptimizer
+from progress import SolverProgress
+from race import parse_strategy, race
 from config import Config
 
 
-def convert_string_keys_to_tuples(data):
+# Model backends selectable per worker (Config.MODEL_BACKEND) or per job (params.backend),
+# with the worker's default solver preference for each
+OPTIMIZER_BACKENDS = {
+    'pyomo': (MarsRecyclingOptimizer, Config.PYOMO_SOLVERS),
+    'matrix': (MatrixRecyclingOptimizer, Config.MATRIX_SOLVERS),
+}
+
+
+class JobSolver:
+    """Solves optimization requests; one per solving process, holding that process's built models"""
+    
+    def __init__(self, publish_progress):
+        """
+        Args:
+            publish_progress: Called with (job_id, event) for every solver progress event
+        """
+        self.publish_progress = publish_progress
+        self.models = OrderedDict()  # (backend, solvers, structure fingerprint) -> (built optimizer, size), most recent last
+    
+    def handle(self, body):
+        """
+        Solve one optimization request
+        
+        Args:
+            body: Message body (JSON string)
+        
+        Returns:
+            Response dict for the output queue (status 'success' with results, or 'error')
+        """
+        try:
+            # Parse the incoming message
+            data = json.loads(body)
+            job_id = data.get('job_id', 'unknown')
+            optimization_data = data.get('data', {})
+            
+            # Convert string keys back to tuples, in place: the decoded message is not used otherwise
+            optimization_data = MarsRecyclingOptimizer.normalize_input(optimization_data, in_place=True)
+            
+            print(f"Job ID: {job_id}")
+            
+            # Pick the model backend and result format (job params override the worker defaults)
+            params = optimization_data.get('params') or {}
+            params.setdefault('results', Config.RESULT_FORMAT)
+            optimization_data['params'] = params
+            backend = params.get('backend', Config.MODEL_BACKEND)
+            if backend not in OPTIMIZER_BACKENDS:
+                raise ValueError(f"Unknown model backend '{backend}'")
+            print(f"Model backend: {backend}")
+            
+            _, default_solvers = OPTIMIZER_BACKENDS[backend]
+            
+            if params.get('race'):
+                # Race the configured solver strategies in separate processes (params.backend/solvers do not apply)
+                optimization_results = self._race(optimization_data)
+            else:
+                # Run the optimization (re-using the job's built model when only parameters changed)
+                started = time.monotonic()
+                model, reused = self._get_model(job_id, backend, params.get('solvers') or default_solvers or None, optimization_data)
+                built = time.monotonic()
+                progress = SolverProgress(lambda event: self.publish_progress(job_id, event), Config.PROGRESS_INTERVAL)
+                if params.get('sweep'):
+                    # Re-solve the built model once per override point (no progress events)
+                    optimization_results = model.sweep(params['sweep'], params.get('sweep_plans') or ())
+                    print(f"Sweep finished: {model.solve_info['solved']}/{model.solve_info['points']} points solved")
+                else:
+                    model.solve(progress=progress)
+                    
+                    # Get structured results from the model
+                    optimization_results = model.get_results()
+                solved = time.monotonic()
+                # Normalize solver_status to a simple JSON-safe summary
+                try:
+                    solver_info = getattr(model.solver_results, 'solver', None)
+                    cleaned_status = {
+                        'status': str(getattr(solver_info, 'status', 'unknown')) if solver_info is not None else 'unknown',
+                        'termination_condition': str(getattr(solver_info, 'termination_condition', 'unknown')) if solver_info is not None else 'unknown',
+                    }
+                    # mode / heuristic / lp_bound / gap of preview, rolling-horizon and sweep solves
+                    cleaned_status.update(model.solve_info)
+                    if progress.last is not None:
+                        cleaned_status['progress'] = progress.last
+                    # model size and measured cost of this run: the history the backend's estimates are fitted on
+                    # (no build time when an already built model was updated)
+                    cleaned_status['run_stats'] = run_stats(
+                        model_counts(optimization_data), cleaned_status.get('mode', 'full'), backend,
+                        None if reused else built - started, solved - built, _peak_memory_mb(),
+                    )
+                    optimization_results['solver_status'] = cleaned_status
+                except Exception:
+                    optimization_results['solver_status'] = str(optimization_results.get('solver_status', 'unknown'))
+            
+            # Build response
+            return {
+                'job_id': job_id,
+                'status': 'success',
+                'results':optimization_results
+            }
+        
+        except Exception as e:
+            print(f"Error processing request: {str(e)}")
+            return {
+                'request_id': data.get('request_id', 'unknown') if 'data' in locals() else 'unknown',
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def _get_model(self, job_id, backend, solvers, optimization_data):
+        """
+        Return a model ready to solve for this job
+        
+        Built models are cached by structure fingerprint, so a rerun of a job, or any job
+        with the same entities, recipes and coefficients, is applied to a built model in
+        place via update(); anything else is set up from scratch. The cache keeps at most
+        MODEL_CACHE_SIZE models and MODEL_CACHE_MAX_SIZE variables + constraints in total.
+        
+        Args:
+            job_id: Job ID
+            backend: Model backend name (key of OPTIMIZER_BACKENDS)
+            solvers: Preferred solvers list (or None for the backend default)
+            optimization_data: Optimization data dictionary
+        
+        Returns:
+            (MarsRecyclingOptimizer (or subclass) instance with the data loaded, True if a built model was re-used)
+        """
+        optimizer_cls, _ = OPTIMIZER_BACKENDS[backend]
+        fingerprint = optimizer_cls.structure_fingerprint(optimization_data)
+        key = (backend, tuple(solvers or ()), fingerprint)
+        model, size = self.models.pop(key, (None, 0))
+        reused = model is not None and model.update(optimization_data)
+        if reused:
+            print(f"Re-using built model with structure {fingerprint[:12]}")
+        else:
+            model = optimizer_cls(preferred_solvers=solvers)
+            model.setup(optimization_data)
+            size = model.model_size()
+        
+        if Config.MODEL_CACHE_SIZE > 0:
+            self.models[key] = (model, size)
+            while len(self.models) > Config.MODEL_CACHE_SIZE or (
+                len(self.models) > 1 and Config.MODEL_CACHE_MAX_SIZE > 0
+                and sum(size for _, size in self.models.values()) > Config.MODEL_CACHE_MAX_SIZE
+            ):
+                self.models.popitem(last=False)
+        return model, reused
+    
+    def _race(self, optimization_data):
+        """
+        Solve by racing Config.RACE_STRATEGIES (see race.py), skipping strategies
+        whose solver is not available
+        
+        Args:
+            optimization_data: Optimization data dictionary
+        
+        Returns:
+            Results of the winning strategy; solver_status.race records the winner and every finished strategy
+        """
+        strategies = []
+        for spec in Config.RACE_STRATEGIES:
+            strategy = parse_strategy(spec)
+            if strategy['backend'] not in OPTIMIZER_BACKENDS:
+                print(f"Race: skipping {spec} (unknown model backend)")
+                continue
+            optimizer_cls, _ = OPTIMIZER_BACKENDS[strategy['backend']]
+            if not optimizer_cls.probe_solvers([strategy['solver']])[strategy['solver']]['available']:
+                print(f"Race: skipping {spec} (solver not available)")
+                continue
+            strategies.append(strategy)
+        if not strategies:
+            raise RuntimeError("No race strategy has an available solver")
+        
+        optimizer_classes = {backend: optimizer_cls for backend, (optimizer_cls, _) in OPTIMIZER_BACKENDS.items()}
+        results, race_info = race(optimizer_classes, strategies, optimization_data, Config.RACE_WORKERS, Config.SOLVER_TIMEOUT)
+        print(f"Race won by {race_info['winner']} after {race_info['elapsed']:.2f}s")
+        results['solver_status']['race'] = race_info
+        return results
+
+
+def _peak_memory_mb():
+    """Peak resident memory of this process in MB (the largest job it has solved so far)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB on Linux
+
+
+# The JobSolver of a pool process (set by _init_solver_process)
+_job_solver = None
+
+
+def _solver_probes(threads=None):
     """
-    Convert string keys back to tuples and integers for processing
+    Probe every backend's solvers (once per process: later calls return the cached probes);
+    optimizers pick solvers from these probes and share the solver objects for the life of the process
     
     Args:
-        data: Dictionary with string keys that represent tuples or integers
-        
+        threads: Threads per solve for multi-threaded solvers (None = solver default)
+    
     Returns:
-        Dictionary with string keys converted back to tuples or integers
+        {backend: {solver: {"available", "version", "warm_start", "persistent", "threads"}}}
     """
-    if isinstance(data, dict):
-        new_dict = {}
-        for key, value in data.items():
-            if isinstance(key, str):
-                if key.startswith('(') and key.endswith(')'):
-                    # Convert tuple strings back to tuples
-                    try:
-                        items = key[1:-1].split(', ')
-                        converted_items = []
-                        for item in items:
-                            item = item.strip("'\"")
-                            try:
-                                if '.' in item:
-                                    converted_items.append(float(item))
-                                else:
-                                    converted_items.append(int(item))
-                            except ValueError:
-                                converted_items.append(item)
-                        new_key = tuple(converted_items)
-                    except:
-                        new_key = key
-                else:
-                    # Try to convert single string keys to integers
-                    try:
-                        if key.isdigit():
-                            new_key = int(key)
-                        elif '.' in key:
-                            new_key = float(key)
-                        else:
-                            new_key = key
-                    except:
-                        new_key = key
-            else:
-                new_key = key
-            new_dict[new_key] = convert_string_keys_to_tuples(value)
-        return new_dict
-    elif isinstance(data, list):
-        return [convert_string_keys_to_tuples(item) for item in data]
-    else:
-        return data
+    return {
+        backend: optimizer_cls.probe_solvers(solvers or None, threads)
+        for backend, (optimizer_cls, solvers) in OPTIMIZER_BACKENDS.items()
+    }
+
+
+def _init_solver_process(progress_events, threads):
+    """
+    Pool process initializer: probes the solvers this process solves with, and sends
+    progress events back to the consuming process through progress_events
+    """
+    global _job_solver
+    _solver_probes(threads)
+    _job_solver = JobSolver(lambda job_id, event: progress_events.put((job_id, event)))
+
+
+def _solve_in_process(body):
+    """Solve one request in a pool process; the response is serialized here, so the consumer only publishes it"""
+    return json.dumps(_job_solver.handle(body))
 
 
 class OptimizationWorker:
-    def __init__(self, rabbitmq_host=None, input_queue=None, output_queue=None):
+    def __init__(self, rabbitmq_host=None, input_queue=None, output_queue=None, progress_queue=None, processes=None, lanes=None):
         """
         Initialize the RabbitMQ worker
         
         Args:
             rabbitmq_host: RabbitMQ server hostname (defaults to Config.RABBITMQ_HOST)
-            input_queue: Queue name to consume optimization requests from (defaults to Config.INPUT_QUEUE)
+            input_queue: Queue name to consume optimization requests from (defaults to Config.INPUT_QUEUE);
+                lane queues are named after it (see ares_shared.lanes)
             output_queue: Queue name to publish optimization results to (defaults to Config.OUTPUT_QUEUE)
+            progress_queue: Queue name to publish solver progress events to (defaults to Config.PROGRESS_QUEUE)
+            processes: Number of solving processes (defaults to Config.WORKER_PROCESSES)
+            lanes: Lanes to consume with their weights, "name:weight,..." (defaults to Config.WORKER_LANES; empty = all lanes)
         """
         self.rabbitmq_host = rabbitmq_host or Config.RABBITMQ_HOST
         self.input_queue = input_queue or Config.INPUT_QUEUE
         self.output_queue = output_queue or Config.OUTPUT_QUEUE
+        self.progress_queue = progress_queue or Config.PROGRESS_QUEUE
+        self.processes = max(1, processes or Config.WORKER_PROCESSES)
+        # (queue, most requests of it solved at once or 0 for no limit); a worker on every lane
+        # also drains the plain input queue of producers that do not route by size
+        lanes = Config.WORKER_LANES if lanes is None else lanes
+        self.lanes = [(lane_queue(self.input_queue, name), weight) for name, weight in parse_weights(lanes, Config.JOB_LANES)]
+        if not lanes.strip():
+            self.lanes.append((self.input_queue, 0))
         self.connection = None
         self.channel = None
-        
+        self.pool = None
+        self.progress_events = None
+        self.running = {}  # future -> (delivery tag, job id, redelivered, pool) of the requests being solved
+        self.progress_thread = None
+        # the cores are shared by the solving processes
+        self.solver_threads = Config.SOLVER_THREADS or max(1, (os.cpu_count() or 1) // self.processes)
+        self.solver_probes = {}  # probes of the solving processes (see _start_pool)
+    
     def connect(self):
         """Establish connection to RabbitMQ"""
         print(f"Connecting to RabbitMQ at {self.rabbitmq_host}...")
         self.connection = pika.BlockingConnection(
-            pika.ConnectionParameters(host=self.rabbitmq_host)
+            pika.ConnectionParameters(host=self.rabbitmq_host, heartbeat=Config.HEARTBEAT)
         )
         self.channel = self.connection.channel()
         
         # Declare queues
-        self.channel.queue_declare(queue=self.input_queue, durable=True)
+        for lane, _ in self.lanes:
+            self.channel.queue_declare(queue=lane, durable=True)
         self.channel.queue_declare(queue=self.output_queue, durable=True)
+        self.channel.queue_declare(queue=self.progress_queue, durable=True)
         
-        print(f"Connected. Listening on queue: {self.input_queue}")
+        print(f"Connected. Listening on queues: {', '.join(f'{lane} ({weight or self.processes})' for lane, weight in self.lanes)}")
+    
+    def _start_pool(self):
+        """
+        Start the pool of solving processes
         
+        Processes are spawned, not forked (a forked child would inherit HiGHS thread
+        pools in an unusable state), and each keeps its own cache of built models.
+        """
+        ctx = multiprocessing.get_context('spawn')
+        if self.progress_events is None:
+            self.progress_events = ctx.Queue()
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=ctx,
+            initializer=_init_solver_process,
+            initargs=(self.progress_events, self.solver_threads),
+        )
+        print(f"Started {self.processes} solving process(es), {self.solver_threads} solver thread(s) each")
+        if not self.solver_probes:
+            # every solving process probes the solvers once when it starts; report one's probes
+            self.solver_probes = self.pool.submit(_solver_probes).result()
+            self._log_solver_probes()
+    
+    def _start_progress_thread(self):
+        """Forward the progress events of the solving processes to the connection thread"""
+        def forward():
+            while True:
+                event = self.progress_events.get()
+                if event is None:
+                    return
+                self._on_connection_thread(self._publish_progress, *event)
+        
+        self.progress_thread = threading.Thread(target=forward, name='progress-forwarder', daemon=True)
+        self.progress_thread.start()
+    
+    def _on_connection_thread(self, callback, *args):
+        """
+        Run callback(*args) on the thread serving the connection (pika channels are not
+        thread-safe); dropped if the connection has closed in the meantime
+        """
+        try:
+            self.connection.add_callback_threadsafe(functools.partial(callback, *args))
+        except Exception as e:
+            print(f"Connection closed, dropping {getattr(callback, '__name__', 'callback')}: {str(e)}")
+    
     def process_message(self, ch, method, properties, body):
         """
-        Process incoming optimization request
+        Hand an incoming optimization request to the process pool; the message is
+        acknowledged once its response has been published (see _finish)
         
         Args:
             ch: Channel
             method: Delivery method
-            properties: Message properties
+            properties: Message properties (message_id is the job ID)
             body: Message body (JSON string)
         """
+        job_id = getattr(properties, 'message_id', None) or 'unknown'
         print(f"\n{'='*60}")
-        print("Received optimization request")
+        print(f"Received optimization request {job_id} from {method.routing_key} ({len(self.running) + 1} running)")
         print(f"{'='*60}")
         
+        future = self.pool.submit(_solve_in_process, body)
+        self.running[future] = (method.delivery_tag, job_id, bool(getattr(method, 'redelivered', False)), self.pool)
+        # The pool calls this from its own thread; the response is published and the request acked on ours
+        future.add_done_callback(lambda done: self._on_connection_thread(self._finish, done))
+    
+    def _finish(self, future):
+        """
+        Publish the response of a finished solve and acknowledge its request (on the connection thread)
+        
+        When a solving process dies (e.g. killed for memory), every job of its pool fails
+        and the pool cannot tell which one killed it: the requests are requeued once, and
+        only a redelivered request that breaks the pool again gets an error response.
+        """
+        delivery_tag, job_id, redelivered, pool = self.running.pop(future)
         try:
-            # Parse the incoming message
-            data = json.loads(body)
-            job_id = data.get('job_id', 'unknown')
-            optimization_data = data.get('data', {})
-            
-            # Convert string keys back to tuples
-            optimization_data = convert_string_keys_to_tuples(optimization_data)
-            
-            print(f"Job ID: {job_id}")
-            
-            # Run the optimization
-            model = MarsRecyclingOptimizer()
-            model.setup(optimization_data)
-            model.solve()
-            
-            # Get structured results from the model
-            optimization_results = model.get_results()
-            # Normalize solver_status to a simple JSON-safe summary
-            try:
-                solver_info = getattr(model.solver_results, 'solver', None)
-                cleaned_status = {
-                    'status': str(getattr(solver_info, 'status', 'unknown')) if solver_info is not None else 'unknown',
-                    'termination_condition': str(getattr(solver_info, 'termination_condition', 'unknown')) if solver_info is not None else 'unknown',
-                }
-                optimization_results['solver_status'] = cleaned_status
-            except Exception:
-                optimization_results['solver_status'] = str(optimization_results.get('solver_status', 'unknown'))
-            
-            # Build response
-            response = {
-                'job_id': job_id,
-                'status': 'success',
-                'results':optimization_results
-            }
-            
+            message = future.result()
         except Exception as e:
-            print(f"Error processing request: {str(e)}")
-            response = {
-                'request_id': data.get('request_id', 'unknown') if 'data' in locals() else 'unknown',
+            broken = isinstance(e, (BrokenProcessPool, CancelledError))
+            # restart the pool, once for all its jobs
+            if broken and pool is self.pool:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self._start_pool()
+            if broken and not redelivered:
+                print(f"Solving process died, requeueing request {job_id}")
+                self.channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+                return
+            print(f"Error processing request {job_id}: {str(e) or type(e).__name__}")
+            message = json.dumps({
+                'job_id': job_id,
+                'request_id': job_id,
                 'status': 'error',
-                'error': str(e)
-            }
-        
-        # Publish response to output queue
-        self._publish_response(response)
-        
-        # Acknowledge the message
-        ch.basic_ack(delivery_tag=method.delivery_tag)
-        print(f"{'='*60}\n")
+                'error': f"Solving process failed: {str(e) or type(e).__name__}",
+            })
         
+        # Acknowledge the message only once its response is on the output queue
+        if self._publish_response(message):
+            self.channel.basic_ack(delivery_tag=delivery_tag)
+        else:
+            self.channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+        print(f"Finished request {job_id}\n{'='*60}\n")
+    
+    def _log_solver_probes(self):
+        """Print the solver probes of the solving processes"""
+        for backend, probes in self.solver_probes.items():
+            for name, probe in probes.items():
+                if probe['available']:
+                    print(f"Solver {backend}/{name}: version {probe['version'] or 'unknown'}, "
+                          f"warm start {'yes' if probe['warm_start'] else 'no'}, "
+                          f"persistent {'yes' if probe['persistent'] else 'no'}, "
+                          f"threads {probe['threads'] or 'default'}")
+                else:
+                    print(f"Solver {backend}/{name}: not available")
+    
+    def health(self):
+        """Worker health data: connection, queues, solver probes and solving processes"""
+        return {
+            'connected': bool(self.connection and self.connection.is_open),
+            'input_queue': self.input_queue,
+            'lanes': dict(self.lanes),
+            'output_queue': self.output_queue,
+            'progress_queue': self.progress_queue,
+            'solvers': self.solver_probes,
+            'processes': self.processes,
+            'solver_threads': self.solver_threads,
+            'running_jobs': len(self.running),
+        }
     
-    def _publish_response(self, response):
-        """Publish the optimization response to the output queue"""
+    def _log_health(self):
+        """Print the worker's health data, then again every HEALTH_INTERVAL seconds (on the connection thread)"""
+        health = self.health()
+        # the solver probes are printed once at startup
+        print(f"Worker health: {json.dumps({key: v for key, v in health.items() if key != 'solvers'})}")
+        if Config.HEALTH_INTERVAL > 0:
+            self.connection.call_later(Config.HEALTH_INTERVAL, self._log_health)
+    
+    def _publish_progress(self, job_id, event):
+        """Publish a solver progress event (incumbent, bound, gap, elapsed) to the progress queue"""
+        try:
+            self.channel.basic_publish(
+                exchange='',
+                routing_key=self.progress_queue,
+                body=json.dumps({'job_id': job_id, **event}),
+                properties=pika.BasicProperties(
+                    delivery_mode=2,  # Make message persistent
+                )
+            )
+        except Exception as e:
+            print(f"Error publishing progress: {str(e)}")
+    
+    def _publish_response(self, message):
+        """
+        Publish an optimization response (JSON string) to the output queue
+        
+        Returns:
+            True if the response was published
+        """
         try:
-            message = json.dumps(response)
             self.channel.basic_publish(
                 exchange='',
                 routing_key=self.output_queue,
@@ -166,26 +455,35 @@ class OptimizationWorker:
                 )
             )
             print(f"Response published to queue: {self.output_queue}")
+            return True
         except Exception as e:
             print(f"Error publishing response: {str(e)}")
+            return False
     
     def start(self):
         """Start consuming messages from the input queue"""
         try:
             self.connect()
+            self._start_pool()
+            self._start_progress_thread()
             
-            # Set QoS to process one message at a time
-            self.channel.basic_qos(prefetch_count=Config.PREFETCH_COUNT)
+            # Take up to PREFETCH_COUNT unacknowledged requests (defaults to one per solving process)
+            self.channel.basic_qos(prefetch_count=Config.PREFETCH_COUNT or self.processes, global_qos=True)
             
-            # Start consuming
-            self.channel.basic_consume(
-                queue=self.input_queue,
-                on_message_callback=self.process_message
-            )
+            # Start consuming every lane, each limited to its weight on top of the channel-wide limit
+            for lane, weight in self.lanes:
+                self.channel.basic_qos(prefetch_count=weight)
+                self.channel.basic_consume(
+                    queue=lane,
+                    on_message_callback=self.process_message
+                )
             
+            self._log_health()
             print("Waiting for optimization requests. To exit press CTRL+C")
+            # Solves run in the pool, so this thread only serves the connection (deliveries,
+            # heartbeats, and the responses, acks and progress events handed over to it)
             self.channel.start_consuming()
-            
+        
         except KeyboardInterrupt:
             print("\nShutting down gracefully...")
             self.stop()
@@ -194,7 +492,11 @@ class OptimizationWorker:
             self.stop()
     
     def stop(self):
-        """Close the RabbitMQ connection"""
+        """Stop the solving processes and close the RabbitMQ connection (unacknowledged requests are redelivered)"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.progress_thread is not None:
+            self.progress_events.put(None)
         if self.channel and self.channel.is_open:
             self.channel.stop_consuming()
         if self.connection and self.connection.is_open:
@@ -206,4 +508,3 @@ if __name__ == "__main__":
     # Create and start the worker (uses Config defaults)
     worker = OptimizationWorker()
     worker.start()
-
@@ -0,0 +1,8 @@
+"""
+Modules shared by the backend API and the optimization worker
+
+validation (mission data checks), result_format (columnar results), lanes (request
+size classes), estimate (model counts and run-time regression) and structure (the
+sparse index pairs the models are built over). They only need the standard
+library, so both sides install this package and agree on one definition of each.
+"""
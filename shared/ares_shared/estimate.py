@@ -0,0 +1,194 @@
+"""
+Model size and run-time estimates
+
+model_counts() counts the variables, binaries and constraints the Pyomo model of a
+job will have (before presolve) from its mission data alone, without building
+anything. The worker records these counts with the measured build time, solve time
+and memory of every job (solver_status.run_stats, see run_stats); fit() regresses
+each measure on the counts of those historical runs, in log-log form
+(log y = b0 + b1 log(1 + variables) + b2 log(1 + binaries) + b3 log(1 + constraints)),
+and predict() applies the fit to a new job.
+
+The module only needs the standard library and ships in the ares_shared package
+both sides install: the worker records run stats with it, and the backend estimates
+jobs with it before they are queued and routes them to their lane
+(backend/app/services/estimate.py). The counts take the zero-yield processing pairs
+from structure.disposal_pairs(), like the model builders, so they agree with the
+built models.
+"""
+import math
+
+from ares_shared.structure import disposal_pairs
+
+# count features of the regression, in order
+FEATURES = ("variables", "binaries", "constraints")
+
+# measures predicted from the counts (run_stats keys)
+MEASURES = ("build_seconds", "solve_seconds", "memory_mb")
+
+# fewest historical runs a measure is fitted on
+MIN_RUNS = 5
+
+# ridge term keeping the fit stable when the counts are nearly collinear
+RIDGE = 1e-6
+
+
+def model_counts(data: dict) -> dict:
+    """
+    Count the model's variables, binaries and constraints
+
+    Args:
+        data: Mission data with tuple keys (see MarsRecyclingOptimizer.normalize_input)
+
+    Returns:
+        {"variables", "binaries", "constraints"}
+    """
+    materials = set(data.get("materials") or ())
+    methods = set(data.get("methods") or ())
+    outputs = set(data.get("outputs") or ())
+    items = set(data.get("items") or ())
+    subs = set(data.get("substitutes") or ())
+    weeks = set(data.get("weeks") or ())
+    T = len(weeks)
+
+    # sparse index sets: (material, method) processing pairs and allowed (substitute, item) pairs
+    recipe_pairs = {(m, r) for (m, r, _) in data.get("yields", {}) if m in materials and r in methods}
+    recipe_pairs |= set(disposal_pairs(data))
+    sub_item_pairs = {
+        (s, k) for k, allowed in data.get("substitutes_can_replace", {}).items() if k in items
+        for s in allowed if s in subs
+    }
+
+    variables = T * (
+        len(recipe_pairs)                  # P
+        + 2 * len(methods)                 # Q, y
+        + 2 * len(outputs)                 # Oprod, Oinv
+        + len(materials)                   # Minv
+        + 2 * len(subs)                    # make_sub, sub_inv
+        + len(sub_item_pairs)              # sub_used_for
+        + 4 * len(items)                   # carried_used, carried_inv, item_used, item_short
+    )
+    binaries = T * len(methods)
+
+    availability = data.get("availability", {})
+    min_lot = data.get("min_lot_size", {})
+    constraints = (
+        T * (2 * len(methods) + 2 * len(outputs) + len(materials) + len(subs) + 3 * len(items))
+        + T * len(outputs & set(data.get("output_capacity", {})))
+        + T * len(materials & set(data.get("input_capacity", {})))
+        + sum(1 for (r, t), v in availability.items() if v == 0 and r in methods and t in weeks)
+        + T * sum(1 for r in methods if float(min_lot.get(r, 0.0)) > 0)
+        + len(weeks & set(data.get("crew_available", {})))
+        + len(weeks & set(data.get("energy_available", {})))
+        + sum(1 for dl in data.get("deadlines", []) if "item" in dl)
+    )
+    return {"variables": variables, "binaries": binaries, "constraints": constraints}
+
+
+def job_mode(params: dict, weeks: int) -> str:
+    """
+    Solve mode of a job, as recorded in solver_status.mode ("full" when not recorded)
+
+    Args:
+        params: Job params
+        weeks: Number of weeks of the mission
+    """
+    params = params or {}
+    if params.get("sweep"):
+        return "sweep"
+    if 0 < int(params.get("horizon_window") or 0) < weeks:
+        return "rolling_horizon"
+    if params.get("mode") == "preview":
+        return "preview"
+    return "full"
+
+
+def run_stats(counts: dict, mode: str, backend: str, build_seconds: float, solve_seconds: float, memory_mb: float) -> dict:
+    """Historical run record of a job (stored in solver_status.run_stats)"""
+    return {
+        **counts,
+        "mode": mode,
+        "backend": backend,
+        "build_seconds": round(build_seconds, 3) if build_seconds is not None else None,
+        "solve_seconds": round(solve_seconds, 3),
+        "memory_mb": round(memory_mb, 1),
+    }
+
+
+def fit(runs: list) -> dict:
+    """
+    Fit every measure on historical runs
+
+    Args:
+        runs: run_stats records (see run_stats); records without a measure are skipped for it
+
+    Returns:
+        {measure: {"coefficients": [b0, b1, b2, b3], "runs": n, "rmse_log": ...}} for the
+        measures with at least MIN_RUNS runs
+    """
+    models = {}
+    for measure in MEASURES:
+        rows = [
+            ([1.0] + [math.log1p(max(float(run.get(f) or 0), 0.0)) for f in FEATURES], math.log(max(float(run[measure]), 1e-3)))
+            for run in runs
+            if all(f in run for f in FEATURES) and run.get(measure) is not None
+        ]
+        if len(rows) < MIN_RUNS:
+            continue
+        coefficients = _least_squares([x for x, _ in rows], [y for _, y in rows])
+        residuals = [y - sum(b * v for b, v in zip(coefficients, x)) for x, y in rows]
+        models[measure] = {
+            "coefficients": coefficients,
+            "runs": len(rows),
+            "rmse_log": math.sqrt(sum(r * r for r in residuals) / len(rows)),
+        }
+    return models
+
+
+def predict(models: dict, counts: dict) -> dict:
+    """
+    Predict the measures of a job
+
+    Args:
+        models: fit() output
+        counts: model_counts() of the job
+
+    Returns:
+        {measure: predicted value or None if the measure has too few runs}
+    """
+    x = [1.0] + [math.log1p(counts[f]) for f in FEATURES]
+    predictions = {}
+    for measure in MEASURES:
+        model = models.get(measure)
+        predictions[measure] = (
+            round(math.exp(sum(b * v for b, v in zip(model["coefficients"], x))), 3) if model else None
+        )
+    return predictions
+
+
+def _least_squares(X, y):
+    """Ridge-regularized least squares via the normal equations (a few features only)"""
+    n = len(X[0])
+    A = [[sum(row[i] * row[j] for row in X) for j in range(n)] for i in range(n)]
+    b = [sum(row[i] * v for row, v in zip(X, y)) for i in range(n)]
+    scale = max(A[i][i] for i in range(n))
+    for i in range(1, n):  # the intercept is not penalized
+        A[i][i] += RIDGE * scale
+    # Gaussian elimination with partial pivoting
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(A[r][col]))
+        A[col], A[pivot] = A[pivot], A[col]
+        b[col], b[pivot] = b[pivot], b[col]
+        if abs(A[col][col]) < 1e-12:
+            continue
+        for r in range(col + 1, n):
+            f = A[r][col] / A[col][col]
+            for c in range(col, n):
+                A[r][c] -= f * A[col][c]
+            b[r] -= f * b[col]
+    coefficients = [0.0] * n
+    for i in reversed(range(n)):
+        if abs(A[i][i]) < 1e-12:
+            continue
+        coefficients[i] = (b[i] - sum(A[i][j] * coefficients[j] for j in range(i + 1, n))) / A[i][i]
+    return coefficients
@@ -0,0 +1,122 @@
+"""
+Size-aware request lanes
+
+Optimization requests are routed by job size to one queue per size class ("lane"),
+so a short preview does not wait behind hours of large solves. A lane's queue is
+"<input queue>.<lane>", e.g. "optimization_requests.small".
+
+Lanes are written "name:max_size,...,name" from the smallest class up; a job goes to
+the first lane whose max_size is at least its size, and the last lane takes
+everything bigger. The size of a job is the number of variables of its model,
+counted from its mission data alone (estimate.model_counts), so the producer can
+route a request without building its model. Requests that cost less than a full
+solve with full results are sized down by their params (job_size): a preview
+solves the LP relaxation instead of the MIP, and summary results skip the per-week
+tables.
+
+Workers subscribe to lanes with weights, "name:weight,...": a lane's weight is the
+most requests of that lane a worker solves at once, so a worker with 4 processes
+and "small:4,large:2" always keeps 2 of them free for small jobs.
+
+The module only needs the standard library and ships in the ares_shared package
+both sides install: the worker reads the lanes it consumes, and the backend routes
+requests with it (backend/app/services/lanes.py).
+"""
+
+# default size classes (max model variables)
+DEFAULT_LANES = "small:20000,medium:100000,large"
+
+# share of the model variables a request is sized by, for params that make it cheaper
+# than a full solve with full results (applied together when both are set)
+PREVIEW_SIZE = 0.1   # params.mode == "preview": LP relaxation and rounding, no branch and bound
+SUMMARY_SIZE = 0.5   # params.results == "summary": no per-week tables built or sent
+
+
+def parse_lanes(spec: str) -> list:
+    """
+    Parse size classes
+
+    Args:
+        spec: "name:max_size,...,name" (last lane without max_size)
+
+    Returns:
+        [(name, max_size or None), ...] from the smallest class up
+    """
+    lanes = []
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        name, _, limit = part.partition(":")
+        lanes.append((name.strip(), int(limit) if limit.strip() else None))
+    if not lanes or any(limit is None for _, limit in lanes[:-1]):
+        raise ValueError(f"Invalid lanes '{spec}' (expected name:max_size,...,name)")
+    return lanes
+
+
+def parse_weights(spec: str, lanes: list) -> list:
+    """
+    Parse the lanes a worker subscribes to
+
+    Args:
+        spec: "name:weight,..." (weight = most requests of the lane solved at once;
+            a name without weight has no lane limit); empty = every lane, no lane limits
+        lanes: Size classes (see parse_lanes)
+
+    Returns:
+        [(name, weight or 0), ...]; 0 means no limit other than the worker's own
+    """
+    names = [name for name, _ in lanes]
+    if not spec.strip():
+        return [(name, 0) for name in names]
+    weights = []
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        name, _, weight = part.partition(":")
+        name = name.strip()
+        if name not in names:
+            raise ValueError(f"Unknown lane '{name}' (lanes: {', '.join(names)})")
+        weights.append((name, max(int(weight), 0) if weight.strip() else 0))
+    return weights
+
+
+def job_size(variables: int, params: dict) -> int:
+    """
+    Size a request is routed by
+
+    Args:
+        variables: Model variables of the job (see estimate.model_counts)
+        params: Job params (mode "preview" and results "summary" size it down)
+
+    Returns:
+        variables scaled by PREVIEW_SIZE and/or SUMMARY_SIZE
+    """
+    params = params or {}
+    scale = 1.0
+    if params.get("mode") == "preview":
+        scale *= PREVIEW_SIZE
+    if params.get("results") == "summary":
+        scale *= SUMMARY_SIZE
+    return int(variables * scale)
+
+
+def lane_for(size: int, lanes: list) -> str:
+    """
+    Lane of a job
+
+    Args:
+        size: Job size (see job_size)
+        lanes: Size classes (see parse_lanes)
+
+    Returns:
+        Name of the first lane whose max_size is at least size
+    """
+    for name, limit in lanes:
+        if limit is None or size <= limit:
+            return name
+    return lanes[-1][0]
+
+
+def lane_queue(input_queue: str, lane: str) -> str:
+    """Queue name of a lane"""
+    return f"{input_queue}.{lane}"
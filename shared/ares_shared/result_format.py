@@ -0,0 +1,181 @@
+"""
+Columnar result format
+
+With params.results == "columnar", get_results() returns the solution as one typed
+array per variable family instead of the nested schedule/outputs/substitutes/items
+tables:
+
+    {
+      "format": "columnar",
+      "weeks": [1, 2, ...],
+      "entities": {"materials": [...], "methods": [...], "outputs": [...], "items": [...], "substitutes": [...]},
+      "families": {
+        "Q": {"dims": ["methods", "weeks"], "dtype": "<f8", "data": "<base64>"},
+        "P": {"dims": ["materials", "methods", "weeks"], "dtype": "<f8", "index": "<base64>", "data": "<base64>"},
+        ...
+      },
+      "summary": {...},
+      "solver_status": {...}
+    }
+
+A family holds its values over `dims` (weeks last) flattened in C order, as
+little-endian values of `dtype` in base64. Mostly-zero families are sparse: "index"
+holds the flat positions (int32) of their nonzero values and "data" only those values.
+
+The module only needs the standard library and ships in the ares_shared package
+both sides install: the worker encodes with NumPy, and the backend decodes with this
+module to ingest columnar results and to rebuild the nested tables for clients that
+ask for them (backend/app/services/result_format.py).
+"""
+import array
+import base64
+import sys
+
+# variable families: name -> (dims, dtype); the nested tables are built from exactly these
+FAMILIES = {
+    "Q": (("methods", "weeks"), "<f8"),                    # schedule: processed_kg
+    "y": (("methods", "weeks"), "|i1"),                    # schedule: is_running
+    "P": (("materials", "methods", "weeks"), "<f8"),       # schedule: by_material
+    "Oprod": (("outputs", "weeks"), "<f8"),                # outputs: produced_kg
+    "Oinv": (("outputs", "weeks"), "<f8"),                 # outputs: inventory_kg
+    "make_sub": (("substitutes", "weeks"), "<f8"),         # substitutes: made
+    "sub_inv": (("substitutes", "weeks"), "<f8"),          # substitutes: inventory
+    "sub_used_for": (("substitutes", "items", "weeks"), "<f8"),  # substitutes: used_for
+    "item_used": (("items", "weeks"), "<f8"),              # items: used_total
+    "carried_used": (("items", "weeks"), "<f8"),           # items: used_carried
+    "item_short": (("items", "weeks"), "<f8"),             # items: shortage
+}
+
+# dtype -> array module typecode
+TYPECODES = {"<f8": "d", "<i4": "i", "|i1": "b"}
+
+# dtype of the sparse "index" arrays
+INDEX_DTYPE = "<i4"
+
+# keys of a result that hold the solution tables (what a warm start needs)
+NESTED_KEYS = ("schedule", "outputs", "substitutes", "items")
+COLUMNAR_KEYS = ("format", "weeks", "entities", "families")
+
+
+def decode(results: dict) -> dict:
+    """
+    Decode the families of a columnar result
+
+    Args:
+        results: Columnar result (see module docstring)
+
+    Returns:
+        {family: flat list of values over its dims in C order (zeros filled in for sparse families)}
+    """
+    sizes = {name: len(entities) for name, entities in results["entities"].items()}
+    sizes["weeks"] = len(results["weeks"])
+    values = {}
+    for name, family in results["families"].items():
+        data = _unpack(family["data"], family["dtype"])
+        if "index" not in family:
+            values[name] = data
+            continue
+        size = 1
+        for dim in family["dims"]:
+            size *= sizes[dim]
+        dense = [0.0 if TYPECODES[family["dtype"]] == "d" else 0] * size
+        for i, v in zip(_unpack(family["index"], INDEX_DTYPE), data):
+            dense[i] = v
+        values[name] = dense
+    return values
+
+
+def nested_tables(weeks: list, entities: dict, values: dict) -> dict:
+    """
+    Build the nested schedule/outputs/substitutes/items tables
+
+    Args:
+        weeks: Sorted weeks
+        entities: {"materials": [...], "methods": [...], "outputs": [...], "items": [...], "substitutes": [...]}
+        values: {family: flat list of values over its FAMILIES dims in C order}
+
+    Returns:
+        {"schedule": [...], "outputs": [...], "substitutes": [...], "items": [...]}
+    """
+    T = len(weeks)
+    materials = entities["materials"]
+    methods = entities["methods"]
+    items = entities["items"]
+    R = len(methods)
+    K = len(items)
+
+    def rows(name, n):
+        flat = values[name]
+        return [flat[i * T:(i + 1) * T] for i in range(n)]
+
+    Q, y, P = rows("Q", R), rows("y", R), values["P"]
+    schedule = [
+        {"week": t, "methods": {
+            r: {"processed_kg": Q[j][i], "is_running": y[j][i],
+                "by_material": {mat: P[(m * R + j) * T + i] for m, mat in enumerate(materials)}}
+            for j, r in enumerate(methods)
+        }}
+        for i, t in enumerate(weeks)
+    ]
+    outputs = entities["outputs"]
+    outputs_list = [
+        {"output": o, "weeks": [{"week": t, "produced_kg": p, "inventory_kg": inv}
+                                for t, p, inv in zip(weeks, produced, inventory)]}
+        for o, produced, inventory in zip(outputs, rows("Oprod", len(outputs)), rows("Oinv", len(outputs)))
+    ]
+    subs = entities["substitutes"]
+    used_for = values["sub_used_for"]
+    substitutes_table = [
+        {"substitute": s, "weeks": [{"week": t, "made": made, "inventory": inv,
+                                     "used_for": {k: used_for[(n * K + c) * T + i] for c, k in enumerate(items)}}
+                                    for i, (t, made, inv) in enumerate(zip(weeks, made_s, inv_s))]}
+        for n, (s, made_s, inv_s) in enumerate(zip(subs, rows("make_sub", len(subs)), rows("sub_inv", len(subs))))
+    ]
+    items_table = [
+        {"item": k, "weeks": [{"week": t, "used_total": used, "used_carried": carried, "shortage": short}
+                              for t, used, carried, short in zip(weeks, used_k, carried_k, short_k)]}
+        for k, used_k, carried_k, short_k in zip(items, rows("item_used", K), rows("carried_used", K), rows("item_short", K))
+    ]
+    return {"schedule": schedule, "outputs": outputs_list, "substitutes": substitutes_table, "items": items_table}
+
+
+def to_nested(results: dict) -> dict:
+    """
+    Legacy form of a result: the nested tables in place of the columnar families
+
+    Args:
+        results: Columnar or nested result
+
+    Returns:
+        Result with schedule/outputs/substitutes/items (nested results are returned as they are)
+    """
+    if results.get("format") != "columnar":
+        return results
+    nested = nested_tables(results["weeks"], results["entities"], decode(results))
+    nested.update({key: v for key, v in results.items() if key not in COLUMNAR_KEYS})
+    return nested
+
+
+def solution_tables(results: dict):
+    """
+    The parts of a result a warm start reads (nested tables or columnar families)
+
+    Args:
+        results: get_results() output in any format
+
+    Returns:
+        Dict of those keys, or None if the result has no solution tables (e.g. summary only)
+    """
+    if results.get("format") == "columnar":
+        return {key: results[key] for key in COLUMNAR_KEYS}
+    if results.get("schedule"):
+        return {key: results.get(key, []) for key in NESTED_KEYS}
+    return None
+
+
+def _unpack(data, dtype):
+    values = array.array(TYPECODES[dtype])
+    values.frombytes(base64.b64decode(data))
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values.byteswap()
+    return values.tolist()
@@ -0,0 +1,83 @@
+"""
+Model structure
+
+disposal_pairs() decides, from a job's mission data alone, which (material, method)
+pairs without a recipe still get a processing variable. The model builders
+(MarsRecyclingOptimizer._sparse_index, shared by the matrix backend) and
+estimate.model_counts() both take the pairs from here, so the built models and the
+pre-run counts agree.
+
+The module only needs the standard library and ships in the ares_shared package
+both sides install.
+"""
+import math
+
+
+def disposal_pairs(data: dict) -> list:
+    """
+    (material, method) pairs without a recipe that still get a processing variable P
+
+    A method may process any material; without a `yields` entry that yields nothing
+    (disposal), but still drains the material's inventory and counts toward the
+    method's throughput. That matters only where draining or throughput can help:
+      - a material with a finite input_capacity its inventory can exceed
+      - a method with a min_lot_size, whose processing is rewarded by the objective
+        weights, or whose crew/energy cost is negative
+    so only pairs of a material with some supply and a method with capacity in some
+    week, and one of those, are kept; dropping the others leaves the optimum unchanged.
+    The pairs depend on the weights, so MarsRecyclingOptimizer.update() rebuilds
+    when they change.
+
+    Args:
+        data: Mission data with tuple keys (see MarsRecyclingOptimizer.normalize_input)
+
+    Returns:
+        [(material, method), ...] in materials x methods order
+    """
+    materials = list(data.get("materials") or ())
+    methods = list(data.get("methods") or ())
+    items = set(data.get("items") or ())
+    subs = set(data.get("substitutes") or ())
+    weeks = list(data.get("weeks") or ())
+    recipes = {(m, r) for (m, r, _) in data.get("yields", {})}
+    weights = data.get("weights", {})
+    crew_cost = data.get("crew_cost", {})
+    energy_cost = data.get("energy_cost", {})
+    risk_cost = data.get("risk_cost", {})
+    min_lot = data.get("min_lot_size", {})
+    max_capacity = data.get("max_capacity", {})
+    availability = data.get("availability", {})
+    input_capacity = data.get("input_capacity", {})
+    initial = (data.get("initial_inventory") or {}).get("materials", {})
+
+    incoming = {}
+    for (m, _), v in data.get("incoming_waste", {}).items():
+        incoming[m] = incoming.get(m, 0.0) + float(v)
+    wasted = {m for (k, m), coef in data.get("item_waste", {}).items() if coef and k in items}
+    wasted |= {m for (s, m), coef in data.get("substitute_waste", {}).items() if coef and s in subs}
+
+    def stock(m):
+        return float(initial.get(m, 0.0)) + incoming.get(m, 0.0)
+
+    supplied = [m for m in materials if m in wasted or stock(m) > 0]
+    drained = {
+        m for m in supplied
+        if m in input_capacity and math.isfinite(float(input_capacity[m]))
+        and (m in wasted or stock(m) > float(input_capacity[m]))
+    }
+
+    def rewarded(r):
+        reward = -(float(weights.get("crew", 0.0)) * float(crew_cost.get(r, 0.0))
+                   + float(weights.get("energy", 0.0)) * float(energy_cost.get(r, 0.0))
+                   + float(weights.get("risk", 0.0)) * float(risk_cost.get(r, 0.0)))
+        return reward > 0 or float(crew_cost.get(r, 0.0)) < 0 or float(energy_cost.get(r, 0.0)) < 0
+
+    capable = [
+        r for r in methods
+        if any(float(max_capacity.get((r, t), 0.0)) > 0 and availability.get((r, t), 1) != 0 for t in weeks)
+    ]
+    filling = {r for r in capable if float(min_lot.get(r, 0.0)) > 0 or rewarded(r)}
+    return [
+        (m, r) for m in supplied for r in capable
+        if (m, r) not in recipes and (m in drained or r in filling)
+    ]
@@ -0,0 +1,81 @@
+"""
+Mission data validation
+
+validate() checks normalized mission data (tuple keys, int weeks) and returns a
+structured error list {field, key, message}; an empty list means the data is
+valid. Every membership check runs against sets built once per call, so the
+cost grows with the size of the data rather than catalog size x data size.
+
+The module only needs the standard library and ships in the ares_shared package
+both sides install: the worker validates in setup(), and the backend API runs the
+same checks to reject malformed jobs before they are queued
+(backend/app/services/validation.py).
+"""
+
+# required non-empty entity lists
+REQUIRED_LISTS = ("materials", "methods", "outputs", "items", "substitutes", "weeks")
+
+# keyed maps checked against the entity sets: field -> (sets the key parts belong to, value check)
+KEYED_MAPS = (
+    ("yields", ("materials", "methods", "outputs"), "non_negative"),
+    ("max_capacity", ("methods", "weeks"), None),
+    ("availability", ("methods", "weeks"), "binary"),
+    ("item_demands", ("items", "weeks"), "non_negative"),
+    ("incoming_waste", ("materials", "weeks"), "non_negative"),
+    ("item_waste", ("items", "materials"), "non_negative"),
+    ("substitute_make_recipe", ("substitutes", "outputs"), "non_negative"),
+)
+
+# singular names used in messages
+_ENTITY = {
+    "materials": "material", "methods": "method", "outputs": "output",
+    "items": "item", "substitutes": "substitute", "weeks": "week",
+}
+
+
+def validate(d: dict) -> list:
+    """
+    Validate normalized mission data
+
+    Args:
+        d: Mission data with tuple keys (see MarsRecyclingOptimizer.normalize_input)
+
+    Returns:
+        List of {"field": ..., "key": [...] or None, "message": ...}; empty if valid
+    """
+    errors = []
+
+    def error(field, key, message):
+        errors.append({"field": field, "key": list(key) if isinstance(key, tuple) else key, "message": message})
+
+    for name in REQUIRED_LISTS:
+        if name not in d or not isinstance(d[name], list) or len(d[name]) == 0:
+            error(name, None, f"'{name}' must be a non-empty list")
+
+    if isinstance(d.get("weeks"), list) and not all(isinstance(w, int) for w in d["weeks"]):
+        error("weeks", None, "All entries in 'weeks' must be integers")
+
+    sets = {name: set(d[name]) if isinstance(d.get(name), list) else set() for name in REQUIRED_LISTS}
+
+    for field, parts, check in KEYED_MAPS:
+        for key, v in d.get(field, {}).items():
+            if not isinstance(key, tuple) or len(key) != len(parts):
+                error(field, key, f"{field}: key {key!r} must have {len(parts)} parts ({', '.join(_ENTITY[p] for p in parts)})")
+                continue
+            for part, name in zip(key, parts):
+                if part not in sets[name]:
+                    error(field, key, f"{field}: {_ENTITY[name]} '{part}' not in {name}")
+            label = ",".join(str(part) for part in key)
+            if check == "non_negative" and (not isinstance(v, (int, float)) or v < 0):
+                error(field, key, f"{field} value for ({label}) must be >= 0")
+            elif check == "binary" and v not in (0, 1):
+                error(field, key, f"{field} value for ({label}) must be 0 or 1")
+
+    for item, subs in d.get("substitutes_can_replace", {}).items():
+        if item not in sets["items"]:
+            error("substitutes_can_replace", item, f"substitutes_can_replace: '{item}' not in items")
+        for s in subs:
+            if s not in sets["substitutes"]:
+                error("substitutes_can_replace", item, f"substitutes_can_replace: '{s}' not in substitutes")
+
+    return errors